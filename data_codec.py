@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Data Codec - Dashboard Socio-Economica
+Codifica colonnare dei chunk di sezione (serie storiche senza chiavi ripetute)
+
+Le serie sono liste di righe con gli stessi campi, che in JSON ripetono i
+nomi dei campi a ogni anno:
+
+    [{"anno": 2013, "nascite": 2931}, {"anno": 2014, "nascite": 2840}, ...]
+
+Nel formato 'columnar' la stessa serie diventa un oggetto di colonne:
+
+    {"$columns": {"anno": [2013, 2014, ...], "nascite": [2931, 2840, ...]}}
+
+Il resto dell'albero resta invariato. data/index.json indica la codifica
+dei chunk in 'encoding'; main.js (Dashboard.decodeColumnar) e chi legge i
+chunk in Python (load_chunk) ricostruiscono le righe originali, quindi
+delta, prerender e grafici lavorano sempre sui dati decodificati.
+"""
+
+import json
+
+COLUMNS_KEY = "$columns"
+JSON_ENCODING = "json"
+COLUMNAR_ENCODING = "columnar"
+ENCODINGS = (JSON_ENCODING, COLUMNAR_ENCODING)
+
+def _is_table(value):
+    """Lista non vuota di righe piatte con gli stessi campi"""
+    if not isinstance(value, list) or not value or not all(isinstance(row, dict) for row in value):
+        return False
+    fields = value[0].keys()
+    return all(row.keys() == fields and not any(isinstance(cell, (dict, list)) for cell in row.values())
+               for row in value)
+
+def encode_columnar(value):
+    """Copia di `value` con ogni serie di righe trasformata in colonne"""
+    if _is_table(value):
+        return {COLUMNS_KEY: {field: [row[field] for row in value] for field in value[0]}}
+    if isinstance(value, dict):
+        return {key: encode_columnar(child) for key, child in value.items()}
+    if isinstance(value, list):
+        return [encode_columnar(item) for item in value]
+    return value
+
+def decode_columnar(value):
+    """Inverso di encode_columnar"""
+    if isinstance(value, dict):
+        columns = value.get(COLUMNS_KEY)
+        if columns is not None and len(value) == 1:
+            fields = list(columns)
+            return [dict(zip(fields, cells)) for cells in zip(*columns.values())]
+        return {key: decode_columnar(child) for key, child in value.items()}
+    if isinstance(value, list):
+        return [decode_columnar(item) for item in value]
+    return value
+
+def encode_chunk(data, encoding):
+    if encoding == COLUMNAR_ENCODING:
+        return encode_columnar(data)
+    return data
+
+def load_chunk(path, encoding=JSON_ENCODING):
+    """Chunk di sezione letto da disco e decodificato"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return decode_columnar(data) if encoding == COLUMNAR_ENCODING else data
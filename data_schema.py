@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Data Schema - Dashboard Socio-Economica
+Schema compilato di dashboardData: tipi, intervalli, serie storiche e somme percentuali
+
+Ogni valore dell'albero riceve un tipo ('kind'). In ordine di precedenza:
+una regola esplicita sul percorso, una convenzione sul nome della chiave,
+il tipo ereditato dal nodo padre, infine 'amount' (numero finito non negativo):
+
+    Field("demografia.longevita", "age")         # tutto il sottoalbero
+    (re.compile(r'saldo'), 'signed')             # qualsiasi chiave con 'saldo'
+
+Le liste sono serie storiche: righe con gli stessi campi e 'anno'
+strettamente crescente ('*' nel percorso indica anche le righe). PercentSum
+verifica gruppi di percentuali che devono sommare a 100 (con la tolleranza
+dell'arrotondamento a un decimale).
+
+compile_schema trasforma le regole in un albero di nodi con i controlli già
+risolti; validate_data visita i dati una sola volta e restituisce tutti gli
+errori come (percorso, messaggio).
+"""
+
+import re
+import math
+import json
+import time
+import argparse
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from data_codec import JSON_ENCODING, load_chunk
+
+DATA_DIR = "data"
+DATA_INDEX_NAME = "index.json"
+YEAR_FIELD = "anno"
+# Percentuali memorizzate con un decimale: errore di arrotondamento massimo per addendo
+PERCENT_SUM_TOLERANCE = 0.051
+PERCENT_TEXT_PATTERN = re.compile(r'^(?P<value>[+-]?\d+(?:[.,]\d+)?)%$')
+# Errori mostrati per bundle prima del riepilogo
+MAX_REPORTED_ERRORS = 20
+
+# Sezioni di dashboardData caricate su richiesta da main.js (un chunk ciascuna)
+SECTIONS = (
+    "demografia",
+    "mercato_lavoro",
+    "entrate_vigilanza",
+    "ammortizzatori",
+    "pensioni",
+    "assistenza",
+    "relazioni_utenza",
+    "organizzazione",
+    "contenzioso",
+    "patrimonio"
+)
+
+Field = namedtuple('Field', 'path kind')
+Required = namedtuple('Required', 'path keys')
+PercentSum = namedtuple('PercentSum', 'path parts')
+
+def _is_number(value):
+    # type() invece di isinstance: esclude bool senza un secondo controllo
+    return type(value) in (int, float) and math.isfinite(value)
+
+def _number(low=None, high=None, integer=False):
+    """Controllo di un valore numerico nell'intervallo [low, high]"""
+    expected = ("intero" if integer else "numero") + (
+        f" tra {low} e {high}" if low is not None and high is not None else
+        f" ≥ {low}" if low is not None else ""
+    )
+
+    def check(value):
+        if not _is_number(value) or (integer and type(value) is not int):
+            return f"atteso {expected}, trovato {value!r}"
+        if (low is not None and value < low) or (high is not None and value > high):
+            return f"atteso {expected}, trovato {value}"
+        return None
+    return check
+
+def _percent_text(low, high):
+    """Percentuale scritta come testo ('52.4%', '+4.5%'), con lo stesso intervallo"""
+    def check(value):
+        match = PERCENT_TEXT_PATTERN.match(value) if isinstance(value, str) else None
+        if not match:
+            return f"attesa percentuale testuale (es. '52.4%'), trovato {value!r}"
+        number = float(match.group('value').replace(',', '.'))
+        if not low <= number <= high:
+            return f"percentuale fuori intervallo [{low}, {high}]: {value}"
+        return None
+    return check
+
+def _text(value):
+    return None if isinstance(value, str) else f"atteso testo, trovato {value!r}"
+
+SKIP = 'skip'
+KINDS = {
+    'amount': _number(0),                  # conteggi, importi, ore, giorni
+    'signed': _number(),                   # saldi: possono essere negativi
+    'percent': _number(0, 100),
+    'signed_percent': _number(-100, 100),  # incidenze e variazioni
+    'age': _number(0, 130),                # età e speranza di vita
+    'year': _number(1900, 2100, integer=True),
+    'text': _text,
+    'percent_text': _percent_text(0, 100),
+    'change_text': _percent_text(-100, 100),
+}
+DEFAULT_KIND = 'amount'
+
+# Convenzioni sui nomi delle chiavi (la prima che corrisponde vale anche per il sottoalbero)
+CONVENTIONS = [
+    (re.compile(r'^title$'), 'text'),
+    (re.compile(r'^anno$'), 'year'),
+    (re.compile(r'^favorevole_'), 'percent_text'),
+    (re.compile(r'^incidenza'), 'signed_percent'),
+    (re.compile(r'saldo'), 'signed'),
+    (re.compile(r'^tasso_|(^|_)perc(entuale)?(_|$)'), 'percent'),
+]
+
+FIELDS = [
+    Field("metadata", "text"),
+    Field("metadata.anno", "year"),
+    Field("kpi.tasso_occupazione", "percent"),
+    Field("kpi.crescita_entrate", "change_text"),
+    # Array dei grafici aggiunti ai chunk da derived_metrics: derivati da dati già validati
+    Field("*.grafici", SKIP),
+    Field("demografia.popolazione.percentuali", "percent"),
+    # Nascite e decessi non sono saldi, anche se stanno sotto saldo_naturale
+    Field("demografia.saldo_naturale", "amount"),
+    Field("demografia.saldo_naturale.incidenza_2023", "amount"),
+    Field("demografia.longevita", "age"),
+    Field("entrate_vigilanza.entrate_contributive.variazione_percentuale_2024", "signed_percent"),
+    Field("relazioni_utenza.presentazione_pratiche.per_canale", "percent"),
+    Field("organizzazione.personale.eta_media", "age"),
+    Field("contenzioso.amministrativo.risolti_amministrativamente", "percent_text"),
+    Field("contenzioso.giudiziario_ordinario.giudizi_definiti", "percent_text"),
+]
+
+REQUIRED = [
+    Required("", ("metadata", "kpi") + SECTIONS),
+    # KPI mostrati nell'header di tutte le pagine (data-bind)
+    Required("kpi", ("popolazione_totale", "tasso_occupazione", "pensionati_totale", "crescita_entrate")),
+]
+
+PERCENT_SUMS = [
+    PercentSum("demografia.popolazione.percentuali", ("femmine", "maschi")),
+    PercentSum("demografia.popolazione.percentuali", ("0-14", "15-64", "65_e_oltre")),
+    PercentSum("demografia.popolazione.confronti.*", ("femmine_perc", "maschi_perc")),
+    PercentSum("demografia.popolazione.confronti.*", ("0-14_perc", "15-64_perc", "65_e_oltre_perc")),
+    PercentSum("relazioni_utenza.presentazione_pratiche.per_canale", ("patronato", "cittadino")),
+]
+
+class SchemaNode:
+    """Nodo dello schema compilato: figli per chiave, figlio '*', tipo e controlli"""
+    __slots__ = ('children', 'wildcard', 'kind', 'required', 'sums')
+
+    def __init__(self):
+        self.children = {}
+        self.wildcard = None
+        self.kind = None
+        self.required = ()
+        self.sums = ()
+
+    def child(self, key):
+        return self.children.get(key) or self.wildcard
+
+def _node_at(root, path):
+    node = root
+    for key in path.split('.') if path else ():
+        if key == '*':
+            node.wildcard = node.wildcard or SchemaNode()
+            node = node.wildcard
+        else:
+            node = node.children.setdefault(key, SchemaNode())
+    return node
+
+def _merge(target, source):
+    """Regole di `source` aggiunte a `target` (quelle già presenti in target prevalgono)"""
+    target.kind = target.kind or source.kind
+    target.required = target.required + source.required
+    target.sums = target.sums + source.sums
+    for key, child in source.children.items():
+        _merge(target.children.setdefault(key, SchemaNode()), child)
+    if source.wildcard is not None:
+        target.wildcard = target.wildcard or SchemaNode()
+        _merge(target.wildcard, source.wildcard)
+
+def _resolve_wildcards(node):
+    """Le regole sotto '*' valgono anche per i figli con regole proprie"""
+    if node.wildcard is not None:
+        for child in node.children.values():
+            _merge(child, node.wildcard)
+        _resolve_wildcards(node.wildcard)
+    for child in node.children.values():
+        _resolve_wildcards(child)
+
+def compile_schema(fields=FIELDS, required=REQUIRED, percent_sums=PERCENT_SUMS):
+    """Albero di SchemaNode con tipi e controlli già associati ai percorsi"""
+    root = SchemaNode()
+    for field in fields:
+        if field.kind != SKIP and field.kind not in KINDS:
+            raise ValueError(f"Tipo sconosciuto nello schema: {field.kind} ({field.path})")
+        _node_at(root, field.path).kind = field.kind
+    for rule in required:
+        node = _node_at(root, rule.path)
+        node.required = node.required + tuple(rule.keys)
+    for rule in percent_sums:
+        node = _node_at(root, rule.path)
+        node.sums = node.sums + (tuple(rule.parts),)
+    _resolve_wildcards(root)
+    return root
+
+@lru_cache(maxsize=None)
+def key_kind(key):
+    """Tipo dato dal nome della chiave (None se nessuna convenzione corrisponde)"""
+    for pattern, kind in CONVENTIONS:
+        if pattern.search(key):
+            return kind
+    return None
+
+def _location(path):
+    return '.'.join(str(key) for key in path) or '(radice)'
+
+def _check_series(rows, path, errors):
+    """Serie storica: righe oggetto con gli stessi campi e anni strettamente crescenti"""
+    if not all(isinstance(row, dict) for row in rows):
+        errors.append((_location(path), "attesa una lista di righe {anno: ..., ...}"))
+        return False
+    if not rows:
+        return True
+    fields = rows[0].keys()
+    previous = None
+    for index, row in enumerate(rows):
+        if row.keys() != fields:
+            errors.append((_location(path + (index,)),
+                           f"campi diversi dalla prima riga: {sorted(row)} invece di {sorted(fields)}"))
+        year = row.get(YEAR_FIELD)
+        if YEAR_FIELD in fields and _is_number(year):
+            if previous is not None and year <= previous:
+                errors.append((_location(path + (index, YEAR_FIELD)),
+                               f"anni non crescenti: {year} dopo {previous}"))
+            previous = year
+    return True
+
+def _check_sums(value, node, path, errors):
+    for parts in node.sums:
+        values = [value.get(part) for part in parts]
+        if not all(_is_number(v) for v in values):
+            continue
+        total = math.fsum(values)
+        if abs(total - 100) > PERCENT_SUM_TOLERANCE * len(parts):
+            errors.append((_location(path), f"{' + '.join(parts)} = {round(total, 2)}, atteso 100"))
+
+def _walk(value, node, kind, path, errors):
+    if isinstance(value, dict):
+        if node is not None:
+            for key in node.required:
+                if key not in value:
+                    errors.append((_location(path + (key,)), "chiave obbligatoria mancante"))
+            if node.sums:
+                _check_sums(value, node, path, errors)
+        for key, child in value.items():
+            child_node = node.child(key) if node is not None else None
+            child_kind = (child_node.kind if child_node is not None and child_node.kind
+                          else key_kind(key) or kind)
+            if child_kind == SKIP:
+                continue
+            if isinstance(child, (dict, list)):
+                _walk(child, child_node, child_kind, path + (key,), errors)
+            else:
+                # Foglie controllate sul posto: il percorso si costruisce solo per gli errori
+                message = KINDS[child_kind or DEFAULT_KIND](child)
+                if message:
+                    errors.append((_location(path + (key,)), message))
+    elif isinstance(value, list):
+        if _check_series(value, path, errors):
+            row_node = node.wildcard if node is not None else None
+            for index, row in enumerate(value):
+                _walk(row, row_node, kind, path + (index,), errors)
+    else:
+        message = KINDS[kind or DEFAULT_KIND](value)
+        if message:
+            errors.append((_location(path), message))
+
+SCHEMA = compile_schema()
+
+def validate_data(data, schema=SCHEMA):
+    """Errori di dashboardData rispetto allo schema: lista di (percorso, messaggio)"""
+    errors = []
+    if not isinstance(data, dict):
+        return [(_location(()), "dashboardData deve essere un oggetto")]
+    _walk(data, schema, None, (), errors)
+    return errors
+
+def load_bundle(bundle_dir):
+    """dashboardData ricomposto da data/index.json e dai chunk (None se non c'è l'indice)"""
+    data_dir = Path(bundle_dir) / DATA_DIR
+    try:
+        with open(data_dir / DATA_INDEX_NAME, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    data = {key: index[key] for key in ("metadata", "kpi") if key in index}
+    for section, entry in index.get("sections", {}).items():
+        data[section] = load_chunk(data_dir / entry["file"], index.get("encoding", JSON_ENCODING))
+    return data
+
+def report_errors(errors, limit=MAX_REPORTED_ERRORS):
+    for location, message in errors[:limit]:
+        print(f"   ❌ {location}: {message}")
+    if len(errors) > limit:
+        print(f"   … altri {len(errors) - limit} errori")
+
+def main():
+    """Valida i dati pubblicati di uno o più bundle (progetto, build o provinces/<slug>)"""
+    parser = argparse.ArgumentParser(
+        description='Valida dashboardData (data/index.json e chunk) rispetto allo schema'
+    )
+    parser.add_argument(
+        'bundles',
+        nargs='*',
+        default=['.'],
+        help='Directory con data/index.json, ad es. provinces/* (default: directory corrente)'
+    )
+    args = parser.parse_args()
+
+    print("🔍 VALIDAZIONE SCHEMA DEI DATI")
+    print("=" * 50)
+    failed = 0
+    validated = 0
+    elapsed = 0.0
+    for bundle in args.bundles:
+        if not Path(bundle).is_dir():
+            continue  # ad es. provinces/batch_report.json con provinces/*
+        data = load_bundle(bundle)
+        if data is None:
+            print(f"⚠️  {bundle}: {DATA_DIR}/{DATA_INDEX_NAME} non trovato")
+            continue
+        started = time.perf_counter()
+        errors = validate_data(data)
+        elapsed += time.perf_counter() - started
+        validated += 1
+        if errors:
+            failed += 1
+            print(f"❌ {bundle}: {len(errors)} errori")
+            report_errors(errors)
+        else:
+            print(f"✅ {bundle}")
+    if validated:
+        print(f"\n⏱️  {validated} bundle validati in {elapsed * 1000:.1f} ms "
+              f"({elapsed / validated * 1000:.2f} ms ciascuno)")
+    raise SystemExit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
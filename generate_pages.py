@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Page Generator - Dashboard Socio-Economica
+Genera le pagine di dashboard/ (una per sezione) da un unico template
+
+Ogni pagina è templates/section.html con il markup della sezione preso da
+index.html, la navigazione verso le altre pagine e i valori data-bind letti
+dal chunk della sezione in data/. Le pagine caricano gli stessi css/style.css,
+js/sections.js e js/main.js di index.html, quindi condividono la cache del
+browser; main.js scarica solo l'indice e il chunk della sezione della pagina.
+
+Aggiungere una sezione a index.html (pulsante di navigazione e <section>) e
+al chunk dei dati basta a generarne la pagina.
+"""
+
+import re
+import html
+import argparse
+from string import Template
+from pathlib import Path
+
+from prerender import DATA_INDEX_NAME, load_page_data, fill_bindings
+
+SOURCE_PAGE = "index.html"
+TEMPLATE_PATH = "templates/section.html"
+PAGES_DIR = "dashboard"
+DATA_DIR = "data"
+# Percorso della radice del sito visto dalle pagine generate
+PAGES_ROOT = "../"
+
+NAV_BUTTON_PATTERN = re.compile(
+    r'<button\s+class="tab-button[^"]*"\s+data-section="(?P<id>[\w-]+)">(?P<label>.*?)</button>',
+    re.DOTALL
+)
+SECTION_OPEN_PATTERN = re.compile(r'^(?P<indent>[ \t]*)<section\s+id="(?P<id>[\w-]+)"\s+class="section-content[^"]*">',
+                                  re.MULTILINE)
+SECTION_CLOSE = '</section>'
+HEADING_PATTERN = re.compile(r'<h1\b[^>]*>(?P<text>.*?)</h1>', re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+def plain_text(fragment):
+    """Testo di un frammento HTML su una riga"""
+    return ' '.join(html.unescape(TAG_PATTERN.sub('', fragment)).split())
+
+def read_sections(page_html):
+    """(id, etichetta, markup) delle sezioni di index.html, nell'ordine della navigazione"""
+    labels = {match.group('id'): plain_text(match.group('label'))
+              for match in NAV_BUTTON_PATTERN.finditer(page_html)}
+    sections = []
+    for match in SECTION_OPEN_PATTERN.finditer(page_html):
+        # Le sezioni non sono annidate: la prima chiusura allo stesso rientro è la loro
+        closing = page_html.index('\n' + match.group('indent') + SECTION_CLOSE, match.end())
+        markup = page_html[match.start():closing + 1 + len(match.group('indent')) + len(SECTION_CLOSE)]
+        section = match.group('id')
+        sections.append((section, labels.get(section, section), markup))
+    order = list(labels)
+    return sorted(sections, key=lambda item: order.index(item[0]) if item[0] in order else len(order))
+
+def section_title(section, label, markup):
+    heading = HEADING_PATTERN.search(markup)
+    return plain_text(heading.group('text')) if heading else label
+
+def active_markup(markup):
+    """La sezione della pagina è sempre quella attiva (main.js e prerender la cercano così)"""
+    return SECTION_OPEN_PATTERN.sub(
+        lambda match: f'{match.group("indent")}<section id="{match.group("id")}" class="section-content active">',
+        markup, count=1
+    )
+
+def render_nav(sections, current):
+    links = [f'                <a class="tab-button" href="{PAGES_ROOT}index.html">← Dashboard</a>']
+    for section, label, _ in sections:
+        active = ' active' if section == current else ''
+        links.append(f'                <a class="tab-button{active}" href="{section}.html">{html.escape(label)}</a>')
+    return '\n'.join(links)
+
+def render_page(template, sections, section, data):
+    """HTML della pagina di una sezione; `data` (metadata, KPI e chunk) può essere None"""
+    label, markup = next((label, markup) for name, label, markup in sections if name == section)
+    page_html = template.substitute(
+        title=html.escape(section_title(section, label, markup)),
+        root=PAGES_ROOT,
+        nav=render_nav(sections, section),
+        content=active_markup(markup)
+    )
+    if data is not None:
+        page_html = fill_bindings(page_html, data, {'bindings': 0})
+    return page_html
+
+def render_pages(project_dir=Path(".")):
+    """Pagine delle sezioni in memoria: {percorso relativo: html}"""
+    project_dir = Path(project_dir)
+    template = Template((project_dir / TEMPLATE_PATH).read_text(encoding='utf-8'))
+    sections = read_sections((project_dir / SOURCE_PAGE).read_text(encoding='utf-8'))
+    data_dir = project_dir / DATA_DIR
+    has_data = (data_dir / DATA_INDEX_NAME).exists()
+    if not has_data:
+        print(f"⚠️  {data_dir / DATA_INDEX_NAME} non trovato: pagine generate senza valori dei dati")
+
+    pages = {}
+    for section, _, _ in sections:
+        data = load_page_data(data_dir, [section]) if has_data else None
+        if data is not None and section not in data:
+            print(f"⚠️  Sezione {section} senza chunk in {DATA_DIR}/{DATA_INDEX_NAME}")
+        pages[f"{PAGES_DIR}/{section}.html"] = render_page(template, sections, section, data)
+    return sections, pages
+
+def generate_pages(project_dir=Path("."), pages_dir=None, check=False):
+    """Scrive (o con check=True confronta) le pagine delle sezioni.
+    Restituisce le pagine cambiate rispetto a quelle su disco."""
+    project_dir = Path(project_dir)
+    pages_dir = Path(pages_dir) if pages_dir else project_dir / PAGES_DIR
+    sections, pages = render_pages(project_dir)
+
+    changed = []
+    for page, page_html in pages.items():
+        target = pages_dir / Path(page).name
+        if target.exists() and target.read_text(encoding='utf-8') == page_html:
+            continue
+        changed.append(target)
+        if not check:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(page_html, encoding='utf-8')
+    return sections, changed
+
+def main():
+    """Genera le pagine di dashboard/ a partire da index.html, template e dati"""
+    parser = argparse.ArgumentParser(
+        description='Genera una pagina per sezione in dashboard/ da templates/section.html'
+    )
+    parser.add_argument(
+        '--output',
+        help=f'Directory delle pagine generate (default: {PAGES_DIR})'
+    )
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Non scrive nulla: esce con codice 1 se le pagine non sono aggiornate'
+    )
+    args = parser.parse_args()
+
+    print("📄 GENERAZIONE PAGINE DI SEZIONE")
+    print("=" * 50)
+    sections, changed = generate_pages(Path("."), args.output, args.check)
+    if args.check:
+        for path in changed:
+            print(f"❌ {path} non aggiornata: esegui 'python generate_pages.py'")
+        if changed:
+            raise SystemExit(1)
+        print(f"✅ {len(sections)} pagine aggiornate")
+        return
+    for path in changed:
+        print(f"✅ {path}")
+    print(f"✅ {len(sections)} pagine di sezione ({len(changed)} riscritte)")
+
+if __name__ == "__main__":
+    main()
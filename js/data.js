@@ -338,6 +338,11 @@ const dashboardData = {
       confronti_2024: {
         regione_marche: 2532627422.36,
         italia: 127262994462.03
+      },
+      variazione_percentuale_2024: {
+        pesaro_urbino: 4.5,
+        regione_marche: 2.2,
+        italia: 3.3
       }
     },
 
@@ -352,6 +357,11 @@ const dashboardData = {
 
     riscossione_coattiva: {
       title: "Riscossione coattiva AdER per gestione - 2024",
+      serie_storica: [
+        { anno: 2022, importo: 14581190.56 },
+        { anno: 2023, importo: 12175738.84 },
+        { anno: 2024, importo: 22418626.81 }
+      ],
       gestioni: {
         aziende_uniemens: 12253147.94,
         gestione_agricola_datori: 234408.15,
@@ -400,9 +410,9 @@ const dashboardData = {
     durc: {
       title: "DURC - Documento Unico di Regolarità Contributiva",
       evoluzione: [
-        { anno: 2022, regolari: 24300, irregolari: 3093, perc_irregolari: 11.3 },
-        { anno: 2023, regolari: 24342, irregolari: 2905, perc_irregolari: 10.7 },
-        { anno: 2024, regolari: 23872, irregolari: 2560, perc_irregolari: 9.7 }
+        { anno: 2022, regolari: 24300, irregolari: 3093, perc_irregolari: 11.3, perc_irregolari_marche: 12.6, perc_irregolari_italia: 17.3 },
+        { anno: 2023, regolari: 24342, irregolari: 2905, perc_irregolari: 10.7, perc_irregolari_marche: 10.8, perc_irregolari_italia: 16.3 },
+        { anno: 2024, regolari: 23872, irregolari: 2560, perc_irregolari: 9.7, perc_irregolari_marche: 10.3, perc_irregolari_italia: 16.2 }
       ]
     }
   },
@@ -643,12 +653,14 @@ const dashboardData = {
       2023: {
         accesso_sede: 11224,
         ricontatto_telefonico: 5535,
-        web_meeting: 24
+        web_meeting: 24,
+        totale: 16783
       },
       2024: {
         accesso_sede: 8652,
         ricontatto_telefonico: 5214,
-        web_meeting: 63
+        web_meeting: 63,
+        totale: 13929
       }
     },
 
@@ -674,6 +686,22 @@ const dashboardData = {
       title: "Flusso PEC - Posta Elettronica Certificata",
       2023: { inviate: 12866, ricevute: 18125 },
       2024: { inviate: 14410, ricevute: 19919 }
+    },
+
+    presentazione_pratiche: {
+      title: "Pratiche per canale di presentazione - 2024",
+      per_canale: {
+        patronato: 61.0,
+        cittadino: 39.0
+      },
+      per_argomento: {
+        pensioni: { patronato: 9904, cittadino: 1126 },
+        invalidita_civile: { patronato: 4131, cittadino: 346 },
+        assistenziali: { patronato: 2071, cittadino: 571 },
+        disoccupazione: { patronato: 14509, cittadino: 3521 },
+        famiglia: { patronato: 3418, cittadino: 11840 },
+        ricostituzioni: { patronato: 6161, cittadino: 4141 }
+      }
     }
   },
 
@@ -711,12 +739,12 @@ const dashboardData = {
       ],
       eta_media: {
         evoluzione: [
-          { anno: 2019, eta: 58.4 },
-          { anno: 2020, eta: 58.3 },
-          { anno: 2021, eta: 57.6 },
-          { anno: 2022, eta: 56.0 },
-          { anno: 2023, eta: 53.4 },
-          { anno: 2024, eta: 53.1 }
+          { anno: 2019, eta: 58.4, eta_marche: 59.7, eta_italia: 58.1 },
+          { anno: 2020, eta: 58.3, eta_marche: 59.2, eta_italia: 57.3 },
+          { anno: 2021, eta: 57.6, eta_marche: 58.5, eta_italia: 56.6 },
+          { anno: 2022, eta: 56.0, eta_marche: 57.6, eta_italia: 55.5 },
+          { anno: 2023, eta: 53.4, eta_marche: 54.2, eta_italia: 52.0 },
+          { anno: 2024, eta: 53.1, eta_marche: 53.6, eta_italia: 51.3 }
         ]
       }
     }
@@ -789,6 +817,14 @@ const dashboardData = {
       distribuzione: {
         numero_fabbricati: 4,
         numero_unita_agricole: 0
+      },
+      per_provincia_2024: {
+        title: "Patrimonio da reddito per provincia delle Marche - 2024",
+        pesaro_urbino: { valore_euro: 13839976.4, unita: 4 },
+        ancona: { valore_euro: 13747028.9, unita: 39 },
+        fermo: { valore_euro: 982543.4, unita: 14 },
+        ascoli_piceno: { valore_euro: 678445.1, unita: 10 },
+        macerata: { valore_euro: 21932.6, unita: 9 }
       }
     }
   },
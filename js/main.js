@@ -3,8 +3,37 @@
 
 class Dashboard {
     constructor() {
+        // Registro dei grafici: istanze vive per canvas, configurazioni e grafici in attesa di visibilità
         this.charts = {};
-        this.currentSection = 'demografia';
+        this.chartConfigs = {};
+        this.pendingCharts = {};
+        this.renderedSections = {};
+        this.zoomCanvas = null;
+        this.zoomChart = null;
+        // I grafici vengono creati solo quando il canvas entra (quasi) nel viewport
+        this.chartObserver = typeof IntersectionObserver !== 'undefined'
+            ? new IntersectionObserver(entries => this.onChartsVisible(entries), { rootMargin: '200px' })
+            : null;
+        // Sezione attiva nell'HTML: 'demografia' in index.html, quella della pagina in dashboard/
+        const activeSection = document.querySelector('.section-content.active');
+        this.currentSection = activeSection ? activeSection.id : 'demografia';
+        // Percorso della radice del sito (data-root="../" nelle pagine di dashboard/)
+        const root = document.body.dataset.root || '';
+        // Dati: js/data.js se incluso nella pagina, altrimenti chunk JSON per sezione
+        this.data = typeof dashboardData !== 'undefined' ? dashboardData : null;
+        this.dataBaseUrl = root + 'data/';
+        // Serie storiche di tutte le edizioni RSP (server.py); senza API si usano quelle del chunk
+        this.seriesApiUrl = root + 'api/series';
+        // Anni mostrati dai grafici delle serie demografiche (gli ultimi disponibili)
+        this.seriesChartYears = 11;
+        // Notifiche di server.py quando vengono pubblicati nuovi dati
+        this.eventsUrl = root + 'api/events';
+        this.eventSource = null;
+        // Service worker della build (data-service-worker aggiunto da optimize.py)
+        this.serviceWorkerUrl = document.body.dataset.serviceWorker || null;
+        this.refreshing = null;
+        this.dataIndex = null;
+        this.sectionRequests = {};
         this.colors = {
             primary: '#f97316',
             secondary: '#06b6d4',
@@ -19,12 +48,28 @@ class Dashboard {
 
     init() {
         this.setupEventListeners();
+        this.registerServiceWorker();
         this.loadDashboard();
     }
 
+    // Shell e dati in cache per visite successive immediate e uso offline
+    registerServiceWorker() {
+        if (!this.serviceWorkerUrl || !('serviceWorker' in navigator)) return;
+        // Nuova versione dei dati scoperta dal service worker: si applicano i delta come per gli eventi SSE
+        navigator.serviceWorker.addEventListener('message', (event) => {
+            const message = event.data || {};
+            if (message.type === 'data-version' && this.dataIndex && message.version !== this.dataIndex.version) {
+                this.refreshData();
+            }
+        });
+        navigator.serviceWorker.register(this.serviceWorkerUrl).catch(error => {
+            console.warn('Service worker not registered:', error);
+        });
+    }
+
     setupEventListeners() {
-        // Tab navigation
-        document.querySelectorAll('.tab-button').forEach(button => {
+        // Tab navigation (nelle pagine di dashboard/ le schede sono link alle altre pagine)
+        document.querySelectorAll('.tab-button[data-section]').forEach(button => {
             button.addEventListener('click', (e) => {
                 const section = e.target.dataset.section;
                 this.switchSection(section);
@@ -53,6 +98,13 @@ class Dashboard {
             }
         });
 
+        // Al ritorno sulla scheda verifica se sono stati pubblicati nuovi dati
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'visible') {
+                this.refreshData();
+            }
+        });
+
         // Internal tabs for demografia section
         document.querySelectorAll('.tab-btn-demo').forEach(button => {
             button.addEventListener('click', (e) => {
@@ -107,16 +159,27 @@ class Dashboard {
         
         overlay.classList.remove('hidden');
         
-        // Re-render chart in zoomed view
+        // Il canvas clonato viene sostituito dall'unico canvas di zoom, riusato a ogni apertura
         const canvas = clonedCard.querySelector('canvas');
-        if (canvas) {
-            const chartId = canvas.id;
-            const originalChart = this.charts[chartId];
-            if (originalChart) {
-                // Create new chart with same configuration
-                const newChart = new Chart(canvas, originalChart.config);
-                // Store reference for cleanup
-                this.zoomedChart = newChart;
+        const config = canvas && this.chartConfigs[canvas.id];
+        if (config) {
+            const snapshot = clonedCard.querySelector('.chart-snapshot');
+            if (snapshot) snapshot.remove();
+            if (!this.zoomCanvas) {
+                this.zoomCanvas = document.createElement('canvas');
+            }
+            canvas.replaceWith(this.zoomCanvas);
+            // Copia dei dataset: il grafico di zoom non deve condividere lo stato con l'originale
+            const zoomConfig = {
+                type: config.type,
+                data: { labels: config.data.labels, datasets: config.data.datasets.map(dataset => ({ ...dataset })) },
+                options: config.options
+            };
+            if (this.zoomChart && this.zoomChart.config.type === config.type) {
+                this.updateChart(this.zoomChart, zoomConfig);
+            } else {
+                if (this.zoomChart) this.zoomChart.destroy();
+                this.zoomChart = new Chart(this.zoomCanvas, zoomConfig);
             }
         }
     }
@@ -124,12 +187,7 @@ class Dashboard {
     closeZoom() {
         const overlay = document.getElementById('zoom-overlay');
         overlay.classList.add('hidden');
-        
-        // Destroy zoomed chart
-        if (this.zoomedChart) {
-            this.zoomedChart.destroy();
-            this.zoomedChart = null;
-        }
+        // Il grafico di zoom resta vivo (staccato dal DOM) per la prossima apertura
     }
 
     switchDemografiaTab(tabName) {
@@ -194,29 +252,239 @@ class Dashboard {
 
     async loadDashboard() {
         try {
+            // Indice leggero con metadata e KPI: le sezioni arrivano su richiesta
+            if (!this.data) {
+                this.dataIndex = await this.fetchJSON(this.dataBaseUrl + 'index.json');
+                this.data = { metadata: this.dataIndex.metadata, kpi: this.dataIndex.kpi };
+            }
+
             // Hide loading, show content
             document.getElementById('loading').classList.add('hidden');
             document.getElementById('content').classList.remove('hidden');
 
             // Load initial section
-            this.loadSectionCharts(this.currentSection);
             this.updateKPIs();
+            await this.loadSectionCharts(this.currentSection);
+            this.connectEvents();
 
         } catch (error) {
             console.error('Error loading dashboard:', error);
         }
     }
 
+    async fetchJSON(url, options) {
+        const response = await fetch(url, options);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status} loading ${url}`);
+        }
+        return response.json();
+    }
+
+    // Scarica il chunk di una sezione alla prima apertura (richieste concorrenti condivise)
+    ensureSection(sectionName) {
+        if (this.data[sectionName]) {
+            return Promise.resolve(this.data[sectionName]);
+        }
+        if (!this.sectionRequests[sectionName]) {
+            const entry = this.dataIndex && this.dataIndex.sections[sectionName];
+            if (!entry) {
+                return Promise.reject(new Error(`Section not available: ${sectionName}`));
+            }
+            const columnar = this.dataIndex.encoding === 'columnar';
+            this.sectionRequests[sectionName] = this.fetchJSON(this.dataBaseUrl + entry.file)
+                .then(chunk => {
+                    if (columnar) chunk = this.decodeColumnar(chunk);
+                    this.data[sectionName] = chunk;
+                    return chunk;
+                })
+                .catch(error => {
+                    delete this.sectionRequests[sectionName];
+                    throw error;
+                });
+        }
+        return this.sectionRequests[sectionName];
+    }
+
+    // Chunk con codifica 'columnar' (data_codec.py): {"$columns": {anno: [...], ...}} torna una lista di righe
+    decodeColumnar(value) {
+        if (Array.isArray(value)) return value.map(item => this.decodeColumnar(item));
+        if (!value || typeof value !== 'object') return value;
+        const columns = value.$columns;
+        if (columns && Object.keys(value).length === 1) {
+            const fields = Object.keys(columns);
+            const length = fields.length ? Math.min(...fields.map(field => columns[field].length)) : 0;
+            return Array.from({ length }, (_, i) => {
+                const row = {};
+                fields.forEach(field => { row[field] = columns[field][i]; });
+                return row;
+            });
+        }
+        Object.keys(value).forEach(key => { value[key] = this.decodeColumnar(value[key]); });
+        return value;
+    }
+
+    // Stream SSE di server.py: a ogni pubblicazione si aggiornano solo le sezioni cambiate
+    connectEvents() {
+        if (!this.dataIndex || this.eventSource || typeof EventSource === 'undefined') return;
+        this.eventSource = new EventSource(this.eventsUrl);
+        // 'version' arriva a ogni (ri)connessione: recupera gli eventi persi nel frattempo
+        ['version', 'data'].forEach(name => {
+            this.eventSource.addEventListener(name, (event) => {
+                const { version } = JSON.parse(event.data);
+                if (this.dataIndex && version !== this.dataIndex.version) {
+                    this.refreshData();
+                }
+            });
+        });
+        this.eventSource.onerror = () => {
+            // Hosting statico o watcher disattivato: resta il controllo su visibilitychange
+            if (this.eventSource.readyState === EventSource.CLOSED) {
+                this.eventSource = null;
+            }
+        };
+    }
+
+    // Un solo aggiornamento alla volta (evento SSE e visibilitychange possono sovrapporsi)
+    refreshData() {
+        if (!this.refreshing) {
+            this.refreshing = this.syncData().finally(() => { this.refreshing = null; });
+        }
+        return this.refreshing;
+    }
+
+    // Aggiorna i dati in memoria alla versione pubblicata applicando i delta
+    async syncData() {
+        if (!this.dataIndex) return;
+        let index;
+        try {
+            // 'no-cache': l'indice arriva dalla rete anche se il service worker ne ha una copia
+            index = await this.fetchJSON(this.dataBaseUrl + 'index.json', { cache: 'no-cache' });
+        } catch (error) {
+            return;
+        }
+        if (index.version === this.dataIndex.version) return;
+
+        // Sezioni il cui chunk è cambiato: le altre restano in memoria così come sono
+        const changed = Object.keys(index.sections).filter(section => {
+            const previous = this.dataIndex.sections[section];
+            return !previous || previous.hash !== index.sections[section].hash;
+        });
+        const stale = changed.filter(section => section in this.data);
+
+        // Catena di delta dalla versione in memoria a quella pubblicata
+        const chain = [];
+        let version = this.dataIndex.version;
+        while (version !== index.version) {
+            const step = (index.deltas || []).find(delta => delta.from === version);
+            if (!step) break;
+            chain.push(step);
+            version = step.to;
+        }
+
+        if (version === index.version && chain.length) {
+            try {
+                const deltas = await Promise.all(chain.map(step => this.fetchJSON(this.dataBaseUrl + step.file)));
+                deltas.forEach(delta => this.applyDelta(delta.ops));
+            } catch (error) {
+                stale.forEach(section => { delete this.data[section]; });
+            }
+        } else {
+            // Versione troppo vecchia: si riscaricano soltanto i chunk cambiati
+            stale.forEach(section => { delete this.data[section]; });
+        }
+
+        this.dataIndex = index;
+        changed.forEach(section => { delete this.sectionRequests[section]; });
+        this.data.metadata = index.metadata;
+        this.data.kpi = index.kpi;
+        this.updateKPIs();
+        if (changed.includes(this.currentSection)) {
+            this.loadSectionCharts(this.currentSection);
+        }
+    }
+
+    // Operazioni ["replace"|"add"|"remove", percorso, valore] (vedi scripts/data_delta.py);
+    // quelle sulle sezioni non ancora scaricate vengono ignorate
+    applyDelta(ops) {
+        ops.forEach(([action, path, value]) => {
+            if (!(path[0] in this.data)) return;
+            const parent = path.slice(0, -1).reduce((node, key) => node[key], this.data);
+            const last = path[path.length - 1];
+            if (action === 'remove') {
+                delete parent[last];
+            } else if (action === 'add' && last === '-') {
+                parent.push(value);
+            } else {
+                parent[last] = value;
+            }
+        });
+    }
+
+    // Righe {anno, ...} di una serie storica, limitate all'intervallo richiesto
+    async fetchSeries(section, indicator, { from = null, to = null } = {}) {
+        const params = new URLSearchParams({ section, indicator });
+        if (from !== null) params.set('from', from);
+        if (to !== null) params.set('to', to);
+        try {
+            const { columns } = await this.fetchJSON(`${this.seriesApiUrl}?${params}`);
+            return columns.anno.map((anno, i) => {
+                const row = { anno };
+                Object.keys(columns).forEach(field => { row[field] = columns[field][i]; });
+                return row;
+            });
+        } catch (error) {
+            // Hosting statico (nessuna API): serie dell'edizione corrente
+            const rows = indicator.split('.').reduce((node, key) => node[key], this.data[section]);
+            return rows.filter(d => (from === null || d.anno >= from) && (to === null || d.anno <= to));
+        }
+    }
+
     updateKPIs() {
-        const kpis = dashboardData.kpi;
-        
-        document.getElementById('kpi-popolazione').textContent = kpis.popolazione_totale.toLocaleString('it-IT');
-        document.getElementById('kpi-occupazione').textContent = kpis.tasso_occupazione + '%';
-        document.getElementById('kpi-pensionati').textContent = kpis.pensionati_totale.toLocaleString('it-IT');
-        document.getElementById('kpi-entrate').textContent = kpis.crescita_entrate;
+        this.applyBindings();
+    }
+
+    // Elementi data-bind="percorso.nei.dati" (gli stessi riempiti da prerender.py nella build):
+    // si aggiornano quelli la cui sezione è già in memoria
+    applyBindings() {
+        document.querySelectorAll('[data-bind]').forEach(element => {
+            const path = element.dataset.bind.split('.');
+            if (!(path[0] in this.data)) return;
+            const value = path.reduce((node, key) => (node == null ? undefined : node[key]), this.data);
+            if (value === undefined || value === null) return;
+            const text = this.formatValue(value, element.dataset.format || 'text');
+            if (element.textContent !== text) {
+                element.textContent = text;
+            }
+        });
     }
 
-    loadSectionCharts(sectionName) {
+    // Formato italiano (punto per le migliaia, virgola decimale), identico a prerender.format_value
+    formatValue(value, format) {
+        if (format === 'text' || typeof value !== 'number') return String(value);
+        const [integer, fraction] = Math.abs(value).toFixed(format === 'int' ? 0 : 1).split('.');
+        const sign = value < 0 && /[1-9]/.test(integer + (fraction || '')) ? '-' : '';
+        const text = sign + integer.replace(/\B(?=(\d{3})+(?!\d))/g, '.') + (fraction ? ',' + fraction : '');
+        return format === 'percent' ? text + '%' : text;
+    }
+
+    async loadSectionCharts(sectionName) {
+        try {
+            await this.ensureSection(sectionName);
+        } catch (error) {
+            console.error(`Error loading section ${sectionName}:`, error);
+            return;
+        }
+
+        // L'utente potrebbe aver cambiato sezione durante il download
+        if (sectionName !== this.currentSection) return;
+        this.applyBindings();
+
+        // Grafici già registrati per questa versione della sezione: restano vivi così come sono
+        const entry = this.dataIndex && this.dataIndex.sections[sectionName];
+        const version = entry ? entry.hash : 'static';
+        if (this.renderedSections[sectionName] === version) return;
+        this.renderedSections[sectionName] = version;
+
         switch (sectionName) {
             case 'demografia':
                 this.loadDemografiaCharts();
@@ -251,9 +519,31 @@ class Dashboard {
         }
     }
 
-    loadDemografiaCharts() {
+    // Ultimi `years` anni di una serie: dal chunk quando li contiene tutti (nessuna
+    // richiesta in più), altrimenti solo la finestra mancante da /api/series
+    async seriesRows(section, indicator, years) {
+        const rows = indicator.split('.').reduce((node, key) => (node == null ? undefined : node[key]), this.data[section]);
+        if (!Array.isArray(rows) || !rows.length) {
+            return this.fetchSeries(section, indicator);
+        }
+        const to = rows[rows.length - 1].anno;
+        const from = to - years + 1;
+        const window = rows.filter(d => d.anno >= from && d.anno <= to);
+        if (window.length === years) return window;
+        return this.fetchSeries(section, indicator, { from, to });
+    }
+
+    async loadDemografiaCharts() {
+        const saldoIndicator = 'saldo_naturale.serie_storica';
+        const bilancioIndicator = 'flussi_migratori.saldo_demografico.serie_storica';
+        const [saldoData, bilancioData] = await Promise.all([
+            this.seriesRows('demografia', saldoIndicator, this.seriesChartYears),
+            this.seriesRows('demografia', bilancioIndicator, this.seriesChartYears)
+        ]);
+        const purple = this.colors.chart[5];
+
         // Popolazione per genere e età
-        const popolazioneData = dashboardData.demografia.popolazione;
+        const popolazioneData = this.data.demografia.popolazione;
         this.createChart('chart-popolazione', {
             type: 'doughnut',
             data: {
@@ -276,44 +566,33 @@ class Dashboard {
             }
         });
 
-        // Saldo naturale
-        const saldoData = dashboardData.demografia.saldo_naturale.serie_storica;
-        this.createChart('chart-saldo-naturale', {
-            type: 'line',
+        // Saldo naturale: nascite e decessi (asse sinistro) con il saldo (asse destro)
+        this.createChart('naturalBalanceChart', {
+            type: 'bar',
             data: {
-                labels: saldoData.map(d => d.anno),
-                datasets: [{
-                    label: 'Saldo Naturale',
-                    data: saldoData.map(d => d.saldo),
-                    borderColor: this.colors.error,
-                    backgroundColor: this.colors.error + '20',
-                    tension: 0.4,
-                    fill: true
-                }]
+                labels: saldoData.map(d => String(d.anno)),
+                datasets: [
+                    { type: 'line', label: 'Saldo Naturale', data: saldoData.map(d => d.saldo), borderColor: purple, tension: 0.3, yAxisID: 'y1' },
+                    { label: 'Nascite', data: saldoData.map(d => d.nascite), backgroundColor: this.colors.success, borderRadius: 5, yAxisID: 'y' },
+                    { label: 'Decessi', data: saldoData.map(d => d.decessi), backgroundColor: this.colors.error, borderRadius: 5, yAxisID: 'y' }
+                ]
             },
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
                 scales: {
-                    y: {
-                        ticks: { color: '#e2e8f0' },
-                        grid: { color: '#334155' }
-                    },
-                    x: {
-                        ticks: { color: '#e2e8f0' },
-                        grid: { color: '#334155' }
-                    }
+                    x: { grid: { display: false }, ticks: { color: '#94a3b8' } },
+                    y: { position: 'left', title: { display: true, text: 'Nascite / Decessi' }, grid: { color: 'rgba(255, 255, 255, 0.1)' }, ticks: { color: '#94a3b8' } },
+                    y1: { position: 'right', grid: { display: false }, title: { display: true, text: 'Saldo' }, ticks: { color: '#94a3b8' } }
                 },
                 plugins: {
-                    legend: {
-                        labels: { color: '#e2e8f0' }
-                    }
+                    legend: { position: 'bottom', labels: { color: '#cbd5e1' } }
                 }
             }
         });
 
         // Longevità
-        const longevitaData = dashboardData.demografia.longevita.data;
+        const longevitaData = this.data.demografia.longevita.data;
         this.createChart('chart-longevita', {
             type: 'bar',
             data: {
@@ -351,50 +630,28 @@ class Dashboard {
             }
         });
 
-        // Flussi migratori
-        const flussiData = dashboardData.demografia.flussi_migratori.saldo_demografico.serie_storica;
-        this.createChart('chart-flussi-migratori', {
-            type: 'line',
+        // Bilancio demografico: saldi naturale e migratorio impilati, totale come linea
+        this.createChart('demographicBalanceChart', {
+            type: 'bar',
             data: {
-                labels: flussiData.map(d => d.anno),
-                datasets: [{
-                    label: 'Saldo Migratorio',
-                    data: flussiData.map(d => d.saldo_migratorio),
-                    borderColor: this.colors.success,
-                    backgroundColor: this.colors.success + '20',
-                    tension: 0.4
-                }, {
-                    label: 'Saldo Naturale',
-                    data: flussiData.map(d => d.saldo_naturale),
-                    borderColor: this.colors.error,
-                    backgroundColor: this.colors.error + '20',
-                    tension: 0.4
-                }, {
-                    label: 'Saldo Demografico',
-                    data: flussiData.map(d => d.saldo_demografico),
-                    borderColor: this.colors.primary,
-                    backgroundColor: this.colors.primary + '20',
-                    tension: 0.4,
-                    borderWidth: 3
-                }]
+                labels: bilancioData.map(d => String(d.anno)),
+                datasets: [
+                    { label: 'Saldo Naturale', data: bilancioData.map(d => d.saldo_naturale), backgroundColor: this.colors.error, borderRadius: 5 },
+                    { label: 'Saldo Migratorio', data: bilancioData.map(d => d.saldo_migratorio), backgroundColor: this.colors.success, borderRadius: 5 },
+                    { type: 'line', label: 'Saldo Demografico Totale', data: bilancioData.map(d => d.saldo_demografico), borderColor: purple, tension: 0.3, pointBackgroundColor: purple, pointRadius: 4 }
+                ]
             },
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
+                interaction: { mode: 'index', intersect: false },
                 scales: {
-                    y: {
-                        ticks: { color: '#e2e8f0' },
-                        grid: { color: '#334155' }
-                    },
-                    x: {
-                        ticks: { color: '#e2e8f0' },
-                        grid: { color: '#334155' }
-                    }
+                    x: { grid: { display: false }, ticks: { color: '#94a3b8' } },
+                    y: { beginAtZero: true, stacked: true, grid: { color: 'rgba(255, 255, 255, 0.1)' }, ticks: { color: '#94a3b8' } }
                 },
                 plugins: {
-                    legend: {
-                        labels: { color: '#e2e8f0' }
-                    }
+                    legend: { position: 'bottom', labels: { color: '#cbd5e1' } },
+                    tooltip: { position: 'nearest' }
                 }
             }
         });
@@ -402,7 +659,7 @@ class Dashboard {
 
     loadMercatoLavoroCharts() {
         // Lavoratori per categoria
-        const lavoratoriData = dashboardData.mercato_lavoro.lavoratori;
+        const lavoratoriData = this.data.mercato_lavoro.lavoratori;
         this.createChart('chart-lavoratori-categoria', {
             type: 'pie',
             data: {
@@ -432,7 +689,7 @@ class Dashboard {
         });
 
         // Tasso di occupazione per fascia d'età
-        const occupazioneData = dashboardData.mercato_lavoro.indicatori_occupazione.tasso_occupazione;
+        const occupazioneData = this.data.mercato_lavoro.indicatori_occupazione.tasso_occupazione;
         this.createChart('chart-tasso-occupazione', {
             type: 'bar',
             data: {
@@ -484,8 +741,8 @@ class Dashboard {
         });
 
         // Assunzioni vs Cessazioni
-        const assunzioniData = dashboardData.mercato_lavoro.assunzioni.confronto;
-        const cessazioniData = dashboardData.mercato_lavoro.cessazioni.confronto;
+        const assunzioniData = this.data.mercato_lavoro.assunzioni.confronto;
+        const cessazioniData = this.data.mercato_lavoro.cessazioni.confronto;
         this.createChart('chart-assunzioni-cessazioni', {
             type: 'bar',
             data: {
@@ -523,7 +780,7 @@ class Dashboard {
         });
 
         // Retribuzioni per settore
-        const retribuzioniData = dashboardData.mercato_lavoro.retribuzioni.settore_privato;
+        const retribuzioniData = this.data.mercato_lavoro.retribuzioni.settore_privato;
         const settori = ['manifatturiero', 'costruzioni', 'commercio', 'turismo_ristorazione', 'attivita_finanziarie'];
         const settoriLabels = ['Manifatturiero', 'Costruzioni', 'Commercio', 'Turismo/Ristorazione', 'Attività Finanziarie'];
         
@@ -570,20 +827,14 @@ class Dashboard {
 
     loadEntrateVigilanzaCharts() {
         // Entrate contributive
-        const entrateData = dashboardData.entrate_vigilanza.entrate_contributive.serie_storica;
         this.createChart('chart-entrate-contributive', {
             type: 'line',
-            data: {
-                labels: entrateData.map(d => d.anno),
-                datasets: [{
-                    label: 'Entrate Contributive (€M)',
-                    data: entrateData.map(d => d.importo / 1000000),
-                    borderColor: this.colors.success,
-                    backgroundColor: this.colors.success + '20',
-                    tension: 0.4,
-                    fill: true
-                }]
-            },
+            data: this.chartData('entrate_vigilanza', 'chart-entrate-contributive', [{
+                borderColor: this.colors.success,
+                backgroundColor: this.colors.success + '20',
+                tension: 0.4,
+                fill: true
+            }]),
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
@@ -610,31 +861,12 @@ class Dashboard {
         });
 
         // Vigilanza ispettiva
-        const vigilanzaData = dashboardData.entrate_vigilanza.vigilanza_ispettiva.confronto;
         this.createChart('chart-vigilanza-ispettiva', {
             type: 'bar',
-            data: {
-                labels: ['Ispezioni', 'Aziende Irregolari', 'Accertato Contributi (K€)', 'Accertato Sanzioni (K€)'],
-                datasets: [{
-                    label: '2023',
-                    data: [
-                        vigilanzaData[2023].numero_ispezioni,
-                        vigilanzaData[2023].aziende_irregolari,
-                        vigilanzaData[2023].accertato_contributi / 1000,
-                        vigilanzaData[2023].accertato_sanzioni / 1000
-                    ],
-                    backgroundColor: this.colors.secondary
-                }, {
-                    label: '2024',
-                    data: [
-                        vigilanzaData[2024].numero_ispezioni,
-                        vigilanzaData[2024].aziende_irregolari,
-                        vigilanzaData[2024].accertato_contributi / 1000,
-                        vigilanzaData[2024].accertato_sanzioni / 1000
-                    ],
-                    backgroundColor: this.colors.primary
-                }]
-            },
+            data: this.chartData('entrate_vigilanza', 'chart-vigilanza-ispettiva', [
+                { backgroundColor: this.colors.secondary },
+                { backgroundColor: this.colors.primary }
+            ]),
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
@@ -658,27 +890,19 @@ class Dashboard {
         });
 
         // DURC
-        const durcData = dashboardData.entrate_vigilanza.durc.evoluzione;
         this.createChart('chart-durc', {
             type: 'line',
-            data: {
-                labels: durcData.map(d => d.anno),
-                datasets: [{
-                    label: 'DURC Regolari',
-                    data: durcData.map(d => d.regolari),
-                    borderColor: this.colors.success,
-                    backgroundColor: this.colors.success + '20',
-                    tension: 0.4,
-                    yAxisID: 'y'
-                }, {
-                    label: '% DURC Irregolari',
-                    data: durcData.map(d => d.perc_irregolari),
-                    borderColor: this.colors.error,
-                    backgroundColor: this.colors.error + '20',
-                    tension: 0.4,
-                    yAxisID: 'y1'
-                }]
-            },
+            data: this.chartData('entrate_vigilanza', 'chart-durc', [{
+                borderColor: this.colors.success,
+                backgroundColor: this.colors.success + '20',
+                tension: 0.4,
+                yAxisID: 'y'
+            }, {
+                borderColor: this.colors.error,
+                backgroundColor: this.colors.error + '20',
+                tension: 0.4,
+                yAxisID: 'y1'
+            }]),
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
@@ -712,6 +936,154 @@ class Dashboard {
                 }
             }
         });
+
+        // Fonti di entrata (scala logaritmica: importi di ordini di grandezza diversi)
+        this.createChart('chart-fonti-entrata', {
+            type: 'bar',
+            data: this.chartData('entrate_vigilanza', 'chart-fonti-entrata', [
+                { backgroundColor: this.colors.secondary },
+                { backgroundColor: this.colors.success },
+                { backgroundColor: this.colors.chart[5] }
+            ]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        type: 'logarithmic',
+                        ticks: { 
+                            color: '#e2e8f0',
+                            callback: function(value) { return '€' + value + 'M'; }
+                        },
+                        grid: { color: '#334155' }
+                    },
+                    x: {
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        labels: { color: '#e2e8f0' }
+                    }
+                }
+            }
+        });
+
+        // Riscossione coattiva per gestione
+        this.createChart('chart-riscossione-coattiva', {
+            type: 'doughnut',
+            data: this.chartData('entrate_vigilanza', 'chart-riscossione-coattiva', [{
+                backgroundColor: this.colors.chart,
+                borderWidth: 0
+            }]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: 'bottom',
+                        labels: { color: '#e2e8f0' }
+                    },
+                    tooltip: {
+                        callbacks: { label: (c) => `${c.label}: €${c.raw}M` }
+                    }
+                }
+            }
+        });
+
+        // Crescita delle entrate ordinarie rispetto a regione e Italia
+        this.createChart('chart-crescita-entrate', {
+            type: 'bar',
+            data: this.chartData('entrate_vigilanza', 'chart-crescita-entrate', [{
+                backgroundColor: [this.colors.success, this.colors.secondary, this.colors.primary]
+            }]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        ticks: { 
+                            color: '#e2e8f0',
+                            callback: function(value) { return value + '%'; }
+                        },
+                        grid: { color: '#334155' }
+                    },
+                    x: {
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        display: false
+                    }
+                }
+            }
+        });
+
+        // DURC irregolari: confronto territoriale
+        this.createChart('chart-durc-confronto', {
+            type: 'line',
+            data: this.chartData('entrate_vigilanza', 'chart-durc-confronto', [
+                { borderColor: this.colors.success, tension: 0.4, borderWidth: 3 },
+                { borderColor: this.colors.secondary, tension: 0.4 },
+                { borderColor: this.colors.primary, tension: 0.4 }
+            ]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        beginAtZero: false,
+                        ticks: { 
+                            color: '#e2e8f0',
+                            callback: function(value) { return value + '%'; }
+                        },
+                        grid: { color: '#334155' }
+                    },
+                    x: {
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        labels: { color: '#e2e8f0' }
+                    }
+                }
+            }
+        });
+
+        // Vigilanza documentale
+        this.createChart('chart-vigilanza-documentale', {
+            type: 'bar',
+            data: this.chartData('entrate_vigilanza', 'chart-vigilanza-documentale', [
+                { backgroundColor: this.colors.secondary },
+                { backgroundColor: this.colors.primary }
+            ]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    },
+                    x: {
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        labels: { color: '#e2e8f0' }
+                    }
+                }
+            }
+        });
     }
 
     loadAmmortizzatoriCharts() {
@@ -1225,29 +1597,12 @@ class Dashboard {
 
     loadRelazioniUtenzaCharts() {
         // Canali di accesso
-        const canaliData = dashboardData.relazioni_utenza.informazione_primo_livello;
         this.createChart('chart-canali-accesso', {
             type: 'bar',
-            data: {
-                labels: ['Accesso in Sede', 'Ricontatto Telefonico', 'Web Meeting'],
-                datasets: [{
-                    label: '2023',
-                    data: [
-                        canaliData[2023].accesso_sede,
-                        canaliData[2023].ricontatto_telefonico,
-                        canaliData[2023].web_meeting
-                    ],
-                    backgroundColor: this.colors.secondary
-                }, {
-                    label: '2024',
-                    data: [
-                        canaliData[2024].accesso_sede,
-                        canaliData[2024].ricontatto_telefonico,
-                        canaliData[2024].web_meeting
-                    ],
-                    backgroundColor: this.colors.primary
-                }]
-            },
+            data: this.chartData('relazioni_utenza', 'chart-canali-accesso', [
+                { backgroundColor: this.colors.secondary },
+                { backgroundColor: this.colors.primary }
+            ]),
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
@@ -1271,31 +1626,12 @@ class Dashboard {
         });
 
         // Cassetto bidirezionale
-        const cassettoData = dashboardData.relazioni_utenza.cassetto_bidirezionale;
         this.createChart('chart-cassetto-bidirezionale', {
             type: 'bar',
-            data: {
-                labels: ['Aziende 2023', 'Aziende 2024', 'Patronati 2023', 'Patronati 2024'],
-                datasets: [{
-                    label: 'In Entrata',
-                    data: [
-                        cassettoData.aziende[2023].in_entrata,
-                        cassettoData.aziende[2024].in_entrata,
-                        cassettoData.patronati[2023].in_entrata,
-                        cassettoData.patronati[2024].in_entrata
-                    ],
-                    backgroundColor: this.colors.success
-                }, {
-                    label: 'In Uscita',
-                    data: [
-                        cassettoData.aziende[2023].in_uscita,
-                        cassettoData.aziende[2024].in_uscita,
-                        cassettoData.patronati[2023].in_uscita,
-                        cassettoData.patronati[2024].in_uscita
-                    ],
-                    backgroundColor: this.colors.primary
-                }]
-            },
+            data: this.chartData('relazioni_utenza', 'chart-cassetto-bidirezionale', [
+                { backgroundColor: this.colors.success },
+                { backgroundColor: this.colors.primary }
+            ]),
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
@@ -1319,31 +1655,104 @@ class Dashboard {
         });
 
         // Flusso PEC
-        const pecData = dashboardData.relazioni_utenza.flusso_pec;
         this.createChart('chart-pec', {
             type: 'bar',
-            data: {
-                labels: ['2023', '2024'],
-                datasets: [{
-                    label: 'PEC Inviate',
-                    data: [pecData[2023].inviate, pecData[2024].inviate],
-                    backgroundColor: this.colors.primary
-                }, {
-                    label: 'PEC Ricevute',
-                    data: [pecData[2023].ricevute, pecData[2024].ricevute],
-                    backgroundColor: this.colors.secondary
-                }]
-            },
+            data: this.chartData('relazioni_utenza', 'chart-pec', [
+                { backgroundColor: this.colors.primary },
+                { backgroundColor: this.colors.secondary }
+            ]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    },
+                    x: {
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        labels: { color: '#e2e8f0' }
+                    }
+                }
+            }
+        });
+
+        // Informazione di I livello e consulenza di II livello
+        this.createChart('chart-consulenze', {
+            type: 'bar',
+            data: this.chartData('relazioni_utenza', 'chart-consulenze', [
+                { backgroundColor: this.colors.secondary },
+                { backgroundColor: this.colors.success }
+            ]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    },
+                    x: {
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        labels: { color: '#e2e8f0' }
+                    }
+                }
+            }
+        });
+
+        // Canale di presentazione delle pratiche
+        this.createChart('chart-canale-presentazione', {
+            type: 'doughnut',
+            data: this.chartData('relazioni_utenza', 'chart-canale-presentazione', [{
+                backgroundColor: [this.colors.secondary, this.colors.success],
+                borderWidth: 0
+            }]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: 'bottom',
+                        labels: { color: '#e2e8f0' }
+                    },
+                    tooltip: {
+                        callbacks: { label: (c) => `${c.label}: ${c.raw}%` }
+                    }
+                }
+            }
+        });
+
+        // Pratiche per argomento e canale
+        this.createChart('chart-pratiche-argomento', {
+            type: 'bar',
+            data: this.chartData('relazioni_utenza', 'chart-pratiche-argomento', [
+                { backgroundColor: this.colors.secondary },
+                { backgroundColor: this.colors.success }
+            ]),
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
                 scales: {
                     y: {
+                        stacked: true,
                         beginAtZero: true,
                         ticks: { color: '#e2e8f0' },
                         grid: { color: '#334155' }
                     },
                     x: {
+                        stacked: true,
                         ticks: { color: '#e2e8f0' },
                         grid: { color: '#334155' }
                     }
@@ -1359,21 +1768,12 @@ class Dashboard {
 
     loadOrganizzazioneCharts() {
         // Personale per area
-        const personaleData = dashboardData.organizzazione.personale.per_area;
         this.createChart('chart-personale', {
             type: 'doughnut',
-            data: {
-                labels: ['Dirigenti', 'Medici/Professionisti', 'Aree Professionali'],
-                datasets: [{
-                    data: [
-                        personaleData.dirigenti.totale,
-                        personaleData.medici_professionisti.totale,
-                        personaleData.aree_professionali.totale
-                    ],
-                    backgroundColor: [this.colors.error, this.colors.warning, this.colors.primary],
-                    borderWidth: 0
-                }]
-            },
+            data: this.chartData('organizzazione', 'chart-personale', [{
+                backgroundColor: [this.colors.error, this.colors.warning, this.colors.primary],
+                borderWidth: 0
+            }]),
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
@@ -1387,27 +1787,16 @@ class Dashboard {
         });
 
         // Strutture territoriali
-        const struttureData = dashboardData.organizzazione.distribuzione_territoriale.strutture;
         this.createChart('chart-strutture', {
             type: 'bar',
-            data: {
-                labels: ['Comuni', 'Strutture INPS', 'Patronati', 'CAF'],
-                datasets: [{
-                    label: 'Numero',
-                    data: [
-                        struttureData.numero_comuni,
-                        struttureData.strutture_inps,
-                        struttureData.patronati,
-                        struttureData.caf
-                    ],
-                    backgroundColor: [
-                        this.colors.secondary,
-                        this.colors.primary,
-                        this.colors.success,
-                        this.colors.accent
-                    ]
-                }]
-            },
+            data: this.chartData('organizzazione', 'chart-strutture', [{
+                backgroundColor: [
+                    this.colors.secondary,
+                    this.colors.primary,
+                    this.colors.success,
+                    this.colors.accent
+                ]
+            }]),
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
@@ -1431,20 +1820,22 @@ class Dashboard {
         });
 
         // Età media evoluzione
-        const etaData = dashboardData.organizzazione.personale.eta_media.evoluzione;
         this.createChart('chart-eta-media', {
             type: 'line',
-            data: {
-                labels: etaData.map(d => d.anno),
-                datasets: [{
-                    label: 'Età Media',
-                    data: etaData.map(d => d.eta),
-                    borderColor: this.colors.primary,
-                    backgroundColor: this.colors.primary + '20',
-                    tension: 0.4,
-                    fill: true
-                }]
-            },
+            data: this.chartData('organizzazione', 'chart-eta-media', [{
+                borderColor: this.colors.primary,
+                backgroundColor: this.colors.primary + '20',
+                tension: 0.4,
+                fill: true
+            }, {
+                borderColor: this.colors.secondary,
+                borderDash: [5, 5],
+                tension: 0.4
+            }, {
+                borderColor: this.colors.chart[5],
+                borderDash: [5, 5],
+                tension: 0.4
+            }]),
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
@@ -1471,6 +1862,68 @@ class Dashboard {
                 }
             }
         });
+
+        // Personale per genere e area
+        this.createChart('chart-personale-genere', {
+            type: 'bar',
+            data: this.chartData('organizzazione', 'chart-personale-genere', [
+                { backgroundColor: this.colors.accent },
+                { backgroundColor: this.colors.secondary }
+            ]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                indexAxis: 'y',
+                scales: {
+                    y: {
+                        stacked: true,
+                        beginAtZero: true,
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    },
+                    x: {
+                        stacked: true,
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        labels: { color: '#e2e8f0' }
+                    }
+                }
+            }
+        });
+
+        // Andamento del personale
+        this.createChart('chart-personale-evoluzione', {
+            type: 'line',
+            data: this.chartData('organizzazione', 'chart-personale-evoluzione', [{
+                borderColor: this.colors.success,
+                backgroundColor: this.colors.success + '20',
+                tension: 0.4
+            }]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        beginAtZero: false,
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    },
+                    x: {
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        display: false
+                    }
+                }
+            }
+        });
     }
 
     loadContenziosoCharts() {
@@ -1564,21 +2017,11 @@ class Dashboard {
 
     loadPatrimonioCharts() {
         // Valore patrimonio
-        const patrimonioData = dashboardData.patrimonio.immobiliare;
         this.createChart('chart-patrimonio-valore', {
             type: 'bar',
-            data: {
-                labels: ['2022', '2023', '2024'],
-                datasets: [{
-                    label: 'Valore Patrimonio (€M)',
-                    data: [
-                        patrimonioData.valore_euro[2022] / 1000000,
-                        patrimonioData.valore_euro[2023] / 1000000,
-                        patrimonioData.valore_euro[2024] / 1000000
-                    ],
-                    backgroundColor: this.colors.primary
-                }]
-            },
+            data: this.chartData('patrimonio', 'chart-patrimonio-valore', [{
+                backgroundColor: this.colors.primary
+            }]),
             options: {
                 responsive: true,
                 maintainAspectRatio: false,
@@ -1603,19 +2046,133 @@ class Dashboard {
                 }
             }
         });
+
+        // Valore del patrimonio per provincia
+        this.createChart('chart-patrimonio-province', {
+            type: 'bar',
+            data: this.chartData('patrimonio', 'chart-patrimonio-province', [{
+                backgroundColor: [this.colors.warning, this.colors.secondary, this.colors.success, this.colors.chart[5], this.colors.accent]
+            }]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        ticks: { 
+                            color: '#e2e8f0',
+                            callback: function(value) { return '€' + value + 'M'; }
+                        },
+                        grid: { color: '#334155' }
+                    },
+                    x: {
+                        ticks: { color: '#e2e8f0' },
+                        grid: { color: '#334155' }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        display: false
+                    }
+                }
+            }
+        });
+
+        // Unità immobiliari per provincia
+        this.createChart('chart-patrimonio-unita', {
+            type: 'doughnut',
+            data: this.chartData('patrimonio', 'chart-patrimonio-unita', [{
+                backgroundColor: [this.colors.secondary, this.colors.success, this.colors.chart[5], this.colors.accent, this.colors.warning],
+                borderWidth: 0
+            }]),
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: 'bottom',
+                        labels: { color: '#e2e8f0' }
+                    },
+                    tooltip: {
+                        callbacks: { label: (c) => `${c.label}: ${c.raw} unità` }
+                    }
+                }
+            }
+        });
+    }
+
+    // Etichette e valori già scalati da scripts/derived_metrics.py (chiave 'grafici' del chunk):
+    // qui si aggiungono solo gli stili, uno per dataset
+    chartData(section, chartId, styles) {
+        const arrays = (this.data[section].grafici || {})[chartId];
+        if (!arrays) {
+            console.warn(`Dati precalcolati mancanti per ${chartId}: rigenerare i chunk con update_data.py`);
+            return { labels: [], datasets: [] };
+        }
+        return {
+            labels: arrays.labels,
+            datasets: arrays.datasets.map((dataset, i) => ({ ...dataset, ...(styles[i] || styles[0]) }))
+        };
     }
 
     createChart(canvasId, config) {
         const ctx = document.getElementById(canvasId);
         if (!ctx) return;
 
-        // Destroy existing chart if it exists
-        if (this.charts[canvasId]) {
-            this.charts[canvasId].destroy();
+        this.chartConfigs[canvasId] = config;
+
+        // Grafico già esistente: dati e opzioni aggiornati sulla stessa istanza
+        const chart = this.charts[canvasId];
+        if (chart && chart.config.type === config.type) {
+            this.updateChart(chart, config);
+            return;
+        }
+        if (chart) {
+            chart.destroy();
+            delete this.charts[canvasId];
         }
 
-        // Create new chart
-        this.charts[canvasId] = new Chart(ctx, config);
+        if (this.chartObserver) {
+            // Creazione rimandata a quando il canvas diventa visibile
+            this.pendingCharts[canvasId] = config;
+            this.chartObserver.observe(ctx);
+        } else {
+            this.instantiateChart(ctx, config);
+        }
+    }
+
+    onChartsVisible(entries) {
+        entries.forEach(entry => {
+            if (!entry.isIntersecting) return;
+            const canvasId = entry.target.id;
+            this.chartObserver.unobserve(entry.target);
+            const config = this.pendingCharts[canvasId];
+            delete this.pendingCharts[canvasId];
+            if (config) this.instantiateChart(entry.target, config);
+        });
+    }
+
+    instantiateChart(ctx, config) {
+        // Anteprima SVG del prerender: il grafico vero la sostituisce
+        const snapshot = ctx.parentElement && ctx.parentElement.querySelector('.chart-snapshot');
+        if (snapshot) snapshot.remove();
+        this.charts[ctx.id] = new Chart(ctx, config);
+    }
+
+    // Aggiorna un grafico senza ricrearlo, riusando gli oggetti dataset esistenti
+    updateChart(chart, config) {
+        const datasets = config.data.datasets;
+        chart.data.labels = config.data.labels;
+        datasets.forEach((dataset, i) => {
+            if (chart.data.datasets[i]) {
+                Object.assign(chart.data.datasets[i], dataset);
+            } else {
+                chart.data.datasets.push({ ...dataset });
+            }
+        });
+        chart.data.datasets.length = datasets.length;
+        chart.options = config.options || {};
+        chart.update('none');
     }
 
     // Utility method to destroy all charts (useful for cleanup)
@@ -1623,7 +2180,13 @@ class Dashboard {
         Object.values(this.charts).forEach(chart => {
             if (chart) chart.destroy();
         });
+        if (this.chartObserver) this.chartObserver.disconnect();
+        if (this.zoomChart) this.zoomChart.destroy();
         this.charts = {};
+        this.chartConfigs = {};
+        this.pendingCharts = {};
+        this.renderedSections = {};
+        this.zoomChart = null;
     }
 }
 
@@ -0,0 +1,270 @@
+// Dashboard Socio-Economica - Grafici statici delle sezioni
+// Condiviso da index.html e dalle pagine di dashboard/ generate da generate_pages.py
+
+document.addEventListener('DOMContentLoaded', function () {
+    const chartInstances = new Map();
+    const colors = { orange: '#fb923c', sky: '#38bdf8', teal: '#2dd4bf', pink: '#f472b6', red: '#f87171', purple: '#c084fc', green: '#4ade80' };
+
+    // Tab management for integrated sections
+    const tabs = document.querySelectorAll('.tab-btn');
+    const contents = document.querySelectorAll('.tab-content');
+    tabs.forEach(tab => {
+        tab.addEventListener('click', () => {
+            const parentSection = tab.closest('section');
+            const sectionTabs = parentSection.querySelectorAll('.tab-btn');
+            const sectionContents = parentSection.querySelectorAll('.tab-content');
+            
+            sectionTabs.forEach(t => t.classList.remove('active'));
+            sectionContents.forEach(c => c.classList.remove('active'));
+            
+            tab.classList.add('active');
+            const targetTab = parentSection.querySelector(`#${tab.dataset.tab}`);
+            if (targetTab) targetTab.classList.add('active');
+        });
+    });
+
+    // Zoom functionality for cards
+    const overlay = document.getElementById('zoom-overlay') || document.getElementById('modal-overlay');
+    function unzoom() {
+        document.querySelector('.card.zoomed')?.classList.remove('zoomed');
+        if (overlay) overlay.classList.add('hidden');
+    }
+    document.querySelectorAll('.zoomable').forEach(card => {
+        card.addEventListener('click', (event) => {
+            if (event.target.closest('canvas, .filter-btn, button')) return;
+            const isZoomed = card.classList.contains('zoomed');
+            unzoom();
+            if (!isZoomed) {
+                card.classList.add('zoomed');
+                if (overlay) overlay.classList.remove('hidden');
+            }
+        });
+    });
+    if (overlay) overlay.addEventListener('click', unzoom);
+
+    // Chart.js global settings
+    Chart.defaults.font.family = "'Inter', sans-serif";
+    Chart.defaults.color = '#94a3b8';
+    const commonOptions = { 
+        responsive: true, 
+        maintainAspectRatio: false, 
+        plugins: { 
+            legend: { position: 'bottom', labels: { color: '#cbd5e1' } } 
+        }, 
+        scales: { 
+            y: { beginAtZero: true, grid: { color: 'rgba(255, 255, 255, 0.1)' }, ticks: { color: '#94a3b8' } }, 
+            x: { grid: { display: false }, ticks: { color: '#94a3b8' } } 
+        } 
+    };
+
+    function createChart(canvasId, config) {
+        const canvas = document.getElementById(canvasId);
+        if (!canvas) return null;
+        try {
+            const chart = new Chart(canvas, config);
+            chartInstances.set(canvas, chart);
+            return chart;
+        } catch (error) {
+            console.warn(`Could not create chart for ${canvasId}:`, error);
+            return null;
+        }
+    }
+
+    // DEMOGRAFIA CHARTS
+    // Struttura Popolazione
+    createChart('agePyramidChart', {
+        type: 'bar',
+        data: {
+            labels: ['Pesaro e Urbino', 'Regione Marche', 'Italia'],
+            datasets: [
+                { label: '0-14 anni', data: [11.8, 11.6, 12.2], backgroundColor: colors.teal, borderRadius: 5 },
+                { label: '15-64 anni', data: [63.0, 62.2, 63.5], backgroundColor: colors.sky, borderRadius: 5 },
+                { label: '65 e oltre', data: [25.3, 26.2, 24.4], backgroundColor: colors.orange, borderRadius: 5 }
+            ]
+        },
+        options: commonOptions
+    });
+    
+    createChart('genderDistributionChart', {
+        type: 'doughnut',
+        data: {
+            labels: ['Femmine', 'Maschi'],
+            datasets: [{
+                data: [50.8, 49.2],
+                backgroundColor: [colors.pink, colors.sky],
+                borderColor: '#1e293b'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: { position: 'bottom', labels: { color: '#cbd5e1' } },
+                tooltip: { callbacks: { label: (c) => `${c.label}: ${c.raw}%` } }
+            }
+        }
+    });
+    
+    createChart('lifeExpectancyChart', {
+        type: 'bar',
+        data: {
+            labels: ['Pesaro e Urbino', 'Regione Marche', 'Italia'],
+            datasets: [
+                { label: 'Femmine', data: [86.1, 85.9, 85.1], backgroundColor: colors.pink, borderRadius: 5 },
+                { label: 'Maschi', data: [82.2, 81.9, 81.0], backgroundColor: colors.sky, borderRadius: 5 }
+            ]
+        },
+        options: { ...commonOptions, scales: { ...commonOptions.scales, y: { ...commonOptions.scales.y, beginAtZero: false, suggestedMin: 80 } } }
+    });
+
+    // Dinamica Demografica
+    const years = ['2013', '2014', '2015', '2016', '2017', '2018', '2019', '2020', '2021', '2022', '2023'];
+    // naturalBalanceChart e demographicBalanceChart: main.js (serie dal chunk o da /api/series)
+
+    createChart('migrationFlowChart', {
+        type: 'line',
+        data: {
+            labels: years,
+            datasets: [
+                { label: 'Immigrati', data: [1888, 1774, 1437, 1629, 1700, 1894, 1843, 1618, 1630, 1626, 1758], borderColor: colors.green, tension: 0.3 },
+                { label: 'Emigrati', data: [508, 538, 635, 702, 683, 790, 665, 748, 564, 642, 653], borderColor: colors.orange, tension: 0.3 }
+            ]
+        },
+        options: commonOptions
+    });
+
+    // MERCATO DEL LAVORO CHARTS
+    // Occupazione e Struttura
+    createChart('mainIndicatorsChart', {
+        type: 'line',
+        data: {
+            labels: ['2022', '2023', '2024'],
+            datasets: [
+                { label: 'Tasso Occupazione PU', data: [69.6, 69.2, 70.1], borderColor: colors.green, tension: 0.3, borderWidth: 3 },
+                { label: 'Tasso Disoccupazione PU', data: [4.9, 5.2, 3.7], borderColor: colors.orange, tension: 0.3, borderWidth: 3 },
+                { label: 'Tasso Occupazione Italia', data: [60.1, 61.5, 62.2], borderColor: colors.green, tension: 0.3, borderDash: [5, 5], borderWidth: 1.5 },
+                { label: 'Tasso Disoccupazione Italia', data: [8.1, 7.7, 6.5], borderColor: colors.orange, tension: 0.3, borderDash: [5, 5], borderWidth: 1.5 }
+            ]
+        },
+        options: { ...commonOptions, plugins: { ...commonOptions.plugins, tooltip: { callbacks: { label: (c) => `${c.dataset.label}: ${c.raw}%` } } } }
+    });
+    
+    createChart('workersCompositionChart', {
+        type: 'bar',
+        data: {
+            labels: ['Dipendenti', 'Commercianti', 'Artigiani', 'Gest. Separata', 'Domestici', 'Agricoli Autonomi'],
+            datasets: [{
+                label: 'Numero Lavoratori (2023)',
+                data: [138925, 12217, 11987, 7149, 4868, 2744],
+                backgroundColor: [colors.sky, colors.teal, colors.purple, colors.pink, colors.orange, colors.green],
+                borderRadius: 5
+            }]
+        },
+        options: { ...commonOptions, indexAxis: 'y', plugins: { legend: { display: false } } }
+    });
+    
+    createChart('genderPayGapChart', {
+        type: 'bar',
+        data: {
+            labels: ['Manifatturiero', 'Commercio', 'Alloggio/Ristorazione', 'Sanità', 'Costruzioni'],
+            datasets: [
+                { label: 'Femmine', data: [78.1, 67.9, 51.3, 58.4, 68.1], backgroundColor: colors.pink, borderRadius: 5 },
+                { label: 'Maschi', data: [102.6, 89.0, 60.6, 74.6, 90.5], backgroundColor: colors.sky, borderRadius: 5 }
+            ]
+        },
+        options: commonOptions
+    });
+
+    // Flussi e Contratti
+    createChart('hiresByContractChart', {
+        type: 'bar',
+        data: {
+            labels: ['T. Indeterminato', 'T. Determinato', 'Stagionale', 'Somministrazione', 'Intermittente'],
+            datasets: [
+                { label: 'Assunzioni 2023', data: [8613, 19258, 7251, 5716, 11106], backgroundColor: 'rgba(56, 189, 248, 0.6)', borderRadius: 5 },
+                { label: 'Assunzioni 2024', data: [7727, 18388, 7595, 5043, 12153], backgroundColor: colors.sky, borderRadius: 5 }
+            ]
+        },
+        options: commonOptions
+    });
+    
+    createChart('hiresTerminationsBalanceChart', {
+        type: 'bar',
+        data: {
+            labels: ['T. Indeterminato', 'T. Determinato', 'Stagionale', 'Somministrazione', 'Intermittente'],
+            datasets: [
+                { label: 'Assunzioni 2024', data: [7727, 18388, 7595, 5043, 12153], backgroundColor: colors.green, borderRadius: 5 },
+                { label: 'Cessazioni 2024', data: [11130, 14409, 7561, 5114, 11840], backgroundColor: colors.red, borderRadius: 5 }
+            ]
+        },
+        options: commonOptions
+    });
+
+    createChart('partTimeIncidenceChart', {
+        type: 'bar',
+        data: {
+            labels: ['Pesaro e Urbino', 'Marche', 'Italia'],
+            datasets: [
+                { label: 'Donne', data: [48.1, 45.6, 44.1], backgroundColor: colors.pink, borderRadius: 5 },
+                { label: 'Uomini', data: [11.5, 12.9, 15.4], backgroundColor: colors.sky, borderRadius: 5 }
+            ]
+        },
+        options: { ...commonOptions, plugins: { ...commonOptions.plugins, tooltip: { callbacks: { label: (c) => `${c.dataset.label}: ${c.raw}%` } } } }
+    });
+
+    // CONTENZIOSO CHARTS
+    // Contenzioso Amministrativo
+    createChart('adminAppealsFlowChart', {
+        type: 'bar',
+        data: {
+            labels: ['Da Lavorare (Inizio Anno)', 'Pervenuti', 'Definiti', 'Da Lavorare (Fine Anno)'],
+            datasets: [{
+                label: 'Numero Ricorsi',
+                data: [25, 514, 500, 40],
+                backgroundColor: [colors.orange, colors.sky, colors.green, colors.red],
+                borderRadius: 5
+            }]
+        },
+        options: {...commonOptions, plugins: { legend: { display: false } } }
+    });
+    
+    // Contenzioso Giudiziario
+    createChart('judicialOutcomesChart', {
+        type: 'bar',
+        data: {
+            labels: ['Contenzioso Ordinario', 'ATP Invalidità Civile'],
+            datasets: [
+                { label: 'Favorevole INPS', data: [67, 210], backgroundColor: colors.green, borderRadius: 5 },
+                { label: 'Favorevole Utenti', data: [38, 344], backgroundColor: colors.pink, borderRadius: 5 },
+                { label: 'Altri Esiti', data: [19, 49], backgroundColor: colors.orange, borderRadius: 5 }
+            ]
+        },
+        options: { ...commonOptions, scales: { x: { stacked: true }, y: { stacked: true } } }
+    });
+    
+    createChart('judicialCasesBySubjectChart', {
+        type: 'bar',
+        data: {
+            labels: ['Contributivo', 'Inv. Civile', 'Pensioni', 'Indebiti', 'Altri'],
+            datasets: [{
+                label: 'Giudizi Iniziati',
+                data: [71, 41, 25, 19, 14],
+                backgroundColor: [colors.sky, colors.teal, colors.purple, colors.pink, colors.orange],
+                borderRadius: 5
+            }]
+        },
+        options: { ...commonOptions, indexAxis: 'y', plugins: { legend: { display: false } } }
+    });
+
+    createChart('pendingCasesChart', {
+        type: 'bar',
+        data: {
+            labels: ['Contenzioso Ordinario', 'Contenzioso ATP'],
+            datasets: [
+                { label: 'Pendenza Inizio 2024', data: [160, 403], backgroundColor: 'rgba(248, 113, 113, 0.6)', borderRadius: 5 },
+                { label: 'Pendenza Fine 2024', data: [206, 398], backgroundColor: colors.red, borderRadius: 5 }
+            ]
+        },
+        options: commonOptions
+    });
+});
@@ -5,11 +5,632 @@ Script di ottimizzazione per migliorare le performance della dashboard
 """
 
 import os
+import re
 import gzip
 import json
+import shutil
+import hashlib
+import time
+import argparse
+import tempfile
+import posixpath
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
-def optimize_dashboard():
+from prerender import prerender_page
+from generate_pages import render_pages, TEMPLATE_PATH
+from service_worker import SW_NAME, SW_TEMPLATE_PATH, add_registration, write_service_worker
+
+# Compressori opzionali: senza i moduli si producono solo le varianti gzip
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Build con nomi fingerprinted: il contenuto determina il nome del file,
+# quindi gli asset possono essere serviti con cache immutable di un anno
+BUILD_DIR = "dist"
+MANIFEST_NAME = "asset-manifest.json"
+HASH_LENGTH = 10
+FINGERPRINTED_ASSETS = [
+    "js/data.js",
+    "js/main.js",
+    "js/sections.js",
+    "css/style.css"
+]
+# Le pagine di sezione di dashboard/ sono rigenerate dalla build (generate_pages.render_pages)
+PAGE_PATTERNS = ["index.html", "dashboard/*.html"]
+# Chunk per sezione di scripts/update_data.py: già con hash nel nome, copiati così come sono
+DATA_DIR = "data"
+DATA_INDEX_NAME = "index.json"
+
+# Librerie locali al posto dei CDN (richiedono chart.js, esbuild e tailwindcss da npm)
+VENDOR_DIR = "vendor"
+VENDOR_TAILWIND = "vendor/tailwind.css"
+VENDOR_CHARTJS = "vendor/chart.js"
+VENDOR_ASSETS = [VENDOR_TAILWIND, VENDOR_CHARTJS]
+TAILWIND_CONTENT = ["index.html", "dashboard/*.html", "js/main.js", "js/sections.js"]
+CHART_SOURCES = ["js/main.js", "js/sections.js", "index.html", "dashboard/*.html"]
+
+# Componenti Chart.js da registrare per ogni tipo di grafico/scala usato
+CHART_COMPONENTS = {
+    "bar": ["BarController", "BarElement", "CategoryScale", "LinearScale"],
+    "line": ["LineController", "LineElement", "PointElement", "CategoryScale", "LinearScale"],
+    "doughnut": ["DoughnutController", "ArcElement"],
+    "pie": ["PieController", "ArcElement"],
+    "polarArea": ["PolarAreaController", "ArcElement", "RadialLinearScale"],
+    "radar": ["RadarController", "LineElement", "PointElement", "RadialLinearScale"],
+    "scatter": ["ScatterController", "PointElement", "LinearScale"],
+    "bubble": ["BubbleController", "PointElement", "LinearScale"],
+    "category": ["CategoryScale"],
+    "linear": ["LinearScale"],
+    "logarithmic": ["LogarithmicScale"],
+    "radialLinear": ["RadialLinearScale"]
+}
+CHART_PLUGINS = ["Filler", "Legend", "Title", "Tooltip"]
+
+CDN_TAILWIND_PATTERN = re.compile(
+    r'<script\s+src=["\']https://cdn\.tailwindcss\.com[^"\']*["\']\s*>\s*</script>', re.IGNORECASE
+)
+CDN_CHARTJS_PATTERN = re.compile(
+    r'<script\s+src=["\']https://cdn\.jsdelivr\.net/npm/chart\.js[^"\']*["\']\s*>\s*</script>', re.IGNORECASE
+)
+TAILWIND_CONFIG_PATTERN = re.compile(
+    r'(?:<!--\s*Tailwind Config\s*-->\s*)?<script>\s*tailwind\.config\s*=\s*(\{.*?\})\s*;?\s*</script>',
+    re.DOTALL
+)
+CHART_TYPE_PATTERN = re.compile(r'\btype:\s*[\'"]([A-Za-z]+)[\'"]')
+
+# Build incrementale: hash dei contenuti già compressi
+BUILD_CACHE_NAME = ".build-cache.json"
+BUILD_CACHE_VERSION = 1
+ENCODING_SUFFIXES = {
+    "gzip": ".gz",
+    "br": ".br",
+    "zstd": ".zst"
+}
+
+# Pubblicazione atomica: ogni build completa è una generazione in releases/,
+# resa attiva scambiando il link simbolico releases/current
+RELEASES_DIR = "releases"
+CURRENT_LINK = "current"
+RELEASES_KEEP = 5
+HASHED_NAME_PATTERN = re.compile(r'\.[0-9a-f]{%d}\.\w+$' % HASH_LENGTH)
+
+# src/href dei tag <script> e <link>
+ASSET_REF_PATTERN = re.compile(
+    r'(<(?:script|link)\b[^>]*?\b(?:src|href)=)(["\'])([^"\']+)\2',
+    re.IGNORECASE
+)
+
+def content_hash(content):
+    """Hash breve del contenuto usato nei nomi fingerprinted"""
+    return hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+
+def fingerprint_name(rel_path, digest):
+    """js/main.js → js/main.<hash>.js"""
+    path = Path(rel_path)
+    return (path.parent / f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+def rewrite_asset_references(html, page_path, assets):
+    """Riscrive i riferimenti <script>/<link> di una pagina verso i nomi fingerprinted"""
+    page_dir = posixpath.dirname(page_path)
+    
+    def replace(match):
+        prefix, quote, url = match.groups()
+        if '://' in url or url.startswith(('//', 'data:', '#')):
+            return match.group(0)
+        
+        path, sep, query = url.partition('?')
+        if path.startswith('/'):
+            target = posixpath.normpath(path.lstrip('/'))
+        else:
+            target = posixpath.normpath(posixpath.join(page_dir, path))
+        if target not in assets:
+            return match.group(0)
+        
+        if path.startswith('/'):
+            new_path = '/' + assets[target]
+        else:
+            new_path = posixpath.relpath(assets[target], page_dir or '.')
+        return f"{prefix}{quote}{new_path}{sep}{query}{quote}"
+    
+    return ASSET_REF_PATTERN.sub(replace, html)
+
+def list_pages(dashboard_dir):
+    """Pagine HTML della dashboard (percorsi relativi in formato posix)"""
+    pages = []
+    for pattern in PAGE_PATTERNS:
+        for page in sorted(dashboard_dir.glob(pattern)):
+            pages.append(page.relative_to(dashboard_dir).as_posix())
+    return pages
+
+def compress_gzip(content):
+    # mtime=0: output riproducibile, stesso input → stessi byte
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+def compress_brotli(content):
+    return brotli.compress(content, quality=11)
+
+def compress_zstd(content):
+    return zstandard.ZstdCompressor(level=19).compress(content)
+
+COMPRESSORS = {
+    "gzip": compress_gzip,
+    "br": compress_brotli,
+    "zstd": compress_zstd
+}
+
+def available_encodings():
+    """Codifiche producibili con i moduli installati"""
+    encodings = ["gzip"]
+    if BROTLI_AVAILABLE:
+        encodings.append("br")
+    if ZSTD_AVAILABLE:
+        encodings.append("zstd")
+    return encodings
+
+def compress_variants(path, encodings):
+    """Worker del process pool: scrive le varianti compresse di un file"""
+    content = Path(path).read_bytes()
+    sizes = {}
+    timings = {}
+    for encoding in encodings:
+        started = time.perf_counter()
+        compressed = COMPRESSORS[encoding](content)
+        Path(path + ENCODING_SUFFIXES[encoding]).write_bytes(compressed)
+        sizes[encoding] = len(compressed)
+        timings[encoding] = time.perf_counter() - started
+    return path, sizes, timings
+
+def load_build_cache(cache_path):
+    """Legge la cache di build, vuota se assente, corrotta o di un'altra versione"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {"version": BUILD_CACHE_VERSION, "files": {}}
+    if cache.get("version") != BUILD_CACHE_VERSION:
+        return {"version": BUILD_CACHE_VERSION, "files": {}}
+    return cache
+
+def save_build_cache(cache_path, cache):
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+def pending_encodings(path, digest, entry, encodings):
+    """Varianti da (ri)generare: tutte se il contenuto è cambiato,
+    altrimenti solo quelle mancanti su disco o non ancora in cache"""
+    if not entry or entry.get("hash") != digest:
+        return list(encodings)
+    
+    pending = []
+    source_mtime = os.stat(path).st_mtime
+    for encoding in encodings:
+        variant = path + ENCODING_SUFFIXES[encoding]
+        if encoding not in entry.get("variants", {}) or not os.path.exists(variant):
+            pending.append(encoding)
+        elif os.stat(variant).st_mtime < source_mtime:
+            # Contenuto identico ma sorgente toccato (es. checkout git): aggiorna
+            # la mtime così il server non scarta la variante come obsoleta
+            os.utime(variant)
+    return pending
+
+def compress_assets(dashboard_dir, files, jobs=None, force=False):
+    """Comprime in parallelo i soli file cambiati dall'ultima build.
+    Restituisce {file: {"original": byte, "variants": {codifica: byte}}}"""
+    cache_path = dashboard_dir / BUILD_CACHE_NAME
+    cache = {"version": BUILD_CACHE_VERSION, "files": {}} if force else load_build_cache(cache_path)
+    encodings = available_encodings()
+    
+    results = {}
+    tasks = []
+    for file_path in files:
+        full_path = dashboard_dir / file_path
+        if not full_path.exists():
+            continue
+        content = full_path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        entry = cache["files"].get(file_path)
+        pending = pending_encodings(str(full_path), digest, entry, encodings)
+        
+        variants = {} if not entry or entry.get("hash") != digest else dict(entry.get("variants", {}))
+        cache["files"][file_path] = {"hash": digest, "variants": variants}
+        results[file_path] = {"original": len(content), "variants": variants}
+        if pending:
+            tasks.append((file_path, str(full_path), pending))
+        else:
+            print(f"⏭️  {file_path}: invariato")
+    
+    started = time.perf_counter()
+    if len(tasks) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                executor.submit(compress_variants, full_path, pending): file_path
+                for file_path, full_path, pending in tasks
+            }
+            outcomes = [(futures[future], future.result()) for future in futures]
+    else:
+        outcomes = [
+            (file_path, compress_variants(full_path, pending))
+            for file_path, full_path, pending in tasks
+        ]
+    
+    for file_path, (_, sizes, timings) in outcomes:
+        results[file_path]["variants"].update(sizes)
+        original = results[file_path]["original"]
+        details = "  ".join(
+            f"{encoding} {size:,} byte ({timings[encoding] * 1000:.0f} ms)"
+            for encoding, size in sizes.items()
+        )
+        print(f"✅ {file_path}: {original:,} → {details}")
+    
+    save_build_cache(cache_path, cache)
+    print(f"\n⏱️  {len(tasks)} file compressi, {len(results) - len(tasks)} invariati "
+          f"in {time.perf_counter() - started:.2f}s ({', '.join(encodings)})")
+    return results
+
+def find_node_tool(dashboard_dir, name):
+    """Eseguibile npm installato localmente (node_modules/.bin) o nel PATH"""
+    for candidate in (name, f"{name}.cmd"):
+        local = dashboard_dir / "node_modules" / ".bin" / candidate
+        if local.exists():
+            return str(local)
+    return shutil.which(name)
+
+def collect_sources(dashboard_dir, patterns):
+    """File esistenti che corrispondono ai pattern, in ordine stabile"""
+    files = []
+    for pattern in patterns:
+        files.extend(sorted(dashboard_dir.glob(pattern)))
+    return files
+
+def is_up_to_date(output, inputs):
+    """True se output esiste ed è più recente di tutti gli input"""
+    if not output.exists():
+        return False
+    output_mtime = output.stat().st_mtime
+    return all(source.stat().st_mtime <= output_mtime for source in inputs)
+
+def used_chart_components(dashboard_dir):
+    """Componenti Chart.js necessari ai tipi di grafico effettivamente creati"""
+    components = []
+    for source in collect_sources(dashboard_dir, CHART_SOURCES):
+        for chart_type in CHART_TYPE_PATTERN.findall(source.read_text(encoding='utf-8')):
+            for component in CHART_COMPONENTS.get(chart_type, []):
+                if component not in components:
+                    components.append(component)
+    return components + CHART_PLUGINS
+
+def build_chartjs_bundle(dashboard_dir, force=False):
+    """Bundle Chart.js tree-shaken con i soli controller/scale usati (esbuild)"""
+    output = dashboard_dir / VENDOR_CHARTJS
+    sources = collect_sources(dashboard_dir, CHART_SOURCES)
+    if not force and is_up_to_date(output, sources):
+        print(f"⏭️  {VENDOR_CHARTJS}: invariato")
+        return True
+    
+    esbuild = find_node_tool(dashboard_dir, "esbuild")
+    if not esbuild or not (dashboard_dir / "node_modules" / "chart.js").exists():
+        print("⚠️  esbuild/chart.js non disponibili: Chart.js resta su CDN. "
+              "Installa con: npm install --no-save chart.js esbuild")
+        return False
+    
+    components = used_chart_components(dashboard_dir)
+    entry = (
+        f"import {{ Chart, {', '.join(components)} }} from 'chart.js';\n"
+        f"Chart.register({', '.join(components)});\n"
+        "window.Chart = Chart;\n"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    # Da stdin esbuild risolve gli import rispetto alla cwd (node_modules del progetto)
+    result = subprocess.run(
+        [esbuild, "--bundle", "--minify", "--format=iife", "--target=es2018",
+         f"--outfile={output}"],
+        input=entry, cwd=dashboard_dir, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(f"❌ Bundle Chart.js fallito: {result.stderr.strip()}")
+        return False
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"✅ {VENDOR_CHARTJS}: {output.stat().st_size:,} byte, "
+          f"{len(components)} componenti ({elapsed_ms:.0f} ms)")
+    return True
+
+def build_tailwind_css(dashboard_dir, force=False):
+    """Foglio Tailwind statico con le sole classi usate nelle pagine (tailwindcss CLI)"""
+    output = dashboard_dir / VENDOR_TAILWIND
+    sources = collect_sources(dashboard_dir, TAILWIND_CONTENT)
+    if not force and is_up_to_date(output, sources):
+        print(f"⏭️  {VENDOR_TAILWIND}: invariato")
+        return True
+    
+    tailwind = find_node_tool(dashboard_dir, "tailwindcss")
+    if not tailwind:
+        print("⚠️  tailwindcss non disponibile: Tailwind resta su CDN. "
+              "Installa con: npm install --no-save tailwindcss@3")
+        return False
+    
+    # Riusa la configurazione inline di index.html (colori del tema)
+    index_html = (dashboard_dir / "index.html").read_text(encoding='utf-8')
+    match = TAILWIND_CONFIG_PATTERN.search(index_html)
+    theme_config = match.group(1) if match else "{}"
+    content = json.dumps([str(source.resolve()) for source in sources])
+    
+    output.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = Path(tmp) / "tailwind.config.js"
+        input_path = Path(tmp) / "input.css"
+        config_path.write_text(
+            f"const config = {theme_config};\nconfig.content = {content};\nmodule.exports = config;\n",
+            encoding='utf-8'
+        )
+        input_path.write_text("@tailwind base;\n@tailwind components;\n@tailwind utilities;\n", encoding='utf-8')
+        result = subprocess.run(
+            [tailwind, "-c", str(config_path), "-i", str(input_path), "-o", str(output), "--minify"],
+            cwd=dashboard_dir, capture_output=True, text=True
+        )
+    if result.returncode != 0:
+        print(f"❌ Build Tailwind fallita: {result.stderr.strip()}")
+        return False
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"✅ {VENDOR_TAILWIND}: {output.stat().st_size:,} byte ({elapsed_ms:.0f} ms)")
+    return True
+
+def build_vendor_assets(dashboard_dir=Path("."), force=False):
+    """Genera le librerie locali; restituisce quelle disponibili per la build"""
+    print("\n📦 LIBRERIE LOCALI (al posto dei CDN)")
+    print("-" * 30)
+    build_tailwind_css(dashboard_dir, force)
+    build_chartjs_bundle(dashboard_dir, force)
+    return [asset for asset in VENDOR_ASSETS if (dashboard_dir / asset).exists()]
+
+def use_vendored_libraries(html, page_path, vendor_assets):
+    """Sostituisce i tag CDN con le librerie locali disponibili"""
+    page_dir = posixpath.dirname(page_path)
+    
+    def local_url(asset):
+        return posixpath.relpath(asset, page_dir or '.')
+    
+    if VENDOR_TAILWIND in vendor_assets and CDN_TAILWIND_PATTERN.search(html):
+        link = f'<link rel="stylesheet" href="{local_url(VENDOR_TAILWIND)}">'
+        html = CDN_TAILWIND_PATTERN.sub(lambda _: link, html, count=1)
+        # La configurazione runtime usa il global del CDN: è già compilata nel CSS
+        html = TAILWIND_CONFIG_PATTERN.sub('', html)
+    if VENDOR_CHARTJS in vendor_assets:
+        script = f'<script src="{local_url(VENDOR_CHARTJS)}"></script>'
+        html = CDN_CHARTJS_PATTERN.sub(lambda _: script, html)
+    return html
+
+def copy_data_chunks(dashboard_dir, build_dir):
+    """Copia nella build l'indice dei dati e i chunk che referenzia"""
+    index_path = dashboard_dir / DATA_DIR / DATA_INDEX_NAME
+    if not index_path.exists():
+        print("⚠️  data/index.json non trovato: esegui 'python scripts/update_data.py --split-only'")
+        return []
+    
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    files = [DATA_INDEX_NAME] + [entry["file"] for entry in index.get("sections", {}).values()]
+    files += [entry["file"] for entry in index.get("deltas", [])]
+    
+    outputs = []
+    for name in files:
+        source = dashboard_dir / DATA_DIR / name
+        target = build_dir / DATA_DIR / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if name == DATA_INDEX_NAME or not target.exists():
+            shutil.copy2(source, target)
+        outputs.append(f"{DATA_DIR}/{name}")
+    print(f"✅ {len(outputs) - 1} chunk di dati e delta + indice copiati")
+    return outputs
+
+def build_fingerprinted(dashboard_dir=Path("."), build_dir=None, vendor_assets=()):
+    """Genera la build in build_dir: asset con hash nel nome, pagine con
+    riferimenti riscritti e un manifest JSON. Restituisce i file prodotti."""
+    build_dir = Path(build_dir) if build_dir else dashboard_dir / BUILD_DIR
+    build_dir.mkdir(parents=True, exist_ok=True)
+    
+    print("\n🔖 BUILD CON ASSET FINGERPRINTED")
+    print("-" * 30)
+    
+    assets = {}
+    hashes = {}
+    outputs = []
+    for rel_path in FINGERPRINTED_ASSETS + list(vendor_assets):
+        source = dashboard_dir / rel_path
+        if not source.exists():
+            print(f"⚠️  Asset non trovato: {rel_path}")
+            continue
+        
+        content = source.read_bytes()
+        digest = content_hash(content)
+        target_name = fingerprint_name(rel_path, digest)
+        target = build_dir / target_name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if not target.exists():
+            target.write_bytes(content)
+        
+        assets[rel_path] = target_name
+        hashes[rel_path] = digest
+        outputs.append(target_name)
+        print(f"✅ {rel_path} → {target_name}")
+    
+    generated = {}
+    if (dashboard_dir / TEMPLATE_PATH).exists():
+        # Pagine di sezione allineate a index.html e ai dati correnti: scritte
+        # solo nella build, le copie di dashboard/ restano quelle versionate
+        sections, generated = render_pages(dashboard_dir)
+        print(f"✅ {len(sections)} pagine di sezione generate")
+    
+    pages = list_pages(dashboard_dir)
+    pages += [page for page in generated if page not in pages]
+    data_dir = dashboard_dir / DATA_DIR
+    prerender = (data_dir / DATA_INDEX_NAME).exists()
+    service_worker = (dashboard_dir / SW_TEMPLATE_PATH).exists()
+    for page in pages:
+        html = generated.get(page) or (dashboard_dir / page).read_text(encoding='utf-8')
+        html = use_vendored_libraries(html, page, vendor_assets)
+        if service_worker:
+            html = add_registration(html, page)
+        if prerender:
+            # KPI e prima sezione con i valori reali già nell'HTML
+            html, stats = prerender_page(html, data_dir)
+            if stats['section']:
+                print(f"🖼️  {page}: prerender di {stats['section']} "
+                      f"({stats['bindings']} valori, {stats['snapshots']} anteprime SVG)")
+        target = build_dir / page
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(rewrite_asset_references(html, page, assets), encoding='utf-8')
+        outputs.append(page)
+    print(f"✅ {len(pages)} pagine con riferimenti riscritti")
+    
+    outputs.extend(copy_data_chunks(dashboard_dir, build_dir))
+    
+    manifest = {
+        "generated": datetime.now().isoformat(timespec='seconds'),
+        "assets": assets,
+        "hashes": hashes,
+        "pages": pages
+    }
+    with open(build_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    outputs.append(MANIFEST_NAME)
+    
+    if service_worker:
+        # Precache della shell con i file appena prodotti (sw.js non ha hash: viene rivalidato)
+        _, sw_build = write_service_worker(dashboard_dir, build_dir, manifest)
+        outputs.append(SW_NAME)
+        print(f"✅ {SW_NAME}: build {sw_build['id']}, {len(sw_build['shell'])} file in precache")
+    
+    removed = remove_stale_outputs(build_dir, outputs)
+    if removed:
+        print(f"🧹 Rimossi {removed} file obsoleti della build precedente")
+    print(f"✅ Manifest scritto: {build_dir / MANIFEST_NAME}")
+    
+    return [build_dir / output for output in outputs]
+
+def remove_stale_outputs(build_dir, outputs):
+    """Elimina dalla build i file (e le varianti compresse) non più prodotti"""
+    keep = set(outputs)
+    removed = 0
+    for path in build_dir.rglob('*'):
+        if not path.is_file():
+            continue
+        rel_path = path.relative_to(build_dir).as_posix()
+        base = re.sub(r'\.(gz|br|zst)$', '', rel_path)
+        if rel_path not in keep and base not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+def fsync_tree(root):
+    """Porta su disco file e directory della generazione prima dello scambio"""
+    for path in sorted(root.rglob('*'), reverse=True):
+        if path.is_file():
+            with open(path, 'rb') as f:
+                os.fsync(f.fileno())
+    for directory in [path for path in root.rglob('*') if path.is_dir()] + [root]:
+        fsync_dir(directory)
+
+def fsync_dir(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def swap_current(releases_dir, release_name):
+    """Punta releases/current alla nuova generazione con un rename atomico"""
+    link = releases_dir / CURRENT_LINK
+    tmp_link = releases_dir / f".{CURRENT_LINK}.tmp"
+    if os.path.lexists(tmp_link):
+        tmp_link.unlink()
+    os.symlink(release_name, tmp_link)
+    os.replace(tmp_link, link)
+    fsync_dir(releases_dir)
+
+def list_releases(releases_dir):
+    """Generazioni pubblicate, dalla più vecchia alla più recente"""
+    return sorted(
+        path for path in releases_dir.iterdir()
+        if path.is_dir() and not path.is_symlink() and not path.name.startswith('.')
+    )
+
+def publish_release(releases_dir=RELEASES_DIR, jobs=None, vendor=True, keep=RELEASES_KEEP):
+    """Costruisce una nuova generazione in staging e la rende attiva atomicamente.
+    
+    Il server che serve releases/current vede la vecchia o la nuova generazione,
+    mai file scritti a metà; le generazioni precedenti restano disponibili per
+    le pagine già aperte."""
+    dashboard_dir = Path(".")
+    releases_dir = Path(releases_dir)
+    releases_dir.mkdir(parents=True, exist_ok=True)
+    current = releases_dir / CURRENT_LINK
+    previous = current.resolve() if current.is_symlink() else None
+    
+    print("🚀 PUBBLICAZIONE GENERAZIONE")
+    print("=" * 50)
+    staging = Path(tempfile.mkdtemp(prefix='.staging-', dir=releases_dir))
+    try:
+        staging.chmod(0o755)  # mkdtemp crea la directory leggibile solo dal proprietario
+        vendor_assets = build_vendor_assets(dashboard_dir) if vendor else []
+        outputs = build_fingerprinted(dashboard_dir, staging, vendor_assets)
+        
+        # Varianti compresse: riusate (hard link) per gli asset con hash già
+        # pubblicati, generate in parallelo per gli altri
+        encodings = available_encodings()
+        tasks = []
+        reused = 0
+        for path in outputs:
+            if path.suffix not in ('.html', '.js', '.css', '.json'):
+                continue
+            rel_path = path.relative_to(staging)
+            old_path = previous / rel_path if previous else None
+            old_variants = [Path(str(old_path) + ENCODING_SUFFIXES[e]) for e in encodings] if old_path else []
+            if (HASHED_NAME_PATTERN.search(path.name) and old_variants
+                    and all(variant.exists() for variant in old_variants)):
+                for encoding, variant in zip(encodings, old_variants):
+                    os.link(variant, str(path) + ENCODING_SUFFIXES[encoding])
+                reused += 1
+            else:
+                tasks.append(str(path))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(compress_variants, tasks, [encodings] * len(tasks)))
+        print(f"🗜️  {len(tasks)} file compressi, {reused} riusati dalla generazione precedente")
+        
+        fsync_tree(staging)
+        release = releases_dir / datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        os.rename(staging, release)
+        fsync_dir(releases_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    
+    swap_current(releases_dir, release.name)
+    print(f"✅ Generazione attiva: {current} → {release.name}")
+    
+    # Retention: la generazione attiva non viene mai rimossa
+    for old in list_releases(releases_dir)[:-keep]:
+        if old != release:
+            shutil.rmtree(old, ignore_errors=True)
+            print(f"🧹 Rimossa generazione {old.name}")
+    return release
+
+def optimize_dashboard(build_dir=None, jobs=None, force=False, vendor=True):
     """Ottimizza la dashboard per performance migliori"""
     
     dashboard_dir = Path(".")
@@ -17,6 +638,8 @@ def optimize_dashboard():
     print("🚀 OTTIMIZZAZIONE DASHBOARD - AVVIO")
     print("=" * 50)
     
+    build_started = time.perf_counter()
+    
     # 1. Verifica minify_html disponibile
     try:
         import minify_html
@@ -25,10 +648,16 @@ def optimize_dashboard():
         html_minify_available = False
         print("⚠️  minify_html non disponibile. Installa con: pip install minify-html")
     
-    # 2. Ottimizza HTML
+    # 2. Ottimizza HTML (saltato se index.min.html è già più recente del sorgente)
     if html_minify_available:
         html_file = dashboard_dir / "index.html"
-        if html_file.exists():
+        min_file = dashboard_dir / "index.min.html"
+        if not html_file.exists():
+            print("❌ File index.html non trovato")
+        elif min_file.exists() and not force and min_file.stat().st_mtime >= html_file.stat().st_mtime:
+            print("⏭️  index.min.html: invariato")
+        else:
+            started = time.perf_counter()
             with open(html_file, 'r', encoding='utf-8') as f:
                 html_content = f.read()
             
@@ -41,66 +670,54 @@ def optimize_dashboard():
             )
             
             # Salva versione minificata
-            with open(dashboard_dir / "index.min.html", 'w', encoding='utf-8') as f:
+            with open(min_file, 'w', encoding='utf-8') as f:
                 f.write(minified_html)
             
             reduction = len(html_content) - len(minified_html)
             reduction_pct = (reduction / len(html_content)) * 100
+            elapsed_ms = (time.perf_counter() - started) * 1000
             
-            print(f"✅ HTML minificato: {reduction:,} byte risparmiati ({reduction_pct:.1f}%)")
-        else:
-            print("❌ File index.html non trovato")
+            print(f"✅ HTML minificato: {reduction:,} byte risparmiati ({reduction_pct:.1f}%) in {elapsed_ms:.0f} ms")
+    
+    # 3. Librerie locali e build con asset fingerprinted e manifest
+    vendor_assets = build_vendor_assets(dashboard_dir, force) if vendor else []
+    build_outputs = build_fingerprinted(dashboard_dir, build_dir, vendor_assets)
     
-    # 3. Comprimi file con gzip per server ottimizzati
+    # 4. Comprimi i file per server ottimizzati (gzip, brotli, zstd)
     files_to_compress = [
         "index.html",
         "js/data.js", 
         "js/main.js",
         "css/style.css"
-    ]
+    ] + [str(path) for path in build_outputs if path.suffix in ('.html', '.js', '.css', '.json')]
     
-    total_original = 0
-    total_compressed = 0
+    print("\n🗜️  COMPRESSIONE (incrementale, parallela)")
+    print("-" * 30)
     
-    for file_path in files_to_compress:
-        file_full_path = dashboard_dir / file_path
-        if file_full_path.exists():
-            with open(file_full_path, 'rb') as f:
-                content = f.read()
-            
-            # Comprimi con gzip
-            compressed_content = gzip.compress(content, compresslevel=9)
-            
-            # Salva versione compressa
-            gz_path = dashboard_dir / f"{file_path}.gz"
-            gz_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(gz_path, 'wb') as f:
-                f.write(compressed_content)
-            
-            original_size = len(content)
-            compressed_size = len(compressed_content)
-            reduction = ((original_size - compressed_size) / original_size) * 100
-            
-            total_original += original_size
-            total_compressed += compressed_size
-            
-            print(f"✅ {file_path}: {original_size:,} → {compressed_size:,} byte ({reduction:.1f}% riduzione)")
+    if not BROTLI_AVAILABLE:
+        print("⚠️  brotli non disponibile. Installa con: pip install brotli")
+    if not ZSTD_AVAILABLE:
+        print("⚠️  zstandard non disponibile. Installa con: pip install zstandard")
+    
+    compression = compress_assets(dashboard_dir, files_to_compress, jobs, force)
+    total_original = sum(stats["original"] for stats in compression.values())
+    total_compressed = sum(stats["variants"].get("gzip", stats["original"]) for stats in compression.values())
     
-    # 4. Statistiche totali
+    # 5. Statistiche totali
     total_reduction = ((total_original - total_compressed) / total_original) * 100
     
     print("\n📊 RISULTATI OTTIMIZZAZIONE")
     print("-" * 30)
     print(f"Dimensione originale: {total_original:,} byte")
     print(f"Dimensione compressa: {total_compressed:,} byte")
-    print(f"Riduzione totale: {total_reduction:.1f}%")
+    print(f"Riduzione totale (gzip): {total_reduction:.1f}%")
+    print(f"Tempo di build: {time.perf_counter() - build_started:.2f}s")
     
-    # 5. Genera report delle performance
+    # 6. Genera report delle performance
     performance_tips = [
         "🌐 Usa server con compressione gzip abilitata",
         "📱 Testa su dispositivi mobili per responsiveness",
-        "⚡ Considera CDN per Chart.js e Tailwind CSS",
+        "📦 Installa chart.js, esbuild e tailwindcss per eliminare i CDN a runtime",
         "🔍 Monitora Core Web Vitals con Lighthouse",
         "📊 Ottimizza immagini se aggiunte in futuro"
     ]
@@ -110,13 +727,15 @@ def optimize_dashboard():
     for tip in performance_tips:
         print(tip)
     
-    # 6. Crea configurazione nginx ottimizzata
+    # 7. Crea configurazione nginx ottimizzata
     nginx_config = """
 # Configurazione Nginx ottimizzata per Dashboard
 server {
     listen 80;
     server_name dashboard.example.com;
-    root /path/to/dashboard-provinciale;
+    # Build generata da optimize.py (asset fingerprinted + asset-manifest.json);
+    # con 'optimize.py --publish' usare releases/current (link scambiato atomicamente)
+    root /path/to/dashboard-provinciale/dist;
     index index.html;
     
     # Compressione gzip
@@ -131,22 +750,30 @@ server {
         application/javascript
         application/json;
     
-    # Cache headers per performance
-    location ~* \\.(js|css|png|jpg|jpeg|gif|ico|svg)$ {
+    # Cache headers per performance: solo i file con hash nel nome sono immutabili
+    location ~* \\.[0-9a-f]{10}\\.(js|css)$ {
         expires 1y;
         add_header Cache-Control "public, immutable";
         add_header Vary Accept-Encoding;
+        gzip_static on;
+    }
+    
+    # Pagine e manifest vanno sempre rivalidati
+    location ~* \\.(html|json)$ {
+        add_header Cache-Control "no-cache";
+        gzip_static on;
+    }
+    
+    # Service worker senza hash nel nome: il browser deve vedere subito la nuova build
+    location = /sw.js {
+        add_header Cache-Control "no-cache";
+        gzip_static on;
     }
     
     # Security headers
     add_header X-Frame-Options "SAMEORIGIN" always;
     add_header X-Content-Type-Options "nosniff" always;
     add_header Referrer-Policy "no-referrer-when-downgrade" always;
-    
-    # Serve pre-compressed files
-    location ~* \\.(js|css|html)$ {
-        gzip_static on;
-    }
 }
 """
     
@@ -155,7 +782,7 @@ server {
     
     print("\n✅ Creato nginx.conf.example per deployment")
     
-    # 7. Test performance con curl se disponibile
+    # 8. Test performance con curl se disponibile
     try:
         import subprocess
         result = subprocess.run(['which', 'curl'], capture_output=True)
@@ -168,5 +795,61 @@ server {
     print("\n🎉 OTTIMIZZAZIONE COMPLETATA!")
     print("=" * 50)
 
+def main():
+    """Funzione principale dello script"""
+    parser = argparse.ArgumentParser(
+        description='Ottimizzazione e build della Dashboard Socio-Economica'
+    )
+    parser.add_argument(
+        '--build-dir',
+        default=BUILD_DIR,
+        help=f'Directory di output della build fingerprinted (default: {BUILD_DIR})'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        help='Processi paralleli per la compressione (default: numero di CPU)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help=f'Ignora {BUILD_CACHE_NAME} e rigenera tutte le varianti'
+    )
+    parser.add_argument(
+        '--no-vendor',
+        action='store_true',
+        help='Non generare Tailwind/Chart.js locali: la build continua a usare i CDN'
+    )
+    parser.add_argument(
+        '--build-only',
+        action='store_true',
+        help='Esegue solo la build fingerprinted (usato da scripts/update_data.py)'
+    )
+    parser.add_argument(
+        '--publish',
+        action='store_true',
+        help=f'Pubblica una nuova generazione in {RELEASES_DIR}/ e scambia atomicamente il link {CURRENT_LINK}'
+    )
+    parser.add_argument(
+        '--releases-dir',
+        default=RELEASES_DIR,
+        help=f'Directory delle generazioni per --publish (default: {RELEASES_DIR})'
+    )
+    parser.add_argument(
+        '--keep',
+        type=int,
+        default=RELEASES_KEEP,
+        help=f'Generazioni conservate dopo --publish (default: {RELEASES_KEEP})'
+    )
+    args = parser.parse_args()
+    
+    if args.publish:
+        publish_release(args.releases_dir, args.jobs, not args.no_vendor, max(1, args.keep))
+    elif args.build_only:
+        vendor_assets = [] if args.no_vendor else build_vendor_assets(Path("."))
+        build_fingerprinted(Path("."), args.build_dir, vendor_assets)
+    else:
+        optimize_dashboard(args.build_dir, args.jobs, args.force, not args.no_vendor)
+
 if __name__ == "__main__":
-    optimize_dashboard()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Prerender - Dashboard Socio-Economica
+Inserisce nelle pagine della build i valori reali dei dati, prima di ogni JavaScript
+
+Gli elementi con data-bind="percorso.in.dashboardData" (e data-format
+int, decimal, percent o text) ricevono il valore formattato; main.js usa gli
+stessi attributi per aggiornarli. Per la sezione visibile all'apertura la
+pagina viene mostrata subito, senza indicatore di caricamento, e i canvas
+con data-snapshot="sezione.percorso.serie:campo1,campo2" ricevono
+un'anteprima SVG statica che main.js sostituisce con il grafico Chart.js.
+"""
+
+import re
+import json
+import html
+import argparse
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+
+from data_codec import JSON_ENCODING, load_chunk
+
+DATA_DIR = "data"
+DATA_INDEX_NAME = "index.json"
+BUILD_DIR = "dist"
+# Radici di dashboardData sempre disponibili nell'indice
+INDEX_ROOTS = ("metadata", "kpi")
+YEAR_FIELD = "anno"
+
+BIND_PATTERN = re.compile(
+    r'(?P<open><(?P<tag>\w+)\b[^>]*\bdata-bind="(?P<path>[^"]+)"[^>]*>)(?P<text>[^<]*)(?P<close></(?P=tag)>)'
+)
+FORMAT_PATTERN = re.compile(r'\bdata-format="(?P<format>\w+)"')
+ACTIVE_SECTION_PATTERN = re.compile(r'<section\s+id="(?P<id>[\w-]+)"\s+class="[^"]*\bactive\b[^"]*"')
+LOADING_PATTERN = re.compile(r'(<div\s+id="loading"\s+class=")')
+CONTENT_PATTERN = re.compile(r'(<div\s+id="content"\s+class=")hidden\s*')
+SNAPSHOT_PATTERN = re.compile(r'<canvas\b[^>]*\bdata-snapshot="(?P<spec>[^"]+)"[^>]*>')
+
+# Stessa palette di Dashboard.colors.chart in main.js
+CHART_COLORS = ['#f97316', '#06b6d4', '#ec4899', '#10b981', '#f59e0b', '#8b5cf6', '#ef4444', '#6b7280']
+GRID_COLOR = '#334155'
+TEXT_COLOR = '#e2e8f0'
+SNAPSHOT_WIDTH = 600
+SNAPSHOT_HEIGHT = 300
+SNAPSHOT_PADDING = 28
+
+def format_value(value, fmt):
+    """Formattazione italiana identica a Dashboard.formatValue in main.js"""
+    if fmt == 'text' or isinstance(value, bool) or not isinstance(value, (int, float)):
+        return str(value)
+    decimals = 0 if fmt == 'int' else 1
+    # Arrotondamento per eccesso sui valori esatti a metà, come Number.toFixed
+    rounded = Decimal(abs(value)).quantize(Decimal(1).scaleb(-decimals), rounding=ROUND_HALF_UP)
+    integer, _, fraction = f"{rounded:f}".partition('.')
+    grouped = f"{int(integer):,}".replace(',', '.')
+    sign = '-' if value < 0 and rounded else ''
+    text = sign + grouped + (',' + fraction if fraction else '')
+    return text + '%' if fmt == 'percent' else text
+
+def get_path(data, path):
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+def first_section(page_html):
+    """Sezione visibile all'apertura (quella con la classe 'active')"""
+    match = ACTIVE_SECTION_PATTERN.search(page_html)
+    return match.group('id') if match else None
+
+def load_page_data(data_dir, sections):
+    """Metadata e KPI dall'indice più i chunk delle sezioni richieste"""
+    data_dir = Path(data_dir)
+    with open(data_dir / DATA_INDEX_NAME, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    data = {root: index.get(root, {}) for root in INDEX_ROOTS}
+    for section in sections:
+        entry = index.get("sections", {}).get(section)
+        if entry:
+            data[section] = load_chunk(data_dir / entry["file"], index.get("encoding", JSON_ENCODING))
+    return data
+
+def fill_bindings(page_html, data, stats):
+    """Sostituisce il testo degli elementi data-bind i cui dati sono disponibili"""
+    def replace(match):
+        path = match.group('path').split('.')
+        if path[0] not in data:
+            return match.group(0)
+        value = get_path(data, path)
+        if value is None:
+            print(f"⚠️  data-bind senza valore: {match.group('path')}")
+            return match.group(0)
+        format_match = FORMAT_PATTERN.search(match.group('open'))
+        text = format_value(value, format_match.group('format') if format_match else 'text')
+        stats['bindings'] += 1
+        return match.group('open') + html.escape(text, quote=False) + match.group('close')
+    return BIND_PATTERN.sub(replace, page_html)
+
+def render_snapshot(rows, fields, label):
+    """Grafico a linee SVG di una serie storica (anteprima statica del canvas)"""
+    rows = [row for row in rows if isinstance(row.get(YEAR_FIELD), (int, float))]
+    values = [row[field] for row in rows for field in fields
+              if isinstance(row.get(field), (int, float))]
+    if len(rows) < 2 or not values:
+        return ''
+    low, high = min(values + [0]), max(values + [0])
+    span = (high - low) or 1
+    left = top = SNAPSHOT_PADDING
+    width = SNAPSHOT_WIDTH - 2 * SNAPSHOT_PADDING
+    height = SNAPSHOT_HEIGHT - 2 * SNAPSHOT_PADDING
+
+    def x(i):
+        return left + i * width / (len(rows) - 1)
+
+    def y(value):
+        return top + (high - value) * height / span
+
+    parts = [
+        f'<svg class="chart-snapshot" viewBox="0 0 {SNAPSHOT_WIDTH} {SNAPSHOT_HEIGHT}" '
+        f'preserveAspectRatio="none" role="img" aria-label="{html.escape(label)}">',
+        f'<line x1="{left}" y1="{y(0):.1f}" x2="{left + width}" y2="{y(0):.1f}" '
+        f'stroke="{GRID_COLOR}" vector-effect="non-scaling-stroke"/>'
+    ]
+    for index, field in enumerate(fields):
+        points = ' '.join(
+            f"{x(i):.1f},{y(row[field]):.1f}"
+            for i, row in enumerate(rows) if isinstance(row.get(field), (int, float))
+        )
+        parts.append(f'<polyline points="{points}" fill="none" stroke="{CHART_COLORS[index % len(CHART_COLORS)]}" '
+                     f'stroke-width="2" vector-effect="non-scaling-stroke"/>')
+    for i in (0, len(rows) - 1):
+        anchor = 'start' if i == 0 else 'end'
+        parts.append(f'<text x="{x(i):.1f}" y="{SNAPSHOT_HEIGHT - 8}" fill="{TEXT_COLOR}" font-size="12" '
+                     f'text-anchor="{anchor}">{rows[i][YEAR_FIELD]}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def insert_snapshots(page_html, data, stats):
+    """Anteprima SVG prima di ogni canvas data-snapshot con dati disponibili"""
+    def replace(match):
+        path, _, fields = match.group('spec').partition(':')
+        path = path.split('.')
+        rows = get_path(data, path) if path[0] in data else None
+        if not isinstance(rows, list) or not fields:
+            return match.group(0)
+        svg = render_snapshot(rows, fields.split(','), '.'.join(path[1:]))
+        if svg:
+            stats['snapshots'] += 1
+        return svg + match.group(0)
+    return SNAPSHOT_PATTERN.sub(replace, page_html)
+
+def prerender_page(page_html, data_dir, svg=True):
+    """Restituisce (html, statistiche); le pagine senza sezioni restano invariate"""
+    stats = {'section': None, 'bindings': 0, 'snapshots': 0}
+    section = first_section(page_html)
+    if section is None or not CONTENT_PATTERN.search(page_html):
+        # Nessuna sezione, oppure pagina già prerenderizzata (contenuto già visibile)
+        return page_html, stats
+    stats['section'] = section
+    data = load_page_data(data_dir, [section])
+    page_html = fill_bindings(page_html, data, stats)
+    if svg:
+        page_html = insert_snapshots(page_html, data, stats)
+    # Contenuto visibile subito: main.js aggiorna e idrata senza indicatore di caricamento
+    page_html = LOADING_PATTERN.sub(r'\1hidden ', page_html, count=1)
+    page_html = CONTENT_PATTERN.sub(r'\1', page_html, count=1)
+    return page_html, stats
+
+def main():
+    """Prerender delle pagine di una build già generata da optimize.py"""
+    parser = argparse.ArgumentParser(
+        description='Prerender dei KPI e della prima sezione nelle pagine della build'
+    )
+    parser.add_argument(
+        '--build-dir',
+        default=BUILD_DIR,
+        help=f'Build di optimize.py con le pagine e data/ (default: {BUILD_DIR})'
+    )
+    parser.add_argument(
+        '--no-svg',
+        action='store_true',
+        help='Non generare le anteprime SVG dei grafici'
+    )
+    args = parser.parse_args()
+
+    build_dir = Path(args.build_dir)
+    data_dir = build_dir / DATA_DIR
+    if not (data_dir / DATA_INDEX_NAME).exists():
+        print(f"❌ {data_dir / DATA_INDEX_NAME} non trovato: esegui prima 'python optimize.py'")
+        raise SystemExit(1)
+
+    print("🖼️  PRERENDER DELLE PAGINE")
+    print("=" * 50)
+    for page in sorted(build_dir.glob('*.html')):
+        content = page.read_text(encoding='utf-8')
+        rendered, stats = prerender_page(content, data_dir, not args.no_svg)
+        if rendered != content:
+            page.write_text(rendered, encoding='utf-8')
+        if stats['section']:
+            print(f"✅ {page.name}: sezione {stats['section']}, "
+                  f"{stats['bindings']} valori, {stats['snapshots']} anteprime SVG")
+
+if __name__ == "__main__":
+    main()
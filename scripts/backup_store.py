@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Backup Store - Dashboard Socio-Economica
+Archivio dei backup di data.js indirizzato per contenuto
+
+    backups/
+    ├── index.json               # versioni: id, hash, data, versione dati
+    └── objects/ab/abcdef….gz    # snapshot compressi, nominati per SHA-256
+
+Snapshot identici condividono lo stesso oggetto (e uno snapshot uguale
+all'ultimo non crea una nuova versione); la retention rimuove le versioni
+vecchie e gli oggetti non più referenziati.
+"""
+
+import os
+import re
+import gzip
+import json
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+INDEX_NAME = "index.json"
+OBJECTS_DIR = "objects"
+DEFAULT_KEEP_LAST = 10
+DEFAULT_KEEP_DAYS = 90
+# Backup nel formato precedente (copie integrali con timestamp nel nome)
+LEGACY_PATTERN = re.compile(r'^data_backup_(\d{8}_\d{6})\.js$')
+
+def write_atomic(path, payload):
+    """File temporaneo, fsync e rename: chi legge vede il vecchio o il nuovo contenuto"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class BackupStore:
+    """Backup deduplicati con retention e ripristino diretto per id"""
+
+    def __init__(self, root, keep_last=DEFAULT_KEEP_LAST, keep_days=DEFAULT_KEEP_DAYS):
+        self.root = Path(root)
+        self.keep_last = keep_last
+        self.keep_days = keep_days
+        self.index_path = self.root / INDEX_NAME
+        self._index = None
+
+    def _load(self):
+        if self._index is None:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {"next_id": 1, "versions": []}
+            self._by_id = {entry["id"]: entry for entry in self._index["versions"]}
+        return self._index
+
+    def _save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(self._index, ensure_ascii=False, indent=2).encode('utf-8')
+        write_atomic(self.index_path, payload)
+
+    def object_path(self, digest):
+        return self.root / OBJECTS_DIR / digest[:2] / f"{digest}.gz"
+
+    def versions(self):
+        """Versioni conservate, dalla più vecchia alla più recente"""
+        return list(self._load()["versions"])
+
+    def save(self, source, label=None, created=None):
+        """Salva uno snapshot di `source`; restituisce la voce dell'indice"""
+        index = self._load()
+        content = Path(source).read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+
+        if index["versions"] and index["versions"][-1]["hash"] == digest:
+            return index["versions"][-1]
+
+        object_path = self.object_path(digest)
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(object_path, gzip.compress(content, compresslevel=9, mtime=0))
+
+        entry = {
+            "id": index["next_id"],
+            "hash": digest,
+            "created": (created or datetime.now()).isoformat(timespec='seconds'),
+            "size": len(content),
+            "label": label
+        }
+        index["next_id"] += 1
+        index["versions"].append(entry)
+        self._by_id[entry["id"]] = entry
+        self.apply_retention()
+        self._save()
+        return entry
+
+    def get(self, version_id):
+        """Voce dell'indice per id (None se non conservata)"""
+        self._load()
+        return self._by_id.get(version_id)
+
+    def restore(self, version_id, target):
+        """Riscrive `target` con lo snapshot indicato: un solo oggetto da leggere"""
+        entry = self.get(version_id)
+        if entry is None:
+            raise KeyError(f"Backup {version_id} non presente")
+        content = gzip.decompress(self.object_path(entry["hash"]).read_bytes())
+        if hashlib.sha256(content).hexdigest() != entry["hash"]:
+            raise ValueError(f"Backup {version_id} corrotto")
+        Path(target).parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(Path(target), content)
+        return entry
+
+    def apply_retention(self, now=None):
+        """Conserva le ultime `keep_last` versioni e quelle più recenti di
+        `keep_days` giorni, poi elimina gli oggetti non più referenziati"""
+        index = self._load()
+        versions = index["versions"]
+        cutoff = ((now or datetime.now()) - timedelta(days=self.keep_days)).isoformat(timespec='seconds')
+        recent = versions[-self.keep_last:] if self.keep_last > 0 else []
+        kept = [entry for entry in versions if entry in recent or entry["created"] >= cutoff]
+        removed = len(versions) - len(kept)
+        if removed:
+            index["versions"] = kept
+            self._by_id = {entry["id"]: entry for entry in kept}
+            referenced = {entry["hash"] for entry in kept}
+            for object_path in (self.root / OBJECTS_DIR).glob('*/*.gz'):
+                if object_path.name[:-3] not in referenced:
+                    object_path.unlink()
+        return removed
+
+    def import_legacy(self):
+        """Importa i vecchi backup data_backup_<timestamp>.js e li rimuove"""
+        legacy = sorted(path for path in self.root.glob('data_backup_*.js')
+                        if LEGACY_PATTERN.match(path.name))
+        for path in legacy:
+            created = datetime.strptime(LEGACY_PATTERN.match(path.name).group(1), "%Y%m%d_%H%M%S")
+            self.save(path, label=path.name, created=created)
+            path.unlink()
+        return len(legacy)
@@ -0,0 +1,747 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Dashboard Socio-Economica
+Load test del server, tempi di build/aggiornamento e peso delle sezioni
+
+`download` misura throughput e CPU del server sui file grandi (export di
+dati), con sendfile e con la copia attraverso buffer Python (--no-sendfile).
+
+`encoding` confronta js/data.js con i chunk in JSON a righe e in formato
+colonnare (data_codec.py): byte, byte gzip e tempo di parsing in Python e,
+se disponibile, in Node con il decoder di main.js.
+
+Con `suite` i risultati vengono scritti in JSON (--output) e confrontati con
+quelli di un commit precedente (--baseline): una metrica peggiorata oltre la
+soglia percentuale fa uscire lo script con codice 1.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import platform
+import argparse
+import statistics
+import threading
+import tempfile
+import subprocess
+import http.client
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+from series_store import SeriesStore, ingest_edition
+from optimize import compress_gzip
+from data_codec import COLUMNAR_ENCODING, JSON_ENCODING, encode_chunk, decode_columnar
+from update_data import DATA_SECTIONS, parse_data_js, compact_json
+from derived_metrics import with_chart_arrays
+
+# Asset richiesti da un browser al caricamento della dashboard
+DASHBOARD_ASSETS = [
+    "/index.html",
+    "/data/index.json",
+    "/js/main.js",
+    "/css/style.css"
+]
+
+def find_free_port():
+    """Chiede al sistema operativo una porta libera"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+def wait_for_port(port, timeout=10.0):
+    """Attende che il server accetti connessioni"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('localhost', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def start_server(mode, workers, extra_args=()):
+    """Avvia server.py in un sottoprocesso e restituisce (processo, porta)"""
+    port = find_free_port()
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "-p", str(port), "--no-browser", "--quiet",
+         "--mode", mode, "--workers", str(workers), *extra_args],
+        cwd=PROJECT_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    if not wait_for_port(port):
+        process.kill()
+        raise RuntimeError(f"Il server in modalità {mode} non si è avviato")
+    return process, port
+
+def stop_server(process):
+    """Ferma il server con SIGTERM (spegnimento graceful)"""
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def percentile(values, pct):
+    """Percentile con interpolazione al valore più vicino"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def run_load(port, concurrency, requests_per_client, paths=DASHBOARD_ASSETS, headers=None):
+    """Simula `concurrency` client keep-alive che richiedono ciclicamente gli asset"""
+    latencies = []
+    errors = []
+    transferred = [0]
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def client():
+        local_latencies = []
+        local_errors = 0
+        local_bytes = 0
+        conn = http.client.HTTPConnection('localhost', port, timeout=30)
+        start_barrier.wait()
+        for i in range(requests_per_client):
+            path = paths[i % len(paths)]
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers or {})
+                response = conn.getresponse()
+                body = response.read()
+                if response.status >= 400:
+                    local_errors += 1
+                local_bytes += len(body)
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection('localhost', port, timeout=30)
+            local_latencies.append(time.perf_counter() - started)
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+            transferred[0] += local_bytes
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "bytes": transferred[0],
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2)
+    }
+
+def benchmark_load(modes, concurrency_levels, requests_per_client, workers):
+    """Esegue il load test per ogni modalità e livello di concorrenza"""
+    results = []
+    for mode in modes:
+        process, port = start_server(mode, workers)
+        try:
+            for concurrency in concurrency_levels:
+                result = run_load(port, concurrency, requests_per_client)
+                result["mode"] = mode
+                results.append(result)
+                print(f"   {mode:<9} c={concurrency:<4} {result['requests_per_s']:>9,.1f} req/s   "
+                      f"p50 {result['p50_ms']:>8.2f} ms   p99 {result['p99_ms']:>8.2f} ms   "
+                      f"errori {result['errors']}")
+        finally:
+            stop_server(process)
+    return results
+
+# File e cartelle esclusi dalla copia del progetto usata per i tempi di build
+COPY_IGNORE = shutil.ignore_patterns(
+    '.git', 'dist', 'releases', 'provinces', 'backups', 'node_modules', 'vendor',
+    '__pycache__', '*.gz', '*.br', '*.zst', '.build-cache.json'
+)
+BUILD_COMMANDS = {
+    # Build completa (minify, build fingerprinted, compressione) senza cache incrementale
+    "optimize": ["optimize.py", "--force", "--no-vendor"],
+    "optimize_build_only": ["optimize.py", "--build-only", "--no-vendor"],
+    "update_data_split": ["scripts/update_data.py", "--split-only"],
+}
+RSP_FIXTURE_NAME = "RSP_Benchmark_2024.txt"
+# Metriche per cui un valore più alto è migliore; per tutte le altre vale il contrario
+HIGHER_IS_BETTER = ("requests_per_s",)
+DEFAULT_THRESHOLD = 10.0
+
+def run_timed(project_dir, command):
+    """Esegue uno script del progetto e ne restituisce la durata in secondi"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, *command], cwd=project_dir,
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} fallito:\n{result.stdout[-2000:]}{result.stderr[-2000:]}")
+    return elapsed
+
+def benchmark_build(repeat):
+    """Tempi end-to-end di optimize.py e update_data.py su una copia del progetto
+    (il repository non viene modificato); per ogni comando la mediana di `repeat` esecuzioni"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "project"
+        shutil.copytree(PROJECT_DIR, project, ignore=COPY_IGNORE)
+        fixture = Path(tmp) / RSP_FIXTURE_NAME
+        run_timed(project, ["scripts/update_data.py", "--export-rsp", str(fixture)])
+        # Aggiornamento completo da export RSP: backup, chunk, serie, test di integrità e build di dist/
+        commands = dict(BUILD_COMMANDS, update_data=["scripts/update_data.py", str(fixture)])
+        for name, command in commands.items():
+            timings = [run_timed(project, command) for _ in range(repeat)]
+            results[name] = {
+                "median_s": round(statistics.median(timings), 3),
+                "min_s": round(min(timings), 3),
+                "runs": len(timings)
+            }
+            print(f"   {name:<20} mediana {results[name]['median_s']:>7.3f} s   "
+                  f"min {results[name]['min_s']:>7.3f} s   ({len(timings)} esecuzioni)")
+    return results
+
+def measure_payloads(project_dir=PROJECT_DIR):
+    """Byte scaricati all'apertura di ogni sezione: indice, chunk e pagina di dashboard/"""
+    data_dir = project_dir / "data"
+    with open(data_dir / "index.json", 'rb') as f:
+        index_bytes = f.read()
+    index = json.loads(index_bytes)
+    results = {}
+    for section, entry in index["sections"].items():
+        chunk = (data_dir / entry["file"]).read_bytes()
+        page_path = project_dir / "dashboard" / f"{section}.html"
+        page = page_path.read_bytes() if page_path.exists() else b""
+        payload = index_bytes + chunk
+        results[section] = {
+            "chunk_bytes": len(chunk),
+            "chunk_gzip_bytes": len(compress_gzip(chunk)),
+            "page_bytes": len(page),
+            "page_gzip_bytes": len(compress_gzip(page)) if page else 0,
+            # Dati scaricati dalla pagina: indice + chunk della sezione
+            "data_gzip_bytes": len(compress_gzip(index_bytes)) + len(compress_gzip(chunk)),
+            "data_bytes": len(payload)
+        }
+        print(f"   {section:<20} chunk {len(chunk):>7,} B ({results[section]['chunk_gzip_bytes']:>6,} gz)   "
+              f"pagina {len(page):>7,} B ({results[section]['page_gzip_bytes']:>6,} gz)")
+    return results
+
+def git_revision(project_dir=PROJECT_DIR):
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_dir,
+                                capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+def flatten_metrics(results):
+    """Metriche confrontabili di un file di risultati: nome puntato → valore"""
+    metrics = {}
+    for entry in results.get("load", []):
+        prefix = f"load.{entry['mode']}.c{entry['concurrency']}"
+        for field in ("requests_per_s", "p50_ms", "p99_ms", "errors"):
+            metrics[f"{prefix}.{field}"] = entry[field]
+    for name, timing in results.get("build", {}).items():
+        metrics[f"build.{name}.median_s"] = timing["median_s"]
+    for section, sizes in results.get("payload", {}).items():
+        for field, value in sizes.items():
+            metrics[f"payload.{section}.{field}"] = value
+    return metrics
+
+def compare_results(baseline, current, threshold):
+    """Metriche peggiorate di oltre `threshold` percento: lista di (nome, prima, dopo, variazione %)"""
+    before, after = flatten_metrics(baseline), flatten_metrics(current)
+    regressions = []
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        if name.endswith(".errors"):
+            if new > old:
+                regressions.append((name, old, new, None))
+            continue
+        if not old:
+            continue
+        change = (new - old) / old * 100
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        if worse > threshold:
+            regressions.append((name, old, new, round(change, 1)))
+    return regressions
+
+def report_regressions(regressions, threshold):
+    if not regressions:
+        print(f"✅ Nessuna regressione oltre il {threshold:g}%")
+        return True
+    print(f"❌ {len(regressions)} metriche peggiorate oltre il {threshold:g}%:")
+    for name, old, new, change in regressions:
+        change = "nuovi errori" if change is None else f"{change:+.1f}%"
+        print(f"   {name:<45} {old:>12,} → {new:>12,}   ({change})")
+    return False
+
+def build_synthetic_store(store_dir, years, last_year=2024):
+    """Archivio con `years` anni di una serie a tre campi, come saldo_naturale"""
+    rows = [
+        {"anno": year, "nascite": 3000 - i % 500, "decessi": 3800 + i % 700, "saldo": -800 - i % 200}
+        for i, year in enumerate(range(last_year - years + 1, last_year + 1))
+    ]
+    data = {
+        "metadata": {"anno": last_year},
+        "demografia": {"saldo_naturale": {"serie_storica": rows}}
+    }
+    ingest_edition(store_dir, data, ["demografia"])
+
+def benchmark_series(year_counts, window, concurrency, requests_per_client, workers):
+    """Latenza di /api/series per una finestra fissa di anni al crescere dell'archivio"""
+    results = []
+    for years in year_counts:
+        with tempfile.TemporaryDirectory() as store_dir:
+            build_synthetic_store(store_dir, years)
+            query = (f"/api/series?section=demografia&indicator=saldo_naturale.serie_storica"
+                     f"&from={2024 - window + 1}&to=2024")
+            
+            # Query diretta sull'archivio mappato, senza HTTP
+            store = SeriesStore(store_dir)
+            iterations = 2000
+            started = time.perf_counter()
+            for _ in range(iterations):
+                store.query("demografia", "saldo_naturale.serie_storica", 2024 - window + 1, 2024)
+            direct_us = (time.perf_counter() - started) / iterations * 1e6
+            
+            process, port = start_server('threaded', workers, ["--series-dir", store_dir])
+            try:
+                result = run_load(port, concurrency, requests_per_client, paths=[query])
+            finally:
+                stop_server(process)
+            result.update({"years": years, "window": window, "direct_us": round(direct_us, 1)})
+            results.append(result)
+            print(f"   {years:>7,} anni   query {direct_us:>7.1f} µs   HTTP p50 {result['p50_ms']:>6.2f} ms   "
+                  f"p99 {result['p99_ms']:>6.2f} ms   {result['requests_per_s']:>8,.1f} req/s   "
+                  f"errori {result['errors']}")
+    return results
+
+def write_export(path, size_mb):
+    """CSV sintetico di `size_mb` MB, come un export completo dei dati"""
+    row = b"anno,sezione,indicatore,valore\n" + b"".join(
+        f"{2000 + i % 25},demografia,indicatore_{i % 97},{i * 7 % 100000}\n".encode() for i in range(20000)
+    )
+    with open(path, 'wb') as f:
+        for _ in range(max(1, size_mb * 1024 * 1024 // len(row))):
+            f.write(row)
+    return path.stat().st_size
+
+def process_cpu_seconds(pid):
+    """Tempo CPU (utente + sistema) di un processo, da /proc; None dove non disponibile"""
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+def run_downloads(port, path, concurrency, downloads_per_client, size):
+    """Download completi e simultanei di `path`; restituisce (byte, secondi, errori)"""
+    transferred = [0]
+    errors = [0]
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def client():
+        buffer = bytearray(1024 * 1024)
+        view = memoryview(buffer)
+        conn = http.client.HTTPConnection('localhost', port, timeout=60)
+        start_barrier.wait()
+        for _ in range(downloads_per_client):
+            received = 0
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                while True:
+                    count = response.readinto(view)
+                    if not count:
+                        break
+                    received += count
+                failed = response.status != 200 or received != size
+            except (OSError, http.client.HTTPException):
+                failed = True
+                conn.close()
+                conn = http.client.HTTPConnection('localhost', port, timeout=60)
+            with lock:
+                transferred[0] += received
+                errors[0] += failed
+        conn.close()
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return transferred[0], time.perf_counter() - started, errors[0]
+
+def check_range(port, path, content_path, size):
+    """Verifica che un intervallo 206 coincida con i byte del file"""
+    start, end = size // 3, size // 3 + 65535
+    conn = http.client.HTTPConnection('localhost', port, timeout=30)
+    try:
+        conn.request('GET', path, headers={'Range': f'bytes={start}-{end}'})
+        response = conn.getresponse()
+        body = response.read()
+    finally:
+        conn.close()
+    with open(content_path, 'rb') as f:
+        f.seek(start)
+        expected = f.read(end - start + 1)
+    return response.status == 206 and body == expected
+
+def benchmark_download(modes, size_mb, concurrency, downloads_per_client, workers):
+    """Throughput e CPU del server per un export grande, con e senza sendfile"""
+    results = []
+    with tempfile.TemporaryDirectory(dir=PROJECT_DIR, prefix='.bench-') as export_dir:
+        export_path = Path(export_dir) / "export.csv"
+        size = write_export(export_path, size_mb)
+        url_path = "/" + export_path.relative_to(PROJECT_DIR).as_posix()
+        print(f"   Export sintetico: {size / 1024 / 1024:,.1f} MB")
+        for mode in modes:
+            for sendfile in (True, False):
+                process, port = start_server(mode, workers, [] if sendfile else ["--no-sendfile"])
+                try:
+                    range_ok = check_range(port, url_path, export_path, size)
+                    cpu_before = process_cpu_seconds(process.pid)
+                    transferred, elapsed, errors = run_downloads(port, url_path, concurrency,
+                                                                 downloads_per_client, size)
+                    cpu_after = process_cpu_seconds(process.pid)
+                finally:
+                    stop_server(process)
+                gigabytes = transferred / 1024 ** 3
+                cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+                result = {
+                    "mode": mode,
+                    "sendfile": sendfile,
+                    "concurrency": concurrency,
+                    "bytes": transferred,
+                    "errors": errors,
+                    "range_ok": range_ok,
+                    "mb_per_s": round(transferred / 1024 / 1024 / elapsed, 1) if elapsed else 0.0,
+                    "server_cpu_s_per_gb": round(cpu / gigabytes, 3) if cpu is not None and gigabytes else None
+                }
+                results.append(result)
+                cpu_text = (f"{result['server_cpu_s_per_gb']:>6.3f} s CPU/GB"
+                            if result['server_cpu_s_per_gb'] is not None else "CPU n.d.")
+                print(f"   {mode:<9} {'sendfile' if sendfile else 'copia':<9} {result['mb_per_s']:>9,.1f} MB/s   "
+                      f"{cpu_text}   range {'✅' if range_ok else '❌'}   errori {errors}")
+    return results
+
+# Parsing nel motore JavaScript: data.js valutato come script, chunk con JSON.parse
+# (+ Dashboard.decodeColumnar per il formato colonnare)
+NODE_PARSE_SCRIPT = r"""
+const fs = require('fs');
+const path = require('path');
+const dir = process.env.BENCH_DIR;
+const repeat = Number(process.env.BENCH_REPEAT);
+global.document = { addEventListener() {} };
+const Dashboard = require(process.env.BENCH_MAIN_JS);
+const decoder = Object.create(Dashboard.prototype);
+const read = (name) => fs.readdirSync(path.join(dir, name)).map(file => fs.readFileSync(path.join(dir, name, file), 'utf8'));
+const dataJs = fs.readFileSync(path.join(dir, 'data.js'), 'utf8');
+const parsers = {
+    // Un commento diverso a ogni esecuzione evita la cache di compilazione di V8
+    'data.js': [[dataJs], (source) => new Function(source + '; return dashboardData; //' + Math.random())()],
+    json: [read('json'), (source) => JSON.parse(source)],
+    columnar: [read('columnar'), (source) => decoder.decodeColumnar(JSON.parse(source))]
+};
+const results = {};
+for (const [name, [sources, parse]] of Object.entries(parsers)) {
+    sources.forEach(parse);
+    const timings = [];
+    for (let i = 0; i < repeat; i++) {
+        const started = process.hrtime.bigint();
+        sources.forEach(parse);
+        timings.push(Number(process.hrtime.bigint() - started) / 1e6);
+    }
+    timings.sort((a, b) => a - b);
+    results[name] = timings[Math.floor(timings.length / 2)];
+}
+console.log(JSON.stringify(results));
+"""
+
+def node_parse_times(payloads, repeat):
+    """Mediana in ms del parsing di ogni formato in Node (None se node non è installato)"""
+    node = shutil.which('node')
+    if not node:
+        return None
+    with tempfile.TemporaryDirectory(prefix='bench-encoding-') as bench_dir:
+        bench_dir = Path(bench_dir)
+        (bench_dir / "data.js").write_bytes(payloads["data.js"][0])
+        for name in (JSON_ENCODING, COLUMNAR_ENCODING):
+            (bench_dir / name).mkdir()
+            for number, payload in enumerate(payloads[name]):
+                (bench_dir / name / f"{number}.json").write_bytes(payload)
+        env = dict(os.environ, BENCH_DIR=str(bench_dir), BENCH_REPEAT=str(repeat),
+                   BENCH_MAIN_JS=str((PROJECT_DIR / "js" / "main.js").resolve()))
+        result = subprocess.run([node, "-e", NODE_PARSE_SCRIPT], env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"   ⚠️  Parsing in Node non riuscito: {result.stderr.strip().splitlines()[-1:]}")
+        return None
+    return json.loads(result.stdout)
+
+def benchmark_encoding(repeat, project_dir=PROJECT_DIR):
+    """Byte e tempo di parsing di data.js e dei chunk di tutte le sezioni nei due formati"""
+    data_js = (project_dir / "js" / "data.js").read_bytes()
+    data = parse_data_js(data_js.decode('utf-8'))
+    chunks = [with_chart_arrays(section, data[section]) for section in DATA_SECTIONS if section in data]
+    payloads = {
+        "data.js": [data_js],
+        JSON_ENCODING: [compact_json(encode_chunk(chunk, JSON_ENCODING)).encode('utf-8') for chunk in chunks],
+        COLUMNAR_ENCODING: [compact_json(encode_chunk(chunk, COLUMNAR_ENCODING)).encode('utf-8')
+                            for chunk in chunks]
+    }
+    python_parsers = {
+        "data.js": lambda payload: parse_data_js(payload.decode('utf-8')),
+        JSON_ENCODING: json.loads,
+        COLUMNAR_ENCODING: lambda payload: decode_columnar(json.loads(payload))
+    }
+    node_times = node_parse_times(payloads, repeat)
+    results = {}
+    for name, parts in payloads.items():
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for payload in parts:
+                python_parsers[name](payload)
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = {
+            "bytes": sum(len(payload) for payload in parts),
+            "gzip_bytes": sum(len(compress_gzip(payload)) for payload in parts),
+            "python_parse_ms": round(statistics.median(timings), 3),
+            "node_parse_ms": round(node_times[name], 3) if node_times else None
+        }
+        node_text = (f"{results[name]['node_parse_ms']:>7.3f} ms node"
+                     if node_times else "node n.d.")
+        print(f"   {name:<9} {results[name]['bytes']:>8,} B ({results[name]['gzip_bytes']:>7,} gz)   "
+              f"parsing {results[name]['python_parse_ms']:>8.3f} ms python  {node_text}")
+    return results
+
+def main():
+    """Funzione principale del benchmark"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark della Dashboard Socio-Economica',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Esempi d'uso:
+  python3 scripts/benchmark.py load
+  python3 scripts/benchmark.py load --modes single async -c 100 200
+  python3 scripts/benchmark.py series --years 10 1000 100000
+  python3 scripts/benchmark.py build --repeat 5
+  python3 scripts/benchmark.py payload
+  python3 scripts/benchmark.py download --size 512 -c 4
+  python3 scripts/benchmark.py encoding --repeat 200
+  python3 scripts/benchmark.py suite --output bench.json --baseline bench-main.json --threshold 15
+  python3 scripts/benchmark.py compare bench-main.json bench.json
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    load_parser = subparsers.add_parser('load', help='Load test di server.py')
+    load_parser.add_argument(
+        '--modes', nargs='+', default=['single', 'threaded', 'async'],
+        choices=['single', 'threaded', 'async'],
+        help='Modalità del server da confrontare'
+    )
+    load_parser.add_argument(
+        '-c', '--concurrency', nargs='+', type=int, default=[10, 100],
+        help='Livelli di concorrenza (client simultanei)'
+    )
+    load_parser.add_argument(
+        '-n', '--requests', type=int, default=40,
+        help='Richieste per client (default: 40)'
+    )
+    load_parser.add_argument(
+        '--workers', type=int, default=32,
+        help='Worker del server per le modalità threaded/async (default: 32)'
+    )
+
+    series_parser = subparsers.add_parser('series', help='Latenza di /api/series al crescere degli anni archiviati')
+    series_parser.add_argument(
+        '--years', nargs='+', type=int, default=[10, 100, 1000, 10000, 100000],
+        help='Numero di anni nell\'archivio sintetico'
+    )
+    series_parser.add_argument(
+        '--window', type=int, default=10,
+        help='Anni richiesti per query (default: 10)'
+    )
+    series_parser.add_argument(
+        '-c', '--concurrency', type=int, default=10,
+        help='Client simultanei (default: 10)'
+    )
+    series_parser.add_argument(
+        '-n', '--requests', type=int, default=200,
+        help='Richieste per client (default: 200)'
+    )
+    series_parser.add_argument(
+        '--workers', type=int, default=32,
+        help='Worker del server (default: 32)'
+    )
+
+    build_parser = subparsers.add_parser('build', help='Tempi di optimize.py e update_data.py')
+    build_parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='Esecuzioni per comando, di cui si riporta la mediana (default: 3)'
+    )
+
+    subparsers.add_parser('payload', help='Byte scaricati per sezione (indice, chunk, pagina)')
+
+    download_parser = subparsers.add_parser('download', help='Throughput e CPU del server su un export grande')
+    download_parser.add_argument(
+        '--modes', nargs='+', default=['threaded', 'async'],
+        choices=['single', 'threaded', 'async'],
+        help='Modalità del server da misurare (default: threaded async)'
+    )
+    download_parser.add_argument(
+        '--size', type=int, default=256,
+        help='Dimensione dell\'export sintetico in MB (default: 256)'
+    )
+    download_parser.add_argument(
+        '-c', '--concurrency', type=int, default=4,
+        help='Download simultanei (default: 4)'
+    )
+    download_parser.add_argument(
+        '-n', '--downloads', type=int, default=3,
+        help='Download completi per client (default: 3)'
+    )
+    download_parser.add_argument(
+        '--workers', type=int, default=32,
+        help='Worker del server (default: 32)'
+    )
+
+    encoding_parser = subparsers.add_parser('encoding', help='data.js e chunk JSON a righe o colonnari: byte e parsing')
+    encoding_parser.add_argument(
+        '--repeat', type=int, default=100,
+        help='Parsing ripetuti per formato, di cui si riporta la mediana (default: 100)'
+    )
+
+    suite_parser = subparsers.add_parser('suite', help='Load test, build e payload con risultati in JSON')
+    suite_parser.add_argument(
+        '--modes', nargs='+', default=['threaded', 'async'],
+        choices=['single', 'threaded', 'async'],
+        help='Modalità del server da misurare (default: threaded async)'
+    )
+    suite_parser.add_argument(
+        '-c', '--concurrency', nargs='+', type=int, default=[1, 10, 50],
+        help='Livelli di concorrenza (default: 1 10 50)'
+    )
+    suite_parser.add_argument(
+        '-n', '--requests', type=int, default=100,
+        help='Richieste per client (default: 100)'
+    )
+    suite_parser.add_argument(
+        '--workers', type=int, default=32,
+        help='Worker del server (default: 32)'
+    )
+    suite_parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='Esecuzioni per comando di build (default: 3)'
+    )
+    suite_parser.add_argument(
+        '--skip', nargs='+', default=[], choices=['load', 'build', 'payload'],
+        help='Parti della suite da saltare'
+    )
+    suite_parser.add_argument(
+        '-o', '--output',
+        help='File JSON dei risultati'
+    )
+    suite_parser.add_argument(
+        '--baseline',
+        help='Risultati di riferimento (ad es. del branch principale) da confrontare'
+    )
+    suite_parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help=f'Peggioramento massimo ammesso in percentuale (default: {DEFAULT_THRESHOLD:g})'
+    )
+
+    compare_parser = subparsers.add_parser('compare', help='Confronta due file di risultati di suite')
+    compare_parser.add_argument('baseline', help='Risultati di riferimento')
+    compare_parser.add_argument('current', help='Risultati da verificare')
+    compare_parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help=f'Peggioramento massimo ammesso in percentuale (default: {DEFAULT_THRESHOLD:g})'
+    )
+
+    args = parser.parse_args()
+
+    if args.command == 'load':
+        print("⚡ LOAD TEST SERVER DASHBOARD")
+        print("=" * 50)
+        benchmark_load(args.modes, args.concurrency, args.requests, args.workers)
+    elif args.command == 'series':
+        print("📈 BENCHMARK /api/series")
+        print("=" * 50)
+        benchmark_series(args.years, args.window, args.concurrency, args.requests, args.workers)
+    elif args.command == 'build':
+        print("🏗️  TEMPI DI BUILD E AGGIORNAMENTO")
+        print("=" * 50)
+        benchmark_build(max(1, args.repeat))
+    elif args.command == 'payload':
+        print("📦 PAYLOAD PER SEZIONE")
+        print("=" * 50)
+        measure_payloads()
+    elif args.command == 'download':
+        print("💾 DOWNLOAD DI EXPORT GRANDI")
+        print("=" * 50)
+        benchmark_download(args.modes, args.size, args.concurrency, args.downloads, args.workers)
+    elif args.command == 'encoding':
+        print("🗜️  FORMATO DEI DATI")
+        print("=" * 50)
+        benchmark_encoding(max(1, args.repeat))
+    elif args.command == 'suite':
+        results = {
+            "generated": datetime.now().isoformat(timespec='seconds'),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count()
+        }
+        if 'load' not in args.skip:
+            print("⚡ LOAD TEST SERVER DASHBOARD")
+            print("=" * 50)
+            results["load"] = benchmark_load(args.modes, args.concurrency, args.requests, args.workers)
+        if 'build' not in args.skip:
+            print("\n🏗️  TEMPI DI BUILD E AGGIORNAMENTO")
+            print("=" * 50)
+            results["build"] = benchmark_build(max(1, args.repeat))
+        if 'payload' not in args.skip:
+            print("\n📦 PAYLOAD PER SEZIONE")
+            print("=" * 50)
+            results["payload"] = measure_payloads()
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            print(f"\n✅ Risultati scritti in {args.output}")
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            print(f"\n📊 Confronto con {args.baseline} ({baseline.get('revision') or 'revisione sconosciuta'})")
+            if not report_regressions(compare_results(baseline, results, args.threshold), args.threshold):
+                sys.exit(1)
+    elif args.command == 'compare':
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+        if not report_regressions(compare_results(baseline, current, args.threshold), args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
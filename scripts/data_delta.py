@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Data Delta - Dashboard Socio-Economica
+Diff strutturale tra due versioni di dashboardData e sua applicazione
+
+Un delta è una lista di operazioni compatte, applicate in ordine:
+
+    ["replace", ["kpi", "tasso_occupazione"], 71.3]
+    ["add", ["demografia", "saldo_naturale", "serie_storica", "-"], {...}]
+    ["remove", ["pensioni", "vecchia_tabella"]]
+
+Il segmento "-" aggiunge in coda a una lista (come in JSON Patch), così una
+serie storica che guadagna un anno viaggia come una sola riga. main.js
+applica lo stesso formato in Dashboard.applyDelta.
+"""
+
+import copy
+
+def diff_data(old, new, path=()):
+    """Operazioni che trasformano `old` in `new`"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key, value in new.items():
+            if key not in old:
+                ops.append(["add", list(path + (key,)), value])
+            else:
+                ops.extend(diff_data(old[key], value, path + (key,)))
+        for key in old:
+            if key not in new:
+                ops.append(["remove", list(path + (key,))])
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        if len(new) >= len(old) and new[:len(old)] == old:
+            # Solo righe aggiunte in coda (il caso tipico delle serie storiche)
+            return [["add", list(path + ("-",)), item] for item in new[len(old):]]
+        if len(new) == len(old):
+            ops = []
+            for index, (before, after) in enumerate(zip(old, new)):
+                ops.extend(diff_data(before, after, path + (index,)))
+            return ops
+        return [["replace", list(path), new]]
+
+    if type(old) is not type(new) or old != new:
+        return [["replace", list(path), new]]
+    return []
+
+def apply_delta(data, ops):
+    """Applica le operazioni a una copia di `data` e la restituisce"""
+    data = copy.deepcopy(data)
+    for op in ops:
+        action, path = op[0], op[1]
+        parent = data
+        for key in path[:-1]:
+            parent = parent[key]
+        last = path[-1]
+        if action == "remove":
+            del parent[last]
+        elif action == "add" and last == "-":
+            parent.append(copy.deepcopy(op[2]))
+        else:
+            parent[last] = copy.deepcopy(op[2])
+    return data
+
+def touched_roots(ops):
+    """Chiavi di primo livello (metadata, kpi, sezioni) toccate dal delta"""
+    return sorted({str(op[1][0]) for op in ops if op[1]})
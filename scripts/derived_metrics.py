@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Derived Metrics - Dashboard Socio-Economica
+Indicatori derivati e array pronti per i grafici, calcolati una volta in fase di build
+
+Le regole descrivono come un campo si ricava da altri campi dello stesso nodo:
+
+    Rule("demografia.saldo_naturale.serie_storica", "saldo", "diff", ("nascite", "decessi"))
+
+Il percorso può indicare un dizionario o una serie [{anno: ..., ...}] (la
+regola si applica colonna per colonna) e accetta '*' per tutti i figli di un
+livello. check_derived confronta i valori calcolati con quelli memorizzati in
+data.js, dove totali, saldi e percentuali sono scritti a mano.
+
+chart_arrays produce per ogni sezione le etichette e le serie già scalate
+dei grafici di main.js, pubblicate nel chunk della sezione sotto 'grafici'.
+"""
+
+import math
+from collections import namedtuple
+
+YEAR_FIELD = "anno"
+CHARTS_KEY = "grafici"
+# Percentuali memorizzate con un decimale: differenze entro l'arrotondamento sono ammesse
+SHARE_TOLERANCE = 0.051
+SUM_TOLERANCE = 1e-6
+
+# kind: 'sum' (somma degli input), 'diff' (primo meno i successivi),
+# 'share' (primo input in % della somma dei successivi)
+Rule = namedtuple('Rule', 'path target kind inputs')
+
+GENDER = ("femmine", "maschi")
+CONTRACTS = ("tempo_indeterminato", "tempo_determinato", "stagionale", "somministrazione", "intermittente")
+
+RULES = [
+    # Demografia
+    Rule("demografia.popolazione", "percentuali.femmine", "share", ("femmine", "totale")),
+    Rule("demografia.popolazione", "percentuali.maschi", "share", ("maschi", "totale")),
+    Rule("demografia.popolazione", "percentuali.0-14", "share", ("fasce_eta.0-14", "totale")),
+    Rule("demografia.popolazione", "percentuali.15-64", "share", ("fasce_eta.15-64", "totale")),
+    Rule("demografia.popolazione", "percentuali.65_e_oltre", "share", ("fasce_eta.65_e_oltre", "totale")),
+    Rule("demografia.saldo_naturale.serie_storica", "saldo", "diff", ("nascite", "decessi")),
+    Rule("demografia.saldo_naturale.incidenza_2023", "incidenza_percentuale", "share",
+         ("saldo_naturale", "popolazione")),
+    Rule("demografia.flussi_migratori.emigrati.serie_storica", "totale", "sum", GENDER),
+    Rule("demografia.flussi_migratori.immigrati.serie_storica", "totale", "sum", GENDER),
+    Rule("demografia.flussi_migratori.saldo_demografico.serie_storica", "saldo_demografico", "sum",
+         ("saldo_migratorio", "saldo_naturale")),
+    # Mercato del lavoro
+    Rule("mercato_lavoro.lavoratori.dipendenti.comunitari", "totale", "sum", GENDER),
+    Rule("mercato_lavoro.lavoratori.dipendenti.extracomunitari", "totale", "sum", GENDER),
+    Rule("mercato_lavoro.lavoratori.part_time.dettaglio_genere.*", "percentuale", "share", ("part_time", "totale")),
+    Rule("mercato_lavoro.assunzioni.confronto.*", "totale", "sum", CONTRACTS),
+    Rule("mercato_lavoro.cessazioni.confronto.*", "totale", "sum", CONTRACTS),
+    Rule("mercato_lavoro.assunzioni.dettaglio_2024.*", "totale", "sum", GENDER),
+    Rule("mercato_lavoro.assunzioni.part_time_fasce_eta_2024.*", "totale", "sum", GENDER),
+    Rule("mercato_lavoro.indicatori_occupazione.occupati", "totale", "sum", GENDER),
+    Rule("mercato_lavoro.indicatori_occupazione.disoccupati", "totale", "sum", GENDER),
+    Rule("mercato_lavoro.indicatori_occupazione.inattivi", "totale", "sum", GENDER),
+    # Entrate e vigilanza
+    Rule("entrate_vigilanza.durc.evoluzione", "perc_irregolari", "share", ("irregolari", "regolari", "irregolari")),
+    # Ammortizzatori
+    Rule("ammortizzatori.naspi.evoluzione", "totale", "sum", GENDER),
+    Rule("ammortizzatori.cig.evoluzione", "totale", "sum", ("cigo", "cigd", "cigs", "fis")),
+    Rule("ammortizzatori.beneficiari_cessazione.*", "totale", "sum", ("naspi", "disoccupazione_agricola", "dis_coll")),
+    Rule("ammortizzatori.beneficiari_sospensione.*", "totale", "sum", ("cigo", "cigs", "fis")),
+    # Pensioni
+    Rule("pensioni.pensionati", "totale", "sum", GENDER),
+    Rule("pensioni.pensioni_liquidate.evoluzione", "totale", "sum", GENDER),
+    Rule("pensioni.anticipazioni_pensionistiche.quota_103.*", "totale", "sum", GENDER),
+    # Assistenza
+    Rule("assistenza.invalidita_civile.prestazioni_vigenti.*", "totale", "sum", GENDER),
+    Rule("assistenza.invalidita_civile.tempi_medi.*", "totale", "sum", ("fase_sanitaria", "fase_amministrativa")),
+    Rule("assistenza.sostegno_reddito.rdc_pdc_2023.*", "totale", "sum", GENDER),
+    # Relazioni con l'utenza
+    Rule("relazioni_utenza.informazione_primo_livello.*", "totale", "sum",
+         ("accesso_sede", "ricontatto_telefonico", "web_meeting")),
+    # Organizzazione
+    Rule("organizzazione.personale", "totale", "sum", GENDER),
+    Rule("organizzazione.personale.per_area.*", "totale", "sum", GENDER),
+]
+
+# Grafici di main.js alimentati da array precalcolati.
+# 'series': etichette = anni della serie, un dataset per campo (con fattore di scala);
+# 'compare': etichette = voci, un dataset per ogni figlio del nodo (ad es. per anno);
+# 'join': etichette = anni di più serie, un dataset per (etichetta, serie, campo, scala);
+# 'rows': etichette = (etichetta, percorso di un figlio), un dataset per campo dei figli
+#         (il campo può contenere '{}' al posto del percorso del figlio);
+# 'values': un solo dataset con i valori dei figli indicati (chiave o (etichetta, percorso)).
+# Con path None il nodo è la sezione stessa.
+ChartSpec = namedtuple('ChartSpec', 'kind path labels datasets')
+
+CHART_SPECS = {
+    "entrate_vigilanza": {
+        "chart-entrate-contributive": ChartSpec(
+            "series", "entrate_contributive.serie_storica", None,
+            [("Entrate Contributive (€M)", "importo", 1e-6)]
+        ),
+        "chart-vigilanza-ispettiva": ChartSpec(
+            "compare", "vigilanza_ispettiva.confronto",
+            ["Ispezioni", "Aziende Irregolari", "Accertato Contributi (K€)", "Accertato Sanzioni (K€)"],
+            [("numero_ispezioni", 1), ("aziende_irregolari", 1),
+             ("accertato_contributi", 1e-3), ("accertato_sanzioni", 1e-3)]
+        ),
+        "chart-durc": ChartSpec(
+            "series", "durc.evoluzione", None,
+            [("DURC Regolari", "regolari", 1), ("% DURC Irregolari", "perc_irregolari", 1)]
+        ),
+        "chart-fonti-entrata": ChartSpec(
+            "join", None, None,
+            [("Riscossioni Ordinarie (€M)", "entrate_contributive.serie_storica", "importo", 1e-6),
+             ("Recupero Amministrativo (€M)", "recupero_crediti.serie_storica", "importo", 1e-6),
+             ("Riscossione Coattiva (€M)", "riscossione_coattiva.serie_storica", "importo", 1e-6)]
+        ),
+        "chart-riscossione-coattiva": ChartSpec(
+            "values", "riscossione_coattiva.gestioni",
+            [("Aziende Uniemens", "aziende_uniemens"), ("Commercianti", "gestione_commercianti"),
+             ("Artigiani", "gestione_artigiani"), ("Agricoli Autonomi", "gestione_agricola_autonomi"),
+             ("Pescatori", "gestione_pescatori"), ("Agricoli Datori", "gestione_agricola_datori")],
+            [("Riscossione Coattiva (€M)", 1e-6)]
+        ),
+        "chart-crescita-entrate": ChartSpec(
+            "values", "entrate_contributive.variazione_percentuale_2024",
+            [("Pesaro e Urbino", "pesaro_urbino"), ("Regione Marche", "regione_marche"), ("Italia", "italia")],
+            [("Crescita % 2023-2024", 1)]
+        ),
+        "chart-durc-confronto": ChartSpec(
+            "series", "durc.evoluzione", None,
+            [("Pesaro e Urbino", "perc_irregolari", 1), ("Regione Marche", "perc_irregolari_marche", 1),
+             ("Italia", "perc_irregolari_italia", 1)]
+        ),
+        "chart-vigilanza-documentale": ChartSpec(
+            "rows", "vigilanza_documentale",
+            [("2023", "2023"), ("2024", "2024")],
+            [("Verifiche Documentali", "verifiche", 1), ("Irregolarità Riscontrate", "irregolarita", 1)]
+        ),
+    },
+    "organizzazione": {
+        "chart-eta-media": ChartSpec(
+            "series", "personale.eta_media.evoluzione", None,
+            [("Pesaro e Urbino", "eta", 1), ("Regione Marche", "eta_marche", 1), ("Italia", "eta_italia", 1)]
+        ),
+        "chart-personale-genere": ChartSpec(
+            "rows", "personale.per_area",
+            [("Aree Professionali", "aree_professionali"), ("Medici/Professionisti", "medici_professionisti"),
+             ("Dirigenti", "dirigenti")],
+            [("Femmine", "femmine", 1), ("Maschi", "maschi", 1)]
+        ),
+        "chart-personale-evoluzione": ChartSpec(
+            "series", "personale.evoluzione", None,
+            [("Totale Personale", "totale", 1)]
+        ),
+        "chart-personale": ChartSpec(
+            "values", "personale.per_area",
+            [("Dirigenti", "dirigenti.totale"), ("Medici/Professionisti", "medici_professionisti.totale"),
+             ("Aree Professionali", "aree_professionali.totale")],
+            [("Personale", 1)]
+        ),
+        "chart-strutture": ChartSpec(
+            "values", "distribuzione_territoriale.strutture",
+            [("Comuni", "numero_comuni"), ("Strutture INPS", "strutture_inps"),
+             ("Patronati", "patronati"), ("CAF", "caf")],
+            [("Numero", 1)]
+        ),
+    },
+    "relazioni_utenza": {
+        "chart-canali-accesso": ChartSpec(
+            "compare", "informazione_primo_livello",
+            ["Accesso in Sede", "Ricontatto Telefonico", "Web Meeting"],
+            [("accesso_sede", 1), ("ricontatto_telefonico", 1), ("web_meeting", 1)]
+        ),
+        "chart-cassetto-bidirezionale": ChartSpec(
+            "rows", "cassetto_bidirezionale",
+            [("Aziende 2023", "aziende.2023"), ("Aziende 2024", "aziende.2024"),
+             ("Patronati 2023", "patronati.2023"), ("Patronati 2024", "patronati.2024")],
+            [("In Entrata", "in_entrata", 1), ("In Uscita", "in_uscita", 1)]
+        ),
+        "chart-pec": ChartSpec(
+            "rows", "flusso_pec",
+            [("2023", "2023"), ("2024", "2024")],
+            [("PEC Inviate", "inviate", 1), ("PEC Ricevute", "ricevute", 1)]
+        ),
+        "chart-consulenze": ChartSpec(
+            "rows", None,
+            [("2023", "2023"), ("2024", "2024")],
+            [("Informazione I Livello", "informazione_primo_livello.{}.totale", 1),
+             ("Consulenza II Livello", "consulenza_secondo_livello.{}", 1)]
+        ),
+        "chart-canale-presentazione": ChartSpec(
+            "values", "presentazione_pratiche.per_canale",
+            [("Patronato", "patronato"), ("Cittadino", "cittadino")],
+            [("Pratiche 2024 (%)", 1)]
+        ),
+        "chart-pratiche-argomento": ChartSpec(
+            "rows", "presentazione_pratiche.per_argomento",
+            [("Pensioni", "pensioni"), ("Inv. Civile", "invalidita_civile"), ("Assistenziali", "assistenziali"),
+             ("Disoccupazione", "disoccupazione"), ("Famiglia", "famiglia"), ("Ricostituzioni", "ricostituzioni")],
+            [("Patronato", "patronato", 1), ("Cittadino", "cittadino", 1)]
+        ),
+    },
+    "patrimonio": {
+        "chart-patrimonio-valore": ChartSpec(
+            "values", "immobiliare.valore_euro", ["2022", "2023", "2024"],
+            [("Valore Patrimonio (€M)", 1e-6)]
+        ),
+        "chart-patrimonio-province": ChartSpec(
+            "rows", "immobiliare.per_provincia_2024",
+            [("Pesaro e Urbino", "pesaro_urbino"), ("Ancona", "ancona"), ("Fermo", "fermo"),
+             ("Ascoli Piceno", "ascoli_piceno"), ("Macerata", "macerata")],
+            [("Valore Patrimonio 2024 (€M)", "valore_euro", 1e-6)]
+        ),
+        "chart-patrimonio-unita": ChartSpec(
+            "rows", "immobiliare.per_provincia_2024",
+            [("Ancona", "ancona"), ("Fermo", "fermo"), ("Ascoli Piceno", "ascoli_piceno"),
+             ("Macerata", "macerata"), ("Pesaro e Urbino", "pesaro_urbino")],
+            [("Unità Immobiliari 2024", "unita", 1)]
+        ),
+    },
+}
+
+def get_path(data, path):
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def resolve_nodes(data, path):
+    """Coppie (percorso, nodo) per un percorso con eventuali '*'"""
+    nodes = [((), data)]
+    for key in path.split('.'):
+        expanded = []
+        for prefix, node in nodes:
+            if not isinstance(node, dict):
+                continue
+            if key == '*':
+                expanded.extend((prefix + (child,), value) for child, value in node.items()
+                                if isinstance(value, dict))
+            elif key in node:
+                expanded.append((prefix + (key,), node[key]))
+        nodes = expanded
+    return nodes
+
+def column(rows, field):
+    """Colonna di una serie (None dove il valore manca o non è numerico)"""
+    path = field.split('.')
+    values = []
+    for row in rows:
+        value = get_path(row, path)
+        values.append(value if _is_number(value) else None)
+    return values
+
+def combine(kind, columns):
+    """Applica la regola a colonne allineate (una posizione per riga della serie)"""
+    results = []
+    for values in zip(*columns):
+        if any(value is None for value in values):
+            results.append(None)
+        elif kind == 'sum':
+            results.append(math.fsum(values))
+        elif kind == 'diff':
+            results.append(values[0] - math.fsum(values[1:]))
+        else:
+            denominator = math.fsum(values[1:])
+            results.append(values[0] / denominator * 100 if denominator else None)
+    return results
+
+def compute_rule(data, rule):
+    """Valori (percorso del campo, memorizzato, calcolato) di una regola"""
+    results = []
+    for prefix, node in resolve_nodes(data, rule.path):
+        rows = node if isinstance(node, list) else [node]
+        if not rows or not all(isinstance(row, dict) for row in rows):
+            continue
+        computed = combine(rule.kind, [column(rows, field) for field in rule.inputs])
+        stored = column(rows, rule.target)
+        for index, (expected, actual) in enumerate(zip(computed, stored)):
+            if expected is None:
+                continue
+            location = prefix + ((index,) if isinstance(node, list) else ()) + tuple(rule.target.split('.'))
+            results.append(('.'.join(map(str, location)), actual, expected))
+    return results
+
+def check_derived(data, rules=RULES):
+    """Indicatori derivati incoerenti con i dati grezzi: lista di
+    (campo, valore memorizzato, valore calcolato)"""
+    mismatches = []
+    for rule in rules:
+        tolerance = SHARE_TOLERANCE if rule.kind == 'share' else SUM_TOLERANCE
+        for location, stored, computed in compute_rule(data, rule):
+            if stored is None or abs(stored - computed) > tolerance * (1 if rule.kind == 'share' else max(1, abs(computed))):
+                computed = round(computed, 2)
+                mismatches.append((location, stored, int(computed) if computed.is_integer() else computed))
+    return mismatches
+
+def _scaled(value, factor):
+    if not _is_number(value):
+        return None
+    # Arrotondamento per evitare artefatti di virgola mobile nei tooltip (es. 675.2511908100001)
+    return round(value * factor, 6)
+
+def _row_path(key, field):
+    return (field.format(key) if '{}' in field else f"{key}.{field}").split('.')
+
+def build_chart(section_data, spec):
+    node = section_data if spec.path is None else get_path(section_data, spec.path.split('.'))
+    if spec.kind == 'join':
+        series = [(label, get_path(node, path.split('.')), field, factor)
+                  for label, path, field, factor in spec.datasets]
+        if not all(isinstance(rows, list) for _, rows, _, _ in series):
+            return None
+        by_year = [{row.get(YEAR_FIELD): row.get(field) for row in rows} for _, rows, field, _ in series]
+        years = sorted({year for values in by_year for year in values})
+        return {
+            "labels": years,
+            "datasets": [
+                {"label": label, "data": [_scaled(values.get(year), factor) for year in years]}
+                for (label, _, _, factor), values in zip(series, by_year)
+            ]
+        }
+    if spec.kind == 'series':
+        if not isinstance(node, list):
+            return None
+        return {
+            "labels": [row.get(YEAR_FIELD) for row in node],
+            "datasets": [
+                {"label": label, "data": [_scaled(value, factor) for value in column(node, field)]}
+                for label, field, factor in spec.datasets
+            ]
+        }
+    if not isinstance(node, dict):
+        return None
+    if spec.kind == 'compare':
+        return {
+            "labels": spec.labels,
+            "datasets": [
+                {"label": str(key), "data": [_scaled(values.get(field), factor) for field, factor in spec.datasets]}
+                for key, values in node.items() if isinstance(values, dict)
+            ]
+        }
+    if spec.kind == 'rows':
+        return {
+            "labels": [label for label, _ in spec.labels],
+            "datasets": [
+                {"label": label, "data": [_scaled(get_path(node, _row_path(key, field)), factor)
+                                          for _, key in spec.labels]}
+                for label, field, factor in spec.datasets
+            ]
+        }
+    items = [item if isinstance(item, tuple) else (item, item) for item in spec.labels]
+    label, factor = spec.datasets[0]
+    return {
+        "labels": [name for name, _ in items],
+        "datasets": [{"label": label, "data": [_scaled(get_path(node, key.split('.')), factor) for _, key in items]}]
+    }
+
+def chart_arrays(section, section_data):
+    """Etichette e dataset dei grafici della sezione, pronti per Chart.js"""
+    charts = {}
+    for chart_id, spec in CHART_SPECS.get(section, {}).items():
+        chart = build_chart(section_data, spec)
+        if chart is not None:
+            charts[chart_id] = chart
+    return charts
+
+def with_chart_arrays(section, section_data):
+    """Copia superficiale della sezione con gli array dei grafici (se previsti)"""
+    charts = chart_arrays(section, section_data)
+    if not charts or not isinstance(section_data, dict):
+        return section_data
+    return dict(section_data, **{CHARTS_KEY: charts})
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+RSP Parser - Dashboard Socio-Economica
+Lettura in streaming degli export testuali/CSV della Relazione Sociale Provinciale
+
+Formato dell'export: una sequenza di tabelle, ognuna introdotta dal percorso
+in dashboardData tra parentesi quadre e seguita da un'intestazione CSV
+(separatore ';', tab o ','):
+
+    [kpi]
+    chiave;valore
+    popolazione_totale;349.882
+    tasso_occupazione;70,1
+
+    [demografia.saldo_naturale.serie_storica]
+    anno;nascite;decessi;saldo
+    2013;3.076;3.793;-717
+
+Le tabelle 'chiave;valore' assegnano valori singoli (chiavi puntate per i
+livelli annidati), le altre sostituiscono la lista di record al loro percorso.
+Le righe vuote e quelle che iniziano con '#' sono ignorate.
+"""
+
+import io
+import re
+import csv
+import copy
+import time
+from collections import namedtuple
+from pathlib import Path
+
+TABLE_HEADER = re.compile(r'^\[(?P<table>[\w-]+(?:\.[\w-]+)*)\]$')
+KEY_VALUE_HEADER = ['chiave', 'valore']
+COMMENT_PREFIX = '#'
+DELIMITERS = (';', '\t', ',')
+# Numeri in formato italiano: punto per le migliaia, virgola per i decimali
+ITALIAN_NUMBER = re.compile(r'^(?P<int>[-+]?(?:\d{1,3}(?:\.\d{3})+|\d+))(?:,(?P<dec>\d+))?$')
+# Quanto leggere per riconoscere un export valido senza scorrerlo tutto
+SNIFF_BYTES = 64 * 1024
+
+# Una riga dell'export: values è None per la riga di intestazione della tabella
+RSPRow = namedtuple('RSPRow', 'table header values lineno')
+
+class RSPFormatError(ValueError):
+    """Export RSP non conforme al formato atteso"""
+
+def read_lines(path):
+    """Righe significative del file, una alla volta (mai l'intero documento in memoria)"""
+    with open(path, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if line and not line.startswith(COMMENT_PREFIX):
+                yield lineno, line
+
+def detect_delimiter(header_line):
+    """Separatore dell'intestazione, nell'ordine di preferenza degli export italiani"""
+    for delimiter in DELIMITERS:
+        if delimiter in header_line:
+            return delimiter
+    return DELIMITERS[0]
+
+def split_cells(line, delimiter):
+    if '"' not in line:
+        # Caso comune senza virgolette: evita il costo del modulo csv per riga
+        return [cell.strip() for cell in line.split(delimiter)]
+    return [cell.strip() for cell in next(csv.reader([line], delimiter=delimiter))]
+
+def iter_rows(lines):
+    """Raggruppa le righe per tabella, producendo intestazioni e record"""
+    table = header = delimiter = None
+    for lineno, line in lines:
+        match = TABLE_HEADER.match(line)
+        if match:
+            table, header = match.group('table'), None
+            continue
+        if table is None:
+            raise RSPFormatError(f"Riga {lineno}: dati prima della prima tabella [sezione.percorso]")
+        if header is None:
+            delimiter = detect_delimiter(line)
+            header = split_cells(line, delimiter)
+            yield RSPRow(table, header, None, lineno)
+            continue
+        values = split_cells(line, delimiter)
+        if len(values) != len(header):
+            raise RSPFormatError(
+                f"Riga {lineno}: {len(values)} valori invece di {len(header)} nella tabella [{table}]"
+            )
+        yield RSPRow(table, header, values, lineno)
+
+def parse_value(text, template=None):
+    """Converte una cella nel tipo del valore corrente in dashboardData.
+
+    Se lo schema prevede una stringa il testo è conservato così com'è
+    (ad esempio "2024" o "+4.5%"), altrimenti si riconoscono i numeri in
+    formato italiano o con il punto decimale."""
+    if isinstance(template, str):
+        return text
+    if text == '':
+        return None
+    match = ITALIAN_NUMBER.match(text)
+    if match:
+        integer = match.group('int').replace('.', '')
+        decimals = match.group('dec')
+        if decimals is not None:
+            return float(f"{integer}.{decimals}")
+        return float(integer) if isinstance(template, float) else int(integer)
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+def get_path(data, path):
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+def set_path(data, path, value):
+    for key in path[:-1]:
+        node = data.get(key)
+        if not isinstance(node, dict):
+            node = data[key] = {}
+        data = node
+    data[path[-1]] = value
+
+def assemble(rows, template, roots, stats, base=None):
+    """Applica le righe dell'export a una copia di `base` (default: `template`).
+
+    `template` fornisce i tipi dei valori; le tabelle il cui percorso non
+    inizia con una delle `roots` (metadata, kpi e le sezioni della dashboard)
+    vengono saltate senza essere conservate e annotate in stats['skipped']."""
+    data = copy.deepcopy(template if base is None else base)
+    table_path = table_template = None
+    key_value = skipped = False
+    for row in rows:
+        if row.values is None:
+            table_path = row.table.split('.')
+            skipped = table_path[0] not in roots
+            stats['tables'] += 1
+            if skipped:
+                stats['skipped_tables'] += 1
+                stats['skipped'].append(row.table)
+                continue
+            key_value = [name.lower() for name in row.header] == KEY_VALUE_HEADER
+            if not key_value:
+                current = get_path(template, table_path)
+                table_template = current[0] if isinstance(current, list) and current else {}
+                set_path(data, table_path, [])
+            continue
+        if skipped:
+            continue
+        if key_value:
+            key, text = row.values
+            path = table_path + key.split('.')
+            set_path(data, path, parse_value(text, get_path(template, path)))
+        else:
+            record = {
+                name: parse_value(text, table_template.get(name))
+                for name, text in zip(row.header, row.values)
+            }
+            get_path(data, table_path).append(record)
+        stats['rows'] += 1
+    return data
+
+def parse_rsp_export(path, template, roots, base=None):
+    """Legge un export RSP in streaming e restituisce (dati, statistiche)"""
+    stats = {'tables': 0, 'skipped_tables': 0, 'skipped': [], 'rows': 0}
+    started = time.perf_counter()
+    data = assemble(iter_rows(read_lines(path)), template, set(roots), stats, base)
+    elapsed = time.perf_counter() - started
+    stats['bytes'] = Path(path).stat().st_size
+    stats['elapsed_s'] = round(elapsed, 3)
+    stats['rows_per_s'] = round(stats['rows'] / elapsed, 1) if elapsed else 0.0
+    return data, stats
+
+def sniff_rsp_file(path):
+    """Controlla l'inizio del file: la prima riga utile deve aprire una tabella"""
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    try:
+        text = head.decode('utf-8-sig')
+    except UnicodeDecodeError as e:
+        # Un carattere multibyte può essere tagliato al limite della lettura
+        if e.start < len(head) - 3:
+            raise RSPFormatError(f"Export non in UTF-8 (byte {e.start})") from e
+        text = head[:e.start].decode('utf-8-sig')
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(COMMENT_PREFIX):
+            continue
+        if not TABLE_HEADER.match(line):
+            raise RSPFormatError(f"La prima riga utile non è un'intestazione di tabella: {line[:60]!r}")
+        return True
+    raise RSPFormatError("Nessuna tabella trovata nell'export")
+
+def format_value(value):
+    """Valore di una cella nel formato dell'export (decimali con la virgola)"""
+    if isinstance(value, float):
+        return repr(value).replace('.', ',')
+    return str(value)
+
+def format_cells(cells):
+    buffer = io.StringIO()
+    csv.writer(buffer, delimiter=';', lineterminator='').writerow([format_value(cell) for cell in cells])
+    return buffer.getvalue()
+
+def _flatten(node, prefix, scalars, tables):
+    for key, value in node.items():
+        path = prefix + (str(key),)
+        if isinstance(value, dict):
+            _flatten(value, path, scalars, tables)
+        elif isinstance(value, list):
+            tables.append((path, value))
+        else:
+            scalars.append(('.'.join(path), value))
+
+def iter_rsp_export(data):
+    """Righe di un export RSP equivalente a `data` (inverso di parse_rsp_export)"""
+    for root, node in data.items():
+        scalars, tables = [], []
+        if isinstance(node, dict):
+            _flatten(node, (), scalars, tables)
+        if scalars:
+            yield f"[{root}]"
+            yield format_cells(KEY_VALUE_HEADER)
+            for key, value in scalars:
+                yield format_cells([key, value])
+            yield ""
+        for path, rows in tables:
+            header = list(dict.fromkeys(name for row in rows for name in row))
+            yield f"[{root}.{'.'.join(path)}]"
+            yield format_cells(header)
+            for row in rows:
+                yield format_cells([row.get(name, '') for name in header])
+            yield ""
+
+def write_rsp_export(data, path):
+    """Scrive un export RSP a partire da dashboardData (fixture per i test)"""
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for line in iter_rsp_export(data):
+            f.write(line + '\n')
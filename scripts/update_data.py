@@ -8,81 +8,218 @@ import os
 import sys
 import json
 import re
+import io
+import time
+import hashlib
 import shutil
+import tempfile
+import unicodedata
+import contextlib
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import subprocess
 import argparse
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from series_store import ingest_edition, SERIES_DIR, CATALOG_NAME
+from rsp_parser import parse_rsp_export, sniff_rsp_file, write_rsp_export
+from data_delta import diff_data, apply_delta, touched_roots
+from backup_store import BackupStore, write_atomic, DEFAULT_KEEP_LAST, DEFAULT_KEEP_DAYS
+from derived_metrics import check_derived, with_chart_arrays
+from data_schema import SECTIONS, validate_data, report_errors
+from data_codec import ENCODINGS, JSON_ENCODING, encode_chunk, load_chunk
+
+# Sezioni di dashboardData caricate su richiesta da main.js (un file JSON ciascuna)
+DATA_SECTIONS = list(SECTIONS)
+# Campi sempre presenti nell'indice, necessari al primo rendering
+INDEX_FIELDS = ["metadata", "kpi"]
+DATA_INDEX_NAME = "index.json"
+CHUNK_HASH_LENGTH = 10
+# Delta conservati nell'indice: un client fermo a una versione più vecchia riscarica i chunk
+DELTA_HISTORY = 6
+
+# Modalità --batch: un bundle per provincia (js/data.js, data/, series/, backups/)
+PROVINCES_DIR = "provinces"
+RSP_SUFFIXES = ('.csv', '.txt', '.rsp')
+BATCH_REPORT_NAME = "batch_report.json"
+
+# Token di un object literal JavaScript (chiavi non quotate, apici singoli, commenti)
+JS_TOKEN_PATTERN = re.compile(r"""
+    (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<key>[A-Za-z_$][\w$]*|\d+)(?=\s*:)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<trailing>,(?=\s*[}\]]))
+""", re.DOTALL | re.VERBOSE)
+
+def js_literal_to_json(text):
+    """Converte un object literal JavaScript (come quello di data.js) in JSON"""
+    def replace(match):
+        kind = match.lastgroup
+        token = match.group(0)
+        if kind == 'string':
+            if token.startswith("'"):
+                inner = token[1:-1].replace("\\'", "'").replace('"', '\\"')
+                return f'"{inner}"'
+            return token
+        if kind == 'key':
+            return f'"{token}"'
+        if kind == 'ident':
+            return 'null' if token == 'undefined' else token
+        return ''  # commenti e virgole finali
+    return JS_TOKEN_PATTERN.sub(replace, text)
+
+def parse_data_js(content):
+    """Estrae l'oggetto dashboardData da data.js (scritto a mano o generato)"""
+    match = re.search(r'dashboardData\s*=\s*', content)
+    if not match:
+        raise ValueError("Oggetto dashboardData non trovato")
+    converted = js_literal_to_json(content[match.end():])
+    data, _ = json.JSONDecoder().raw_decode(converted)
+    return data
+
+def compact_json(data):
+    """Serializzazione compatta e deterministica usata per i chunk"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
 class DashboardDataUpdater:
     """Classe per automatizzare l'aggiornamento dei dati della dashboard"""
     
-    def __init__(self):
+    def __init__(self, bundle_dir=None, backup_keep=DEFAULT_KEEP_LAST, backup_days=DEFAULT_KEEP_DAYS,
+                 chunk_encoding=None):
         self.project_dir = Path(__file__).parent.parent
-        self.data_file = self.project_dir / "js" / "data.js"
-        self.backup_dir = self.project_dir / "backups"
+        # Un bundle provinciale replica la struttura dati del progetto
+        self.bundle_dir = Path(bundle_dir) if bundle_dir else self.project_dir
+        self.data_file = self.bundle_dir / "js" / "data.js"
+        self.backup_dir = self.bundle_dir / "backups"
+        self.backup_store = BackupStore(self.backup_dir, backup_keep, backup_days)
+        self.build_dir = self.project_dir / "dist"
+        self.releases_dir = self.project_dir / "releases"
+        self.chunks_dir = self.bundle_dir / "data"
+        self.series_dir = self.bundle_dir / SERIES_DIR
+        # Codifica dei chunk (data_codec.py); None mantiene quella dell'indice pubblicato
+        self.chunk_encoding = chunk_encoding
+        self.last_extract_stats = None
+        self.current_data = None
         
     def create_backup(self):
-        """Crea backup dei dati correnti"""
+        """Salva i dati correnti nell'archivio dei backup (deduplicato per contenuto)"""
         print("📦 Creazione backup dei dati correnti...")
         
-        # Crea directory backup se non esistente
-        self.backup_dir.mkdir(exist_ok=True)
-        
-        # Nome backup con timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = self.backup_dir / f"data_backup_{timestamp}.js"
-        
-        # Copia file dati corrente
-        if self.data_file.exists():
-            shutil.copy2(self.data_file, backup_file)
-            print(f"✅ Backup creato: {backup_file}")
-            return backup_file
-        else:
+        if not self.data_file.exists():
             print("⚠️ File dati originale non trovato")
             return None
+        
+        imported = self.backup_store.import_legacy()
+        if imported:
+            print(f"📥 {imported} backup nel vecchio formato importati nell'archivio")
+        
+        entry = self.backup_store.save(self.data_file)
+        print(f"✅ Backup #{entry['id']} ({entry['hash'][:10]}, {len(self.backup_store.versions())} "
+              f"versioni conservate) in {self.backup_dir}")
+        return entry
+    
+    def restore_backup(self, entry):
+        """Ripristina data.js dal backup indicato (voce o id dell'archivio)"""
+        version_id = entry['id'] if isinstance(entry, dict) else int(entry)
+        print(f"🔄 Ripristino backup #{version_id}...")
+        self.backup_store.restore(version_id, self.data_file)
+        print("✅ Backup ripristinato")
+    
+    def snapshot_published(self):
+        """Copia di data/ e series/ prima di un aggiornamento.
+        
+        Rigenerare i chunk dai dati ripristinati pubblicherebbe una nuova
+        versione (con il delta inverso) e reingerire le serie non toglierebbe
+        gli anni dell'aggiornamento fallito: si rimettono i file originali."""
+        snapshot = Path(tempfile.mkdtemp(prefix='.published-', dir=self.bundle_dir))
+        for directory in (self.chunks_dir, self.series_dir):
+            if directory.exists():
+                shutil.copytree(directory, snapshot / directory.name)
+        return snapshot
+    
+    def _restore_directory(self, saved_dir, directory, last_name):
+        """Rimette i file salvati in `directory` (quello chiamato `last_name` per
+        ultimo: indice e catalogo non puntano mai a file non ancora ripristinati)
+        e toglie quelli creati dall'aggiornamento fallito"""
+        if not saved_dir.exists():
+            # La cartella non esisteva: è stata creata dall'aggiornamento fallito
+            shutil.rmtree(directory, ignore_errors=True)
+            return
+        saved = sorted(path.relative_to(saved_dir) for path in saved_dir.rglob('*') if path.is_file())
+        for relative in sorted(saved, key=lambda path: path.name == last_name):
+            target = directory / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(saved_dir / relative, target)
+        for path in list(directory.rglob('*')):
+            if path.is_file() and path.relative_to(directory) not in saved:
+                path.unlink()
+    
+    def restore_published(self, snapshot):
+        self._restore_directory(snapshot / self.chunks_dir.name, self.chunks_dir, DATA_INDEX_NAME)
+        self._restore_directory(snapshot / self.series_dir.name, self.series_dir, CATALOG_NAME)
+        shutil.rmtree(snapshot, ignore_errors=True)
+    
+    def discard_snapshot(self, snapshot):
+        shutil.rmtree(snapshot, ignore_errors=True)
+    
+    def rollback(self, backup_file, snapshot):
+        """Annulla un aggiornamento fallito: data.js dal backup, chunk, indice e
+        archivio delle serie identici a prima (la versione pubblicata non cambia)"""
+        print("↩️  Annullamento dell'aggiornamento...")
+        if backup_file:
+            self.restore_backup(backup_file)
+        elif self.data_file.exists():
+            # Bundle nuovo (--batch): nessun dato precedente da ripristinare
+            self.data_file.unlink()
+        self.restore_published(snapshot)
+        print("✅ Dati, chunk e serie storiche riportati allo stato precedente")
     
     def validate_rsp_file(self, rsp_file_path):
         """Valida il file RSP di input"""
         print(f"🔍 Validazione file RSP: {rsp_file_path}")
         
         rsp_path = Path(rsp_file_path)
-        if not rsp_path.exists():
+        if not rsp_path.is_file():
             raise FileNotFoundError(f"File RSP non trovato: {rsp_file_path}")
         
-        # Verifica dimensione minima
         file_size = rsp_path.stat().st_size
-        if file_size < 1000:  # Minimo 1KB
-            raise ValueError(f"File RSP troppo piccolo: {file_size} bytes")
+        if file_size == 0:
+            raise ValueError("File RSP vuoto")
+        
+        # Solo l'inizio del file: gli export provinciali possono pesare centinaia di MB
+        sniff_rsp_file(rsp_path)
         
         print(f"✅ File RSP validato: {file_size:,} bytes")
         return True
     
-    def extract_data_from_rsp(self, rsp_file_path):
-        """Estrae dati dal file RSP (implementazione placeholder)"""
+    def extract_data_from_rsp(self, rsp_file_path, schema=None):
+        """Estrae i dati dall'export RSP, applicandoli ai dati correnti.
+        
+        Le sezioni assenti dall'export restano invariate. `schema` fornisce i
+        tipi dei valori quando i dati correnti non esistono ancora (nuova provincia)."""
         print("📊 Estrazione dati dal file RSP...")
         
-        # Questo è un placeholder - nella realtà implementeremmo
-        # la logica di parsing specifica per il formato RSP
-        
-        # Per ora, mostra come dovrebbe funzionare
-        new_data = {
-            "metadata": {
-                "titolo": "RSP Pesaro e Urbino 2025",
-                "periodo": self.extract_period_from_filename(rsp_file_path),
-                "data_aggiornamento": datetime.now().strftime("%Y-%m-%d"),
-                "versione": "1.1.0"
-            },
-            "kpi": {
-                "popolazione_totale": 358397,  # Dati di esempio
-                "tasso_occupazione": 68.1,
-                "pensionati_totale": 125718,
-                "crescita_entrate": "+3.5%"
-            }
-            # ... altre sezioni verrebbero estratte dal file RSP
-        }
+        current = self.load_current_data() if self.data_file.exists() else {}
+        self.current_data = current
+        new_data, stats = parse_rsp_export(
+            rsp_file_path, schema or current, INDEX_FIELDS + DATA_SECTIONS, base=current
+        )
+        self.last_extract_stats = stats
+        for table in stats['skipped']:
+            print(f"⚠️  Tabella [{table}] ignorata: sezione non prevista")
         
-        print("✅ Dati estratti con successo")
+        metadata = new_data.setdefault('metadata', {})
+        year = metadata.get('anno') or self.extract_period_from_filename(rsp_file_path).split()[-1]
+        territorio = metadata.get('territorio', 'Provincia di Pesaro e Urbino').replace('Provincia di ', '')
+        metadata.setdefault('titolo', f"RSP {territorio} {year}")
+        metadata.setdefault('periodo', self.extract_period_from_filename(rsp_file_path))
+        metadata['data_aggiornamento'] = datetime.now().strftime("%Y-%m-%d")
+        
+        print(f"✅ Dati estratti: {stats['rows']:,} righe da {stats['tables']} tabelle "
+              f"({stats['skipped_tables']} ignorate) in {stats['elapsed_s']:.2f}s "
+              f"- {stats['rows_per_s']:,.0f} righe/s, {stats['bytes'] / 1024 / 1024:,.1f} MB")
         return new_data
     
     def extract_period_from_filename(self, filename):
@@ -109,15 +246,26 @@ class DashboardDataUpdater:
             if key not in new_data['metadata']:
                 raise ValueError(f"Metadata obbligatorio mancante: {key}")
         
-        # Valida KPI
-        required_kpi = ['popolazione_totale', 'tasso_occupazione']
-        for key in required_kpi:
-            if key not in new_data['kpi']:
-                raise ValueError(f"KPI obbligatorio mancante: {key}")
+        # Tipi, intervalli, serie storiche e somme percentuali di tutto l'albero
+        errors = validate_data(new_data)
+        if errors:
+            report_errors(errors)
+            location, message = errors[0]
+            raise ValueError(f"{len(errors)} valori non validi nello schema dei dati (primo: {location}: {message})")
         
+        self.check_derived_metrics(new_data)
         print("✅ Struttura dati validata")
         return True
     
+    def check_derived_metrics(self, data):
+        """Ricalcola totali, saldi e percentuali dai dati grezzi e segnala
+        quelli memorizzati che non tornano (non bloccante: la fonte è la RSP)"""
+        mismatches = check_derived(data)
+        for location, stored, computed in mismatches:
+            stored = 'mancante' if stored is None else stored
+            print(f"⚠️  Indicatore derivato incoerente {location}: memorizzato {stored}, calcolato {computed}")
+        return mismatches
+    
     def generate_data_js(self, new_data):
         """Genera il nuovo file data.js"""
         print("📝 Generazione nuovo file data.js...")
@@ -142,13 +290,145 @@ if (typeof module !== 'undefined' && module.exports) {{
             data_json=json.dumps(new_data, indent=4, ensure_ascii=False)
         )
         
-        # Scrivi il file
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Scrivi il file senza mai troncarlo mentre il server lo sta servendo
+        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.data_file, content.encode('utf-8'))
         
         print(f"✅ File data.js aggiornato: {self.data_file}")
         return True
     
+    def load_current_data(self):
+        """Legge i dati correnti da js/data.js"""
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            return parse_data_js(f.read())
+    
+    def load_published_index(self):
+        """Indice dei chunk attualmente pubblicati (None se assente o illeggibile)"""
+        index_path = self.chunks_dir / DATA_INDEX_NAME
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def load_published_data(self, index):
+        """Dati che i client con questo indice possono avere in memoria"""
+        data = {field: index.get(field, {}) for field in INDEX_FIELDS}
+        encoding = index.get('encoding', JSON_ENCODING)
+        for section, entry in index.get('sections', {}).items():
+            try:
+                data[section] = load_chunk(self.chunks_dir / entry['file'], encoding)
+            except (OSError, ValueError):
+                return None
+        return data
+    
+    def generate_section_chunks(self, new_data):
+        """Scrive un JSON per sezione (nome con hash del contenuto), un indice
+        leggero con metadata, KPI e riferimenti ai chunk, e il delta rispetto
+        alla generazione pubblicata.
+        
+        Solo i chunk delle sezioni modificate vengono scritti e cambiano
+        versione; il delta permette ai client con la versione precedente di
+        aggiornarsi scaricando solo le differenze. Con la codifica 'columnar'
+        i chunk hanno le serie per colonne; il delta resta sui dati decodificati."""
+        print("🧩 Generazione chunk JSON per sezione...")
+        
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        index_path = self.chunks_dir / DATA_INDEX_NAME
+        previous = self.load_published_index() or {}
+        previous_sections = previous.get('sections', {})
+        previous_version = previous.get('version', 0)
+        previous_encoding = previous.get('encoding', JSON_ENCODING)
+        encoding = self.chunk_encoding or previous_encoding
+        
+        index = {field: new_data.get(field, {}) for field in INDEX_FIELDS}
+        index['encoding'] = encoding
+        index['sections'] = {}
+        # Chunk = sezione + array dei grafici precalcolati (derived_metrics.py)
+        chunks = {}
+        changed = []
+        for section in DATA_SECTIONS:
+            if section not in new_data:
+                continue
+            chunks[section] = with_chart_arrays(section, new_data[section])
+            payload = compact_json(encode_chunk(chunks[section], encoding)).encode('utf-8')
+            digest = hashlib.sha256(payload).hexdigest()[:CHUNK_HASH_LENGTH]
+            file_name = f"{section}.{digest}.json"
+            chunk_path = self.chunks_dir / file_name
+            if not chunk_path.exists():
+                write_atomic(chunk_path, payload)
+            entry = previous_sections.get(section, {})
+            if entry.get('hash') != digest:
+                changed.append(section)
+            # Indici precedenti senza versioni: ogni sezione esistente parte da 1
+            version = entry.get('version', 1) if entry else 0
+            index['sections'][section] = {
+                "file": file_name,
+                "hash": digest,
+                "bytes": len(payload),
+                "version": version + (entry.get('hash') != digest)
+            }
+        
+        index_changed = (changed or 'version' not in previous or encoding != previous_encoding
+                         or set(previous_sections) != set(index['sections'])
+                         or any(previous.get(field) != index[field] for field in INDEX_FIELDS))
+        if not index_changed:
+            print(f"✅ Nessuna modifica rispetto alla versione pubblicata {previous_version}")
+            return previous
+        
+        index['version'] = previous_version + 1
+        index['deltas'] = previous.get('deltas', [])
+        published = self.load_published_data(previous) if previous else None
+        ops = []
+        if published is not None:
+            current = {key: index[key] for key in INDEX_FIELDS}
+            current.update((section, chunks[section]) for section in index['sections'])
+            ops = diff_data(published, current)
+            # Il delta deve ricostruire esattamente i nuovi dati
+            if apply_delta(published, ops) != current:
+                raise RuntimeError("Delta incoerente con i nuovi dati")
+        if ops:
+            delta = {"from": previous_version, "to": index['version'], "ops": ops}
+            payload = compact_json(delta).encode('utf-8')
+            digest = hashlib.sha256(payload).hexdigest()[:CHUNK_HASH_LENGTH]
+            delta_name = f"delta.{previous_version}-{index['version']}.{digest}.json"
+            write_atomic(self.chunks_dir / delta_name, payload)
+            index['deltas'] = ([{
+                "from": previous_version,
+                "to": index['version'],
+                "file": delta_name,
+                "bytes": len(payload),
+                "sections": touched_roots(ops)
+            }] + index['deltas'])[:DELTA_HISTORY]
+            print(f"🔀 Delta {previous_version} → {index['version']}: {len(ops)} operazioni, "
+                  f"{len(payload):,} byte ({', '.join(touched_roots(ops)) or 'nessuna sezione'})")
+        
+        # L'indice va scritto per ultimo: referenzia chunk e delta già su disco
+        write_atomic(index_path, compact_json(index).encode('utf-8'))
+        
+        # Conserva i chunk della generazione precedente e i delta ancora
+        # referenziati: i client con il vecchio indice devono poterli scaricare
+        keep = {entry['file'] for entry in index['sections'].values()}
+        keep |= {entry['file'] for entry in previous_sections.values()}
+        keep |= {entry['file'] for entry in index['deltas']}
+        for chunk_path in self.chunks_dir.glob('*.json'):
+            if chunk_path.name != DATA_INDEX_NAME and chunk_path.name not in keep:
+                chunk_path.unlink()
+        
+        total = sum(entry['bytes'] for entry in index['sections'].values())
+        print(f"✅ Versione {index['version']}: {len(changed)} chunk riscritti "
+              f"({', '.join(changed) or 'nessuno'}), {total:,} byte totali + indice "
+              f"{index_path.stat().st_size:,} byte in {self.chunks_dir}")
+        return index
+    
+    def update_series_store(self, new_data):
+        """Aggiunge le serie storiche dell'edizione all'archivio multi-anno
+        interrogato da server.py su /api/series"""
+        print("📈 Aggiornamento archivio serie storiche...")
+        written = ingest_edition(self.series_dir, new_data, DATA_SECTIONS)
+        print(f"✅ {written} serie aggiornate in {self.series_dir}")
+        return written
+    
     def run_integrity_tests(self):
         """Esegue test di integrità"""
         print("🧪 Esecuzione test di integrità...")
@@ -180,20 +460,86 @@ if (typeof module !== 'undefined' && module.exports) {{
             print(f"❌ Test di integrità falliti: {e}")
             return False
     
+    def check_bundle(self):
+        """Verifica in-process dei file generati (al posto di server.py --check-only):
+        data.js rileggibile, tutte le sezioni presenti, chunk dell'indice integri"""
+        data = self.load_current_data()
+        missing = [section for section in DATA_SECTIONS if section not in data]
+        if missing:
+            raise ValueError(f"Sezioni mancanti: {', '.join(missing)}")
+        
+        with open(self.chunks_dir / DATA_INDEX_NAME, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        for section, entry in index['sections'].items():
+            payload = (self.chunks_dir / entry['file']).read_bytes()
+            if hashlib.sha256(payload).hexdigest()[:CHUNK_HASH_LENGTH] != entry['hash']:
+                raise ValueError(f"Chunk corrotto per la sezione {section}: {entry['file']}")
+        return True
+    
+    def update_province(self, rsp_files, schema):
+        """Aggiorna il bundle di una provincia con le sue edizioni RSP, in ordine.
+        
+        Eseguito nei worker di --batch: nessun subprocess e nessuna risorsa
+        condivisa con le altre province."""
+        rows = 0
+        parse_time = 0.0
+        for rsp_file in rsp_files:
+            self.validate_rsp_file(rsp_file)
+            backup_file = self.create_backup()
+            snapshot = self.snapshot_published()
+            try:
+                new_data = self.extract_data_from_rsp(rsp_file, schema)
+                rows += self.last_extract_stats['rows']
+                parse_time += self.last_extract_stats['elapsed_s']
+                version = self.update_version(new_data)
+                self.validate_data_structure(new_data)
+                self.generate_data_js(new_data)
+                self.generate_section_chunks(new_data)
+                self.update_series_store(new_data)
+                self.check_bundle()
+            except Exception:
+                self.rollback(backup_file, snapshot)
+                raise
+            self.discard_snapshot(snapshot)
+        return {
+            "version": version,
+            "rows": rows,
+            "rows_per_s": round(rows / parse_time, 1) if parse_time else 0.0,
+            "anno": new_data['metadata'].get('anno')
+        }
+    
+    def rebuild_fingerprinted_assets(self):
+        """Rigenera la build fingerprinted, se presente, così i nuovi dati
+        ricevono un nuovo hash e invalidano le cache immutable dei browser.
+        
+        Con releases/current (optimize.py --publish) pubblica una nuova
+        generazione e scambia il link atomicamente; altrimenti aggiorna dist/."""
+        if os.path.islink(self.releases_dir / "current"):
+            print("🔖 Pubblicazione nuova generazione...")
+            command = ["optimize.py", "--publish", "--releases-dir", str(self.releases_dir)]
+            target = self.releases_dir / "current"
+        elif self.build_dir.exists():
+            print("🔖 Rigenerazione build fingerprinted...")
+            command = ["optimize.py", "--build-only", "--build-dir", str(self.build_dir)]
+            target = self.build_dir
+        else:
+            return True
+        
+        result = subprocess.run([sys.executable, *command],
+                                cwd=self.project_dir, capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            print(f"❌ Build fingerprinted fallita: {result.stderr}")
+            return False
+        
+        print(f"✅ Build aggiornata: {target}")
+        return True
+    
     def update_version(self, new_data):
-        """Aggiorna il numero di versione"""
+        """Aggiorna il numero di versione partendo dai dati correnti già in memoria"""
         print("🔢 Aggiornamento versione...")
         
-        # Leggi versione corrente
-        current_version = "1.0.0"  # Default
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                version_match = re.search(r'"versione":\s*"([^"]+)"', content)
-                if version_match:
-                    current_version = version_match.group(1)
-        except:
-            pass
+        current_version = (self.current_data or {}).get('metadata', {}).get('versione', "1.0.0")
         
         # Calcola nuova versione (incrementa minor)
         parts = current_version.split('.')
@@ -202,7 +548,7 @@ if (typeof module !== 'undefined' && module.exports) {{
                 parts[1] = str(int(parts[1]) + 1)  # Incrementa minor
                 parts[2] = "0"  # Reset patch
                 new_version = '.'.join(parts)
-            except:
+            except ValueError:
                 new_version = "1.1.0"
         else:
             new_version = "1.1.0"
@@ -253,12 +599,14 @@ Auto-generated by update_data.py script
         print("🚀 AVVIO AGGIORNAMENTO DASHBOARD")
         print("=" * 50)
         
+        backup_file = snapshot = None
         try:
             # 1. Validazione file input
             self.validate_rsp_file(rsp_file_path)
             
-            # 2. Backup dati correnti
+            # 2. Backup dati correnti (e copia di chunk e archivio delle serie pubblicati)
             backup_file = self.create_backup()
+            snapshot = self.snapshot_published()
             
             # 3. Estrazione nuovi dati
             new_data = self.extract_data_from_rsp(rsp_file_path)
@@ -269,21 +617,29 @@ Auto-generated by update_data.py script
             # 5. Validazione struttura
             self.validate_data_structure(new_data)
             
-            # 6. Generazione nuovo data.js
+            # 6. Generazione nuovo data.js e dei chunk per sezione
             self.generate_data_js(new_data)
+            self.generate_section_chunks(new_data)
+            self.update_series_store(new_data)
             
             # 7. Test di integrità
             if not self.run_integrity_tests():
                 raise RuntimeError("Test di integrità falliti")
             
-            # 8. Commit automatico (opzionale)
+            # 8. Rigenerazione asset fingerprinted
+            if not self.rebuild_fingerprinted_assets():
+                raise RuntimeError("Build fingerprinted fallita")
+            
+            # 9. Commit automatico (opzionale)
             if auto_commit:
                 self.commit_changes(new_version, rsp_file_path)
+            self.discard_snapshot(snapshot)
             
             print("\n🎉 AGGIORNAMENTO COMPLETATO CON SUCCESSO!")
             print("=" * 50)
             print(f"📊 Versione: {new_version}")
-            print(f"📁 Backup: {backup_file}")
+            if backup_file:
+                print(f"📁 Backup: #{backup_file['id']} in {self.backup_dir}")
             print(f"🌐 Testa con: python3 server.py")
             
             return True
@@ -292,14 +648,101 @@ Auto-generated by update_data.py script
             print(f"\n❌ ERRORE DURANTE L'AGGIORNAMENTO: {e}")
             print("=" * 50)
             
-            # Ripristina backup se disponibile
-            if 'backup_file' in locals() and backup_file and backup_file.exists():
-                print("🔄 Ripristino backup...")
-                shutil.copy2(backup_file, self.data_file)
-                print("✅ Backup ripristinato")
-            
+            # Annulla l'aggiornamento se i dati sono già stati toccati
+            if snapshot is not None:
+                try:
+                    self.rollback(backup_file, snapshot)
+                except Exception as rollback_error:
+                    print(f"❌ Annullamento non riuscito: {rollback_error}")
             return False
 
+def province_slug(rsp_path):
+    """Provincia dal nome del file: RSP_Pesaro_Urbino_2025.csv -> pesaro_urbino"""
+    stem = re.sub(r'^RSP[\s_-]*', '', Path(rsp_path).stem, flags=re.IGNORECASE)
+    stem = re.sub(r'[\s_-]*\d{4}$', '', stem)
+    stem = unicodedata.normalize('NFKD', stem).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '_', stem.lower()).strip('_') or Path(rsp_path).stem.lower()
+
+def process_province(slug, rsp_files, output_dir, schema, retention=(DEFAULT_KEEP_LAST, DEFAULT_KEEP_DAYS)):
+    """Worker del process pool: aggiorna un bundle e restituisce l'esito"""
+    log = io.StringIO()
+    started = time.perf_counter()
+    result = {"province": slug, "files": [Path(f).name for f in rsp_files]}
+    try:
+        with contextlib.redirect_stdout(log):
+            updater = DashboardDataUpdater(Path(output_dir) / slug, *retention)
+            result.update(updater.update_province(rsp_files, schema))
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+        result["log"] = log.getvalue()
+    result["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return result
+
+def run_batch(batch_dir, output_dir=None, jobs=None, retention=(DEFAULT_KEEP_LAST, DEFAULT_KEEP_DAYS)):
+    """Elabora tutti gli export RSP di una cartella, una provincia per worker"""
+    updater = DashboardDataUpdater()
+    output_dir = Path(output_dir) if output_dir else updater.project_dir / PROVINCES_DIR
+    files = sorted(path for path in Path(batch_dir).iterdir()
+                   if path.is_file() and path.suffix.lower() in RSP_SUFFIXES)
+    if not files:
+        print(f"❌ Nessun export RSP ({', '.join(RSP_SUFFIXES)}) in {batch_dir}")
+        return False
+    
+    # Più edizioni della stessa provincia vanno applicate in ordine dallo stesso worker
+    provinces = {}
+    for path in files:
+        provinces.setdefault(province_slug(path), []).append(str(path))
+    schema = updater.load_current_data()
+    
+    print(f"🚀 BATCH: {len(files)} file, {len(provinces)} province → {output_dir}")
+    print("=" * 50)
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(process_province, slug, rsp_files, str(output_dir), schema, retention)
+                   for slug, rsp_files in provinces.items()]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result["status"] == "ok":
+                print(f"✅ {result['province']:<24} v{result['version']:<8} "
+                      f"{result['rows']:>9,} righe  {result['rows_per_s']:>10,.0f} righe/s  "
+                      f"{result['elapsed_s']:.2f}s")
+            else:
+                print(f"❌ {result['province']:<24} {result['error']}")
+    elapsed = time.perf_counter() - started
+    
+    results.sort(key=lambda r: r["province"])
+    failed = [r for r in results if r["status"] != "ok"]
+    total_rows = sum(r.get("rows", 0) for r in results)
+    report = {
+        "generated": datetime.now().isoformat(timespec='seconds'),
+        "batch_dir": str(batch_dir),
+        "elapsed_s": round(elapsed, 3),
+        "provinces": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "rows": total_rows,
+        "rows_per_s": round(total_rows / elapsed, 1) if elapsed else 0.0,
+        "results": results
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report_path = output_dir / BATCH_REPORT_NAME
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    
+    print("\n📋 RIEPILOGO BATCH")
+    print("=" * 50)
+    print(f"   Province aggiornate: {report['succeeded']}/{report['provinces']}")
+    print(f"   Righe elaborate: {total_rows:,} ({report['rows_per_s']:,.0f} righe/s complessive)")
+    print(f"   Tempo totale: {elapsed:.2f}s")
+    for result in failed:
+        print(f"   ❌ {result['province']} ({', '.join(result['files'])}): {result['error']}")
+    print(f"   Report: {report_path}")
+    return not failed
+
 def main():
     """Funzione principale dello script"""
     parser = argparse.ArgumentParser(
@@ -309,11 +752,17 @@ def main():
 Esempi d'uso:
   python3 update_data.py RSP_Pesaro_Urbino_2025.txt
   python3 update_data.py RSP_Pesaro_Urbino_2025.txt --commit
+  python3 update_data.py --split-only     # Rigenera data/ da js/data.js
+  python3 update_data.py --split-only --chunk-encoding columnar  # Chunk con serie per colonne
+  python3 update_data.py --export-rsp fixture.csv  # Export RSP dei dati correnti
+  python3 update_data.py --batch exports/ -j 8     # Un bundle per provincia in provinces/
+  python3 update_data.py --list-backups            # Versioni nell'archivio dei backup
+  python3 update_data.py --restore 12              # Ripristina il backup #12
   python3 update_data.py --help
 
 Note:
-  - Il file RSP deve essere in formato testo leggibile
-  - Viene creato automaticamente un backup dei dati correnti
+  - Il file RSP è un export testuale a tabelle: [sezione.percorso] + righe CSV
+  - Viene creato automaticamente un backup dei dati correnti (deduplicato, con retention)
   - I test di integrità vengono eseguiti automaticamente
   - Usa --commit per commit automatico su Git
         """
@@ -321,9 +770,80 @@ Note:
     
     parser.add_argument(
         'rsp_file',
+        nargs='?',
         help='Path al file RSP con i nuovi dati'
     )
     
+    parser.add_argument(
+        '--split-only',
+        action='store_true',
+        help='Rigenera solo i chunk JSON per sezione (data/) e l\'archivio delle serie (series/) dal js/data.js corrente'
+    )
+    
+    parser.add_argument(
+        '--check-derived',
+        action='store_true',
+        help='Verifica totali, saldi e percentuali di js/data.js rispetto ai dati grezzi (exit 1 se incoerenti)'
+    )
+    
+    parser.add_argument(
+        '--batch',
+        metavar='DIR',
+        help='Elabora tutti gli export RSP della cartella, un bundle per provincia'
+    )
+    
+    parser.add_argument(
+        '--output',
+        metavar='DIR',
+        help=f'Cartella dei bundle provinciali per --batch (default: {PROVINCES_DIR}/)'
+    )
+    
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        help='Processi paralleli per --batch (default: numero di CPU)'
+    )
+    
+    parser.add_argument(
+        '--list-backups',
+        action='store_true',
+        help='Elenca le versioni conservate nell\'archivio dei backup'
+    )
+    
+    parser.add_argument(
+        '--restore',
+        type=int,
+        metavar='ID',
+        help='Ripristina js/data.js dal backup indicato e rigenera i chunk'
+    )
+    
+    parser.add_argument(
+        '--backup-keep',
+        type=int,
+        default=DEFAULT_KEEP_LAST,
+        help=f'Backup più recenti sempre conservati (default: {DEFAULT_KEEP_LAST})'
+    )
+    
+    parser.add_argument(
+        '--backup-days',
+        type=int,
+        default=DEFAULT_KEEP_DAYS,
+        help=f'Conserva anche tutti i backup degli ultimi N giorni (default: {DEFAULT_KEEP_DAYS})'
+    )
+    
+    parser.add_argument(
+        '--export-rsp',
+        metavar='FILE',
+        help='Scrive il js/data.js corrente come export RSP (tabelle CSV), utile come fixture'
+    )
+    
+    parser.add_argument(
+        '--chunk-encoding',
+        choices=ENCODINGS,
+        help='Codifica dei chunk in data/: json (righe) o columnar (serie per colonne); '
+             'default: quella dell\'indice pubblicato, altrimenti json'
+    )
+    
     parser.add_argument(
         '--commit',
         action='store_true',
@@ -339,7 +859,43 @@ Note:
     args = parser.parse_args()
     
     # Inizializza updater
-    updater = DashboardDataUpdater()
+    updater = DashboardDataUpdater(backup_keep=args.backup_keep, backup_days=args.backup_days,
+                                   chunk_encoding=args.chunk_encoding)
+    
+    if args.batch:
+        retention = (args.backup_keep, args.backup_days)
+        sys.exit(0 if run_batch(args.batch, args.output, args.jobs, retention) else 1)
+    
+    if args.list_backups:
+        for entry in updater.backup_store.versions():
+            print(f"#{entry['id']:<5} {entry['created']}  {entry['hash'][:10]}  {entry['size']:>9,} byte"
+                  f"  {entry.get('label') or ''}")
+        sys.exit(0)
+    
+    if args.restore is not None:
+        updater.restore_backup(args.restore)
+        updater.generate_section_chunks(updater.load_current_data())
+        sys.exit(0)
+    
+    if args.export_rsp:
+        write_rsp_export(updater.load_current_data(), args.export_rsp)
+        print(f"✅ Export RSP scritto: {args.export_rsp}")
+        sys.exit(0)
+    
+    if args.check_derived:
+        mismatches = updater.check_derived_metrics(updater.load_current_data())
+        if not mismatches:
+            print("✅ Indicatori derivati coerenti con i dati grezzi")
+        sys.exit(1 if mismatches else 0)
+    
+    if args.split_only:
+        current_data = updater.load_current_data()
+        updater.generate_section_chunks(current_data)
+        updater.update_series_store(current_data)
+        sys.exit(0)
+    
+    if not args.rsp_file:
+        parser.error("specificare il file RSP oppure --batch/--split-only")
     
     # Esegui aggiornamento
     success = updater.update_dashboard(args.rsp_file, args.commit)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Series Store - Dashboard Socio-Economica
+Archivio colonnare delle serie storiche di più edizioni RSP, mappato in memoria
+"""
+
+import os
+import sys
+import json
+import mmap
+import math
+import array
+import bisect
+import threading
+from pathlib import Path
+
+SERIES_DIR = "series"
+CATALOG_NAME = "catalog.json"
+YEAR_FIELD = "anno"
+# Chiavi di dashboardData che contengono una serie annuale [{anno: ..., ...}, ...]
+SERIES_KEYS = ("serie_storica", "evoluzione")
+# Ogni file .f64 è little-endian: colonna anni seguita da una colonna per campo
+BYTE_ORDER = "little"
+
+def find_series(section_data, prefix=()):
+    """Restituisce (indicatore, righe) per ogni serie annuale di una sezione"""
+    found = []
+    if isinstance(section_data, dict):
+        for key, value in section_data.items():
+            path = prefix + (key,)
+            if (key in SERIES_KEYS and isinstance(value, list) and value
+                    and all(isinstance(row, dict) and YEAR_FIELD in row for row in value)):
+                found.append((".".join(path), value))
+            else:
+                found.extend(find_series(value, path))
+    return found
+
+def _numeric(value):
+    """Valore numerico di una cella (NaN se mancante o non numerica)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return math.nan
+    return float(value)
+
+def _to_little_endian(column):
+    values = array.array('d', column)
+    if sys.byteorder != BYTE_ORDER:
+        values.byteswap()
+    return values
+
+def _read_columns(path, rows, fields):
+    """Legge un file di serie come dizionario campo -> lista di valori"""
+    values = array.array('d')
+    with open(path, 'rb') as f:
+        values.frombytes(f.read())
+    if sys.byteorder != BYTE_ORDER:
+        values.byteswap()
+    names = [YEAR_FIELD] + fields
+    return {name: values[i * rows:(i + 1) * rows].tolist() for i, name in enumerate(names)}
+
+def load_catalog(store_dir):
+    """Catalogo dell'archivio (vuoto se non ancora creato)"""
+    catalog_path = Path(store_dir) / CATALOG_NAME
+    if not catalog_path.exists():
+        return {"editions": [], "series": {}}
+    with open(catalog_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def ingest_edition(store_dir, data, sections):
+    """Unisce le serie di un'edizione RSP all'archivio.
+
+    Per ogni anno prevalgono i valori dell'edizione ingerita per ultima
+    (le revisioni dei dati sostituiscono le stime precedenti)."""
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    catalog = load_catalog(store_dir)
+    edition = data.get("metadata", {}).get("anno")
+    written = 0
+
+    for section in sections:
+        for indicator, rows in find_series(data.get(section, {})):
+            key = f"{section}/{indicator}"
+            entry = catalog["series"].get(key)
+            file_path = store_dir / section / f"{indicator}.f64"
+
+            # Righe esistenti per anno, poi sovrascritte da quelle nuove
+            by_year = {}
+            fields = []
+            integer_fields = set()
+            if entry and file_path.exists():
+                fields = list(entry["fields"])
+                integer_fields = set(entry["integer_fields"])
+                columns = _read_columns(file_path, entry["rows"], fields)
+                for i, year in enumerate(columns[YEAR_FIELD]):
+                    by_year[int(year)] = {name: columns[name][i] for name in fields}
+
+            for row in rows:
+                for name, value in row.items():
+                    if name == YEAR_FIELD or not isinstance(value, (int, float)) or isinstance(value, bool):
+                        continue
+                    if name not in fields:
+                        fields.append(name)
+                        integer_fields.add(name)
+                    if not isinstance(value, int):
+                        integer_fields.discard(name)
+                by_year[int(row[YEAR_FIELD])] = {name: _numeric(row.get(name)) for name in fields}
+
+            years = sorted(by_year)
+            columns = [years] + [[by_year[year].get(name, math.nan) for year in years] for name in fields]
+            payload = b"".join(_to_little_endian(column).tobytes() for column in columns)
+
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = file_path.with_suffix(".f64.tmp")
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, file_path)
+
+            catalog["series"][key] = {
+                "section": section,
+                "indicator": indicator,
+                "file": f"{section}/{indicator}.f64",
+                "rows": len(years),
+                "fields": fields,
+                "integer_fields": sorted(integer_fields),
+                "first_year": years[0],
+                "last_year": years[-1]
+            }
+            written += 1
+
+    if edition is not None and edition not in catalog["editions"]:
+        catalog["editions"] = sorted(catalog["editions"] + [edition])
+
+    catalog_path = store_dir / CATALOG_NAME
+    tmp_path = catalog_path.with_suffix(".json.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, catalog_path)
+    return written
+
+class _MappedSeries:
+    """Serie aperta con mmap: le colonne sono viste sul file, senza copie"""
+
+    def __init__(self, store_dir, entry):
+        self.entry = entry
+        self.rows = entry["rows"]
+        self.fields = entry["fields"]
+        self.integer_fields = frozenset(entry["integer_fields"])
+        path = Path(store_dir) / entry["file"]
+        self._mmap = None
+        if sys.byteorder == BYTE_ORDER and path.stat().st_size:
+            with open(path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            values = memoryview(self._mmap).cast('d')
+        else:
+            # Architetture big-endian: copia convertita in memoria
+            values = array.array('d')
+            for column in _read_columns(path, self.rows, self.fields).values():
+                values.extend(column)
+        self._values = values
+        self.years = values[0:self.rows]
+
+    def column(self, index):
+        start = (index + 1) * self.rows
+        return self._values[start:start + self.rows]
+
+    def slice(self, start_year=None, end_year=None):
+        """Righe con start_year <= anno <= end_year (ricerca binaria sugli anni)"""
+        lo = 0 if start_year is None else bisect.bisect_left(self.years, start_year)
+        hi = self.rows if end_year is None else bisect.bisect_right(self.years, end_year)
+        hi = max(lo, hi)
+        columns = {YEAR_FIELD: [int(year) for year in self.years[lo:hi]]}
+        for index, name in enumerate(self.fields):
+            values = self.column(index)[lo:hi]
+            if name in self.integer_fields:
+                columns[name] = [None if math.isnan(v) else int(v) for v in values]
+            else:
+                columns[name] = [None if math.isnan(v) else v for v in values]
+        return columns
+
+class SeriesStore:
+    """Archivio in sola lettura usato da server.py per /api/series.
+
+    Tutti i file vengono mappati all'apertura; se update_data.py riscrive il
+    catalogo, l'archivio viene riaperto alla richiesta successiva."""
+
+    def __init__(self, store_dir=SERIES_DIR):
+        self.store_dir = Path(store_dir)
+        self._lock = threading.Lock()
+        self._catalog_mtime = None
+        self._series = {}
+        self.editions = []
+        self.refresh()
+
+    def refresh(self):
+        """Riapre l'archivio se il catalogo è cambiato su disco"""
+        catalog_path = self.store_dir / CATALOG_NAME
+        try:
+            mtime = catalog_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._catalog_mtime:
+            return
+        with self._lock:
+            if mtime == self._catalog_mtime:
+                return
+            catalog = load_catalog(self.store_dir)
+            # I vecchi mmap restano validi per le richieste in corso e vengono
+            # rilasciati dal garbage collector
+            self._series = {key: _MappedSeries(self.store_dir, entry)
+                            for key, entry in catalog["series"].items()}
+            self.editions = catalog["editions"]
+            self._catalog_mtime = mtime
+
+    def indicators(self, section=None):
+        """Elenco degli indicatori disponibili, opzionalmente per sezione"""
+        return [
+            {key: series.entry[key] for key in ("section", "indicator", "fields", "first_year", "last_year")}
+            for series in self._series.values()
+            if section is None or series.entry["section"] == section
+        ]
+
+    def query(self, section, indicator, start_year=None, end_year=None):
+        """Colonne della serie nell'intervallo di anni richiesto (None se assente)"""
+        self.refresh()
+        series = self._series.get(f"{section}/{indicator}")
+        if series is None:
+            return None
+        return series.slice(start_year, end_year)
+
+    def __len__(self):
+        return len(self._series)
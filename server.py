@@ -9,14 +9,692 @@ import socketserver
 import webbrowser
 import os
 import sys
+import io
+import signal
+import socket
+import asyncio
+import gzip
+import hashlib
+import email.utils
+from collections import OrderedDict, Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import argparse
 import threading
 import time
+import json
+import re
+import urllib.parse
+import queue
+import select
+import ctypes
+import ctypes.util
+import bisect
+
+from series_store import SeriesStore, SERIES_DIR, CATALOG_NAME
+from data_schema import load_bundle, validate_data, report_errors
+
+# Parametri di servizio in produzione
+SERVER_MODES = ('single', 'threaded', 'async')
+DEFAULT_WORKERS = 32
+KEEPALIVE_TIMEOUT = 5  # secondi di inattività prima di chiudere una connessione keep-alive
+SHUTDOWN_TIMEOUT = 10  # secondi concessi alle richieste in corso durante lo spegnimento
+MAX_REQUEST_HEAD = 64 * 1024
+
+# Cache degli asset statici
+CACHE_POLICIES = ('dev', 'prod')
+DEFAULT_CACHE_MB = 64
+NO_STORE = 'no-cache, no-store, must-revalidate'
+REVALIDATE = 'no-cache'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Manifest della build fingerprinted generata da optimize.py
+MANIFEST_NAME = 'asset-manifest.json'
+# Chunk JSON per sezione generati da scripts/update_data.py (hash nel nome)
+DATA_DIR = 'data'
+DATA_CHUNK_PATTERN = re.compile(r'\.[0-9a-f]{10}\.json$')
+# Asset con hash nel nome (optimize.py): identici in ogni generazione che li contiene
+HASHED_NAME_PATTERN = re.compile(r'\.[0-9a-f]{10}\.\w+$')
+# Query delle serie storiche multi-edizione (vedi series_store.py)
+API_SERIES_PATH = '/api/series'
+# Notifiche push dei nuovi dati pubblicati (Server-Sent Events)
+API_EVENTS_PATH = '/api/events'
+DATA_INDEX_NAME = 'index.json'
+EVENTS_KEEPALIVE = 15  # secondi tra i commenti che tengono aperta la connessione SSE
+EVENTS_RETRY_MS = 3000  # attesa suggerita all'EventSource prima di riconnettersi
+EVENTS_QUEUE_SIZE = 16
+WATCH_POLL_INTERVAL = 1.0  # secondi tra due scansioni senza inotify
+WATCH_DEBOUNCE = 0.2  # attesa dopo il primo evento per raccogliere una pubblicazione intera
+
+# Più province da un solo processo (--tenants provinces/): ogni bundle fornisce
+# solo i propri dati, pagine e asset dell'applicazione restano quelli di root
+APP_FILES = ('index.html', 'js/main.js', 'css/style.css')
+BUNDLE_FILES = ('js/data.js',)
+TENANT_PATHS = (DATA_DIR, os.path.join('js', 'data.js'))
+
+# Metriche per richiesta in formato Prometheus e profiler a campionamento
+METRICS_PATH = '/metrics'
+PROFILE_PATH = '/metrics/profile'
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Limiti superiori (secondi) dei bucket dell'istogramma di latenza
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+METRIC_METHODS = ('GET', 'HEAD', 'OPTIONS', 'POST')
+PROFILE_INTERVAL = 0.005  # secondi tra due campionamenti degli stack
+PROFILE_MAX_DEPTH = 64
+
+# Compressione: varianti precompresse da optimize.py (.br/.gz) o generate al volo
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+ENCODING_SUFFIXES = (('br', '.br'), ('zstd', '.zst'), ('gzip', '.gz'))
+# zstd viene servito solo se precompresso da optimize.py
+ON_THE_FLY_ENCODINGS = ('br', 'gzip')
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+MIN_COMPRESS_SIZE = 1024
+
+# Richieste Range (download ripresi): un solo intervallo di byte per richiesta
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+RANGE_NOT_SATISFIABLE = 'unsatisfiable'
+
+CachedAsset = namedtuple('CachedAsset', 'path data size mtime etag last_modified')
+
+class AssetCache:
+    """Cache LRU in memoria dei file statici, indicizzata per percorso e mtime"""
+    
+    def __init__(self, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        # I file oltre questa soglia vengono letti da disco senza occupare la cache
+        self.max_entry_bytes = max_bytes // 8
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, path):
+        """Restituisce il CachedAsset aggiornato di path, None se il file non esiste"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.mtime == st.st_mtime_ns and entry.size == st.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        
+        last_modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+        if st.st_size > self.max_entry_bytes:
+            etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+            return CachedAsset(path, None, st.st_size, st.st_mtime_ns, etag, last_modified)
+        
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        
+        etag = '"' + hashlib.blake2b(data, digest_size=12).hexdigest() + '"'
+        entry = CachedAsset(path, data, len(data), st.st_mtime_ns, etag, last_modified)
+        self._store(path, entry)
+        return entry
+    
+    def get_compressed(self, entry, encoding):
+        """Variante compressa al volo di un asset, calcolata una volta e tenuta in cache"""
+        key = (entry.path, encoding)
+        with self._lock:
+            variant = self._entries.get(key)
+            if variant is not None and variant.mtime == entry.mtime:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return variant
+            self.misses += 1
+        
+        if encoding == 'br':
+            data = brotli.compress(entry.data, quality=11)
+        else:
+            data = gzip.compress(entry.data, compresslevel=9, mtime=0)
+        
+        # ETag distinto per ogni rappresentazione (requisito degli ETag forti)
+        etag = f'{entry.etag[:-1]}-{encoding}"'
+        variant = CachedAsset(entry.path, data, len(data), entry.mtime, etag, entry.last_modified)
+        self._store(key, variant)
+        return variant
+    
+    def _store(self, key, entry):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+    
+    def invalidate(self, path=None):
+        """Rimuove un percorso (o tutta la cache se path è None)"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._size = 0
+            else:
+                entry = self._entries.pop(path, None)
+                if entry is not None:
+                    self._size -= entry.size
+    
+    def invalidate_prefix(self, prefix):
+        """Rimuove tutti i file (e le loro varianti compresse) sotto una directory"""
+        prefix = os.path.join(prefix, '')
+        with self._lock:
+            for key in [key for key in self._entries
+                        if (key if isinstance(key, str) else key[0]).startswith(prefix)]:
+                self._size -= self._entries.pop(key).size
+    
+    def stats(self):
+        """Statistiche di utilizzo della cache"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+class Tenant:
+    """Bundle di una provincia servito sotto /<nome>/ o dall'host <nome>.dominio"""
+    
+    def __init__(self, name, root):
+        self.name = name
+        self.root = root
+        self.series_store = None
+        self.events = None
+    
+    def owns(self, path):
+        """True se il percorso (già tradotto) appartiene al bundle"""
+        return path.startswith(os.path.join(self.root, ''))
+
+def format_event(name, payload):
+    """Messaggio SSE già codificato: una sola serializzazione per tutti i client"""
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    return f"event: {name}\ndata: {data}\n\n".encode('utf-8')
+
+class DataEvents:
+    """Notifiche SSE dei dati pubblicati in data/ (una coda per client connesso).
+    
+    Il watcher chiama check() a ogni modifica: se data/index.json è cambiato
+    la cache viene invalidata e i client ricevono le sezioni modificate.
+    Con i tenant ce n'è una per bundle; i posti per gli stream (slots) sono
+    condivisi, così il limite sui worker occupati resta uno solo."""
+    
+    def __init__(self, handler_class, slots, tenant=None):
+        self.handler_class = handler_class
+        self.slots = slots
+        self.tenant = tenant
+        self._queues = set()
+        self._lock = threading.Lock()
+        self.closed = False
+        self.index = self.read_index() or {}
+    
+    def data_dir(self):
+        if self.tenant is not None:
+            return os.path.join(self.tenant.root, DATA_DIR)
+        # Con releases/current la directory cambia a ogni pubblicazione
+        return os.path.join(os.path.realpath(self.handler_class.root), DATA_DIR)
+    
+    def read_index(self):
+        try:
+            with open(os.path.join(self.data_dir(), DATA_INDEX_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    @property
+    def version(self):
+        return self.index.get('version')
+    
+    @property
+    def clients(self):
+        with self._lock:
+            return len(self._queues)
+    
+    def subscribe(self):
+        """Coda di un nuovo client, None se il limite di connessioni è raggiunto"""
+        with self._lock:
+            if self.closed or not self.slots.acquire(blocking=False):
+                return None
+            subscription = queue.Queue(EVENTS_QUEUE_SIZE)
+            self._queues.add(subscription)
+            return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._queues:
+                self._queues.discard(subscription)
+                self.slots.release()
+    
+    def publish(self, message):
+        with self._lock:
+            queues = list(self._queues)
+        for subscription in queues:
+            try:
+                subscription.put_nowait(message)
+            except queue.Full:
+                pass  # Client lento: riceverà la versione aggiornata con l'evento successivo
+    
+    def close(self):
+        """Termina gli stream aperti (spegnimento del server)"""
+        with self._lock:
+            self.closed = True
+            queues = list(self._queues)
+        for subscription in queues:
+            while True:
+                try:
+                    subscription.put_nowait(None)
+                    break
+                except queue.Full:
+                    try:
+                        subscription.get_nowait()
+                    except queue.Empty:
+                        pass
+    
+    def check(self):
+        """Confronta l'indice pubblicato con quello noto e notifica le differenze"""
+        index = self.read_index()
+        if index is None or index == self.index:
+            return
+        old_sections = self.index.get('sections', {})
+        changed = [
+            name for name, entry in index.get('sections', {}).items()
+            if old_sections.get(name, {}).get('hash') != entry.get('hash')
+        ]
+        self.handler_class.asset_cache.invalidate_prefix(self.data_dir())
+        kpi_changed = index.get('kpi') != self.index.get('kpi')
+        self.index = index
+        self.publish(format_event('data', {
+            "version": index.get('version'),
+            "sections": changed,
+            "kpi": kpi_changed
+        }))
+        if not self.handler_class.quiet:
+            label = f"[{self.tenant.name}] " if self.tenant is not None else ''
+            print(f"🔄 {label}Dati aggiornati alla versione {index.get('version')}: "
+                  f"{', '.join(changed) or 'solo metadata/KPI'}")
+
+class _Inotify:
+    """inotify tramite ctypes (Linux), senza dipendenze esterne"""
+    
+    # IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    MASK = 0x008 | 0x040 | 0x080 | 0x100 | 0x200
+    
+    def __init__(self, paths):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 non riuscita')
+        for path in paths:
+            if libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK) < 0:
+                errno = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(errno, os.strerror(errno), path)
+    
+    def wait(self, timeout):
+        """True se nella directory è cambiato qualcosa entro timeout secondi"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+class DataWatcher(threading.Thread):
+    """Osserva le directory dei dati (inotify, altrimenti scansione periodica)"""
+    
+    def __init__(self, paths, callback):
+        super().__init__(name='data-watcher', daemon=True)
+        self.paths = paths
+        self.callback = callback
+        self._stopped = threading.Event()
+        try:
+            self._inotify = _Inotify(paths)
+            self.backend = 'inotify'
+        except (OSError, AttributeError, TypeError):
+            # macOS, Windows o limite di watch raggiunto
+            self._inotify = None
+            self.backend = 'polling'
+    
+    def snapshot(self):
+        """Nome, dimensione, mtime e inode di ogni voce (i link non vengono seguiti)"""
+        entries = []
+        for path in self.paths:
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        st = entry.stat(follow_symlinks=False)
+                        entries.append((entry.path, st.st_size, st.st_mtime_ns, st.st_ino))
+            except OSError:
+                continue
+        return sorted(entries)
+    
+    def run(self):
+        snapshot = self.snapshot() if self._inotify is None else None
+        while not self._stopped.is_set():
+            if self._inotify is not None:
+                changed = self._inotify.wait(WATCH_POLL_INTERVAL)
+            else:
+                self._stopped.wait(WATCH_POLL_INTERVAL)
+                current = self.snapshot()
+                changed, snapshot = current != snapshot, current
+            if not changed:
+                continue
+            # Una pubblicazione scrive più file: si notifica una volta sola
+            time.sleep(WATCH_DEBOUNCE)
+            if self._inotify is not None:
+                self._inotify.wait(0)
+            else:
+                snapshot = self.snapshot()
+            try:
+                self.callback()
+            except Exception as e:
+                print(f"⚠️  Errore nel ricaricamento dei dati: {e}")
+    
+    def stop(self):
+        self._stopped.set()
+
+class RequestMetrics:
+    """Contatori per richiesta (stato, latenza, byte) esposti su /metrics
+    nel formato testuale di Prometheus"""
+    
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._requests = {}  # (metodo, route, stato) → richieste
+        self._latency = {}   # route → [conteggi per bucket + Inf, somma dei secondi]
+        self._bytes = {}     # route → byte del corpo delle risposte
+    
+    def observe(self, method, route, status, duration, size):
+        index = bisect.bisect_left(self.buckets, duration)
+        with self._lock:
+            key = (method, route, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latency.get(route)
+            if histogram is None:
+                histogram = self._latency[route] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += duration
+            self._bytes[route] = self._bytes.get(route, 0) + size
+    
+    def render(self, handler_class):
+        """Esposizione Prometheus delle metriche, della cache degli asset e degli stream SSE"""
+        with self._lock:
+            requests = sorted(self._requests.items())
+            latency = sorted((route, (list(counts), total)) for route, (counts, total) in self._latency.items())
+            sent = sorted(self._bytes.items())
+        lines = [
+            '# HELP dashboard_http_requests_total Richieste servite per metodo, route e codice di stato.',
+            '# TYPE dashboard_http_requests_total counter'
+        ]
+        lines.extend(f'dashboard_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}'
+                     for (method, route, status), count in requests)
+        lines += [
+            '# HELP dashboard_http_request_duration_seconds Tempo di elaborazione delle richieste.',
+            '# TYPE dashboard_http_request_duration_seconds histogram'
+        ]
+        for route, (counts, total) in latency:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'dashboard_http_request_duration_seconds_bucket{{route="{route}",le="{le}"}} {cumulative}')
+            lines.append(f'dashboard_http_request_duration_seconds_sum{{route="{route}"}} {total:.6f}')
+            lines.append(f'dashboard_http_request_duration_seconds_count{{route="{route}"}} {cumulative}')
+        lines += [
+            '# HELP dashboard_http_response_bytes_total Byte del corpo delle risposte inviate.',
+            '# TYPE dashboard_http_response_bytes_total counter'
+        ]
+        lines.extend(f'dashboard_http_response_bytes_total{{route="{route}"}} {size}' for route, size in sent)
+        
+        cache = handler_class.asset_cache.stats()
+        lines += [
+            '# HELP dashboard_asset_cache_hits_total Letture della cache degli asset servite dalla memoria.',
+            '# TYPE dashboard_asset_cache_hits_total counter',
+            f'dashboard_asset_cache_hits_total {cache["hits"]}',
+            '# HELP dashboard_asset_cache_misses_total Letture della cache degli asset che hanno richiesto il disco.',
+            '# TYPE dashboard_asset_cache_misses_total counter',
+            f'dashboard_asset_cache_misses_total {cache["misses"]}',
+            '# HELP dashboard_asset_cache_entries Voci nella cache degli asset.',
+            '# TYPE dashboard_asset_cache_entries gauge',
+            f'dashboard_asset_cache_entries {cache["entries"]}',
+            '# HELP dashboard_asset_cache_bytes Byte occupati dalla cache degli asset.',
+            '# TYPE dashboard_asset_cache_bytes gauge',
+            f'dashboard_asset_cache_bytes {cache["bytes"]}'
+        ]
+        events = all_events(handler_class)
+        if events:
+            lines += [
+                '# HELP dashboard_sse_clients Stream SSE aperti su /api/events.',
+                '# TYPE dashboard_sse_clients gauge',
+                f'dashboard_sse_clients {sum(item.clients for item in events)}'
+            ]
+        if handler_class.tenants:
+            lines += [
+                '# HELP dashboard_tenants Bundle provinciali serviti da questo processo.',
+                '# TYPE dashboard_tenants gauge',
+                f'dashboard_tenants {len(handler_class.tenants)}'
+            ]
+        if handler_class.profiler is not None:
+            lines += [
+                '# HELP dashboard_profiler_samples_total Campionamenti eseguiti dal profiler.',
+                '# TYPE dashboard_profiler_samples_total counter',
+                f'dashboard_profiler_samples_total {handler_class.profiler.samples}'
+            ]
+        lines += [
+            '# HELP process_start_time_seconds Avvio del server (epoch Unix).',
+            '# TYPE process_start_time_seconds gauge',
+            f'process_start_time_seconds {self.started:.3f}'
+        ]
+        return '\n'.join(lines) + '\n'
+
+def request_stack(frame):
+    """Stack di un thread dal metodo do_* dell'handler alla funzione in
+    esecuzione; None per i thread inattivi (attesa di connessioni o richieste)"""
+    names = []
+    while frame is not None and len(names) < PROFILE_MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        if code.co_name.startswith('do_'):
+            return ';'.join(reversed(names))
+        frame = frame.f_back
+    return None
+
+class SamplingProfiler:
+    """Profiler a campionamento senza strumenti esterni: ogni `interval` secondi
+    registra lo stack dei thread che stanno servendo una richiesta"""
+    
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+    
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+    
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            stacks = [request_stack(frame) for ident, frame in sys._current_frames().items() if ident != own]
+            with self._lock:
+                self.samples += 1
+                self._stacks.update(stack for stack in stacks if stack)
+    
+    def render(self):
+        """Stack nel formato 'collapsed' (flamegraph.pl, speedscope), dal più frequente"""
+        with self._lock:
+            stacks = self._stacks.most_common()
+            samples = self.samples
+        state = 'attivo' if self.running else 'fermo'
+        lines = [f"# profiler {state}: {samples} campionamenti ogni {self.interval * 1000:g} ms",
+                 f"# {PROFILE_PATH}?enable=1 avvia, ?enable=0 ferma, ?reset=1 azzera"]
+        lines.extend(f"{stack} {count}" for stack, count in stacks)
+        return '\n'.join(lines) + '\n'
 
 class DashboardHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """Handler personalizzato per la dashboard con CORS e logging migliorato"""
     
+    # HTTP/1.1 per connessioni keep-alive (la modalità 'single' torna a HTTP/1.0)
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+    # Header e corpo sono scritti separatamente: senza TCP_NODELAY il keep-alive
+    # subisce i ~40 ms di Nagle + delayed ACK a ogni risposta
+    disable_nagle_algorithm = True
+    quiet = False
+    
+    # Condivise tra tutte le richieste (configurate da main)
+    asset_cache = AssetCache()
+    cache_policy = 'dev'
+    root = None
+    immutable_paths = frozenset()
+    # root è releases/current (optimize.py --publish): risolto a ogni richiesta
+    generations = False
+    # I file letti da disco passano dal kernel al socket senza copie in Python
+    use_sendfile = True
+    series_store = None
+    events = None
+    # Nome → Tenant (--tenants); series_store ed events della richiesta sono quelli del tenant
+    tenants = {}
+    tenant = None
+    metrics = None
+    profiler = None
+    _cache_control = None
+    # Stato della richiesta in corso: codice di risposta, inizio e byte del corpo
+    _status = None
+    _started = None
+    _sent_bytes = 0
+    _body_length = None
+    
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('directory', self.root)
+        super().__init__(*args, **kwargs)
+    
+    def setup(self):
+        """Usa gli stream forniti dal server asyncio al posto del socket"""
+        if isinstance(self.request, _AsyncConnection):
+            self.connection = None
+            self.rfile = self.request.rfile
+            self.wfile = self.request.wfile
+        else:
+            super().setup()
+    
+    def handle(self):
+        """In modalità async ogni istanza gestisce una sola richiesta"""
+        if isinstance(self.request, _AsyncConnection):
+            self.close_connection = True
+            self.handle_one_request()
+            self.request.keep_alive = not self.close_connection
+        else:
+            super().handle()
+    
+    def finish(self):
+        """Gli stream asyncio vengono chiusi dal server, non dall'handler"""
+        if not isinstance(self.request, _AsyncConnection):
+            super().finish()
+    
+    def handle_one_request(self):
+        """Registra stato, latenza e byte di ogni richiesta elaborata"""
+        self._status = None
+        self._started = None
+        self._sent_bytes = 0
+        # Lunghezza del corpo calcolata da send_head per questa richiesta (Range compresi)
+        self._body_length = None
+        super().handle_one_request()
+        if self.metrics is not None and self._status is not None and self._started is not None:
+            self.metrics.observe(self.metric_method(), self.metric_route(), self._status,
+                                 time.perf_counter() - self._started, self._sent_bytes)
+    
+    def parse_request(self):
+        # La latenza parte dalla riga di richiesta, non dall'attesa keep-alive che la precede
+        self._started = time.perf_counter()
+        if not super().parse_request():
+            return False
+        self.route_tenant()
+        return True
+    
+    def route_tenant(self):
+        """Sceglie il tenant dall'host (pesaro-urbino.example.org) o dal primo
+        segmento del percorso (/pesaro_urbino/...), che viene rimosso: le pagine
+        usano URL relativi, quindi dati, /api/series e /api/events seguono il prefisso"""
+        cls = type(self)
+        self.tenant = None
+        if self.tenants:
+            hostname = urllib.parse.urlsplit('//' + self.headers.get('Host', '')).hostname or ''
+            if '.' in hostname:
+                self.tenant = self.tenants.get(hostname.split('.')[0].replace('-', '_'))
+            if self.tenant is None:
+                _, name, rest = self.path.split('/', 2) if self.path.count('/') >= 2 else ('', '', '')
+                if name in self.tenants:
+                    self.tenant = self.tenants[name]
+                    self.path = '/' + rest
+        self.series_store = self.tenant.series_store if self.tenant else cls.series_store
+        self.events = self.tenant.events if self.tenant else cls.events
+    
+    def send_response(self, code, message=None):
+        self._status = int(code)
+        super().send_response(code, message)
+    
+    def send_error(self, code, message=None, explain=None):
+        # send_error scrive il log prima di send_response: il colore usa già il codice giusto
+        self._status = int(code)
+        super().send_error(code, message, explain)
+    
+    def send_header(self, keyword, value):
+        if keyword == 'Content-Length' and self.command != 'HEAD':
+            self._sent_bytes += int(value)
+        super().send_header(keyword, value)
+    
+    def metric_method(self):
+        return self.command if self.command in METRIC_METHODS else 'other'
+    
+    def metric_route(self):
+        """Etichetta 'route' a cardinalità limitata: i percorsi dei file non diventano etichette"""
+        route = getattr(self, 'path', '').partition('?')[0]
+        if route in (API_SERIES_PATH, API_EVENTS_PATH, METRICS_PATH, PROFILE_PATH):
+            return route
+        if route.startswith(f'/{DATA_DIR}/'):
+            return f'/{DATA_DIR}'
+        return 'static'
+    
     def end_headers(self):
         # Abilita CORS per sviluppo locale
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -26,23 +704,410 @@ class DashboardHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         # Headers di sicurezza e performance
         self.send_header('X-Content-Type-Options', 'nosniff')
         self.send_header('X-Frame-Options', 'DENY')
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
+        self.send_header('Cache-Control', self._cache_control or NO_STORE)
+        self._cache_control = None
         
         super().end_headers()
     
+    def cache_control_for(self, path):
+        """Politica Cache-Control per gli asset serviti con successo"""
+        immutable_paths = generation_immutable_paths(self.directory) if self.generations else self.immutable_paths
+        if self.cache_policy == 'prod' and (path in immutable_paths or self.is_data_chunk(path)):
+            # Il nome contiene l'hash del contenuto: un nuovo contenuto avrà un nuovo URL
+            return IMMUTABLE
+        # Pagine, manifest e asset senza hash: il browser li conserva ma li rivalida (304)
+        return REVALIDATE
+    
+    def is_data_chunk(self, path):
+        """Chunk di sezione in data/: nuovi dati producono un nuovo nome, l'indice è rivalidato"""
+        data_root = self.tenant.root if self.tenant is not None else self.directory
+        return (os.path.dirname(path) == os.path.join(data_root, DATA_DIR)
+                and DATA_CHUNK_PATTERN.search(path) is not None)
+    
+    def translate_path(self, path):
+        """data/ e js/data.js dal bundle del tenant, tutto il resto dall'applicazione condivisa"""
+        translated = super().translate_path(path)
+        prefix = os.path.join(self.directory, '')
+        if self.tenant is None or not translated.startswith(prefix):
+            return translated
+        relative = translated[len(prefix):]
+        if any(relative == owned or relative.startswith(owned + os.sep) for owned in TENANT_PATHS):
+            return os.path.join(self.tenant.root, relative)
+        return translated
+    
+    def resolve_generation(self):
+        """Fissa per questa richiesta la generazione puntata da releases/current:
+        lo scambio del link durante la risposta non mescola file di generazioni diverse"""
+        if self.generations:
+            self.directory = os.path.realpath(self.root)
+    
+    def find_in_previous_generations(self, path):
+        """Asset con hash richiesto da una pagina della generazione precedente:
+        lo cerca nelle generazioni conservate, dalla più recente"""
+        relative = os.path.relpath(path, self.directory)
+        releases_dir = os.path.dirname(self.directory)
+        try:
+            names = sorted(os.listdir(releases_dir), reverse=True)
+        except OSError:
+            return path, None
+        for name in names:
+            generation = os.path.join(releases_dir, name)
+            if name.startswith('.') or generation == self.directory or os.path.islink(generation):
+                continue
+            candidate = os.path.join(generation, relative)
+            entry = self.asset_cache.get(candidate)
+            if entry is not None:
+                self.directory = generation
+                return candidate, entry
+        return path, None
+    
+    def send_head(self):
+        """Serve i file dalla cache in memoria con ETag/Last-Modified e risposte 304"""
+        self.resolve_generation()
+        route, separator, query = self.path.partition('?')
+        if self.tenant is None and route.strip('/') in self.tenants:
+            # /pesaro_urbino senza barra finale: gli URL relativi della pagina non funzionerebbero
+            self.send_response(301)
+            self.send_header('Location', route + '/' + separator + query)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            # Redirect e indici di directory restano alla classe base
+            return super().send_head()
+        
+        entry = self.asset_cache.get(path)
+        if (entry is None and self.generations and HASHED_NAME_PATTERN.search(path)
+                and not (self.tenant is not None and self.tenant.owns(path))):
+            path, entry = self.find_in_previous_generations(path)
+        if entry is None or path.endswith('/'):
+            self.send_error(404, "File not found")
+            return None
+        
+        ctype = self.guess_type(path)
+        compressible = ctype.startswith(COMPRESSIBLE_TYPES)
+        encoding = None
+        # Gli intervalli si riferiscono ai byte del file così com'è: nessuna compressione
+        if compressible and 'Range' not in self.headers:
+            entry, encoding = self.select_encoding(entry)
+        
+        if self.is_not_modified(entry):
+            self._cache_control = self.cache_control_for(path)
+            self.send_response(304)
+            self.send_header('ETag', entry.etag)
+            self.send_header('Last-Modified', entry.last_modified)
+            if compressible:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return None
+        
+        byte_range = self.requested_range(entry)
+        if byte_range == RANGE_NOT_SATISFIABLE:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{entry.size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+        start, end = byte_range or (0, entry.size - 1)
+        self._body_length = end - start + 1
+        
+        if entry.data is not None:
+            body = io.BytesIO(entry.data if byte_range is None else entry.data[start:end + 1])
+        else:
+            # File oltre la soglia della cache: letto da disco a partire dall'intervallo richiesto
+            try:
+                body = open(entry.path, 'rb')
+            except OSError:
+                self.send_error(404, "File not found")
+                return None
+            body.seek(start)
+        
+        self._cache_control = self.cache_control_for(path)
+        self.send_response(206 if byte_range else 200)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(self._body_length))
+        if byte_range:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{entry.size}')
+        if not encoding:
+            self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Last-Modified', entry.last_modified)
+        self.send_header('ETag', entry.etag)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        return body
+    
+    def requested_range(self, entry):
+        """Intervallo (inizio, fine) chiesto con Range, None per l'intero file.
+        
+        Intervalli multipli o malformati vengono ignorati (risposta 200 completa,
+        come ammesso da RFC 9110); If-Range diverso dalla versione corrente
+        fa ripartire il download da capo."""
+        header = self.headers.get('Range')
+        if not header:
+            return None
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range.strip() not in (entry.etag, entry.last_modified):
+            return None
+        match = RANGE_PATTERN.match(header.strip())
+        if not match or not any(match.groups()):
+            return None
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), entry.size - 1) if last else entry.size - 1
+            if last and int(last) < start:
+                return None
+        else:
+            # bytes=-N: gli ultimi N byte
+            suffix = int(last)
+            if suffix == 0:
+                return RANGE_NOT_SATISFIABLE
+            start, end = max(0, entry.size - suffix), entry.size - 1
+        if start >= entry.size:
+            return RANGE_NOT_SATISFIABLE
+        return start, end
+    
+    def copyfile(self, source, outputfile):
+        """File su disco inviati con sendfile (zero-copy), limitati all'intervallo richiesto"""
+        length = self._body_length
+        if self.use_sendfile and isinstance(source, io.BufferedReader):
+            offset = source.tell()
+            if isinstance(self.request, _AsyncConnection):
+                outputfile.sendfile(source, offset, length)
+                return
+            if self.connection is not None:
+                # socket.sendfile usa os.sendfile dove disponibile, send() altrove
+                self.connection.sendfile(source, offset, length)
+                return
+        if length is None or isinstance(source, io.BytesIO):
+            return super().copyfile(source, outputfile)
+        while length > 0:
+            chunk = source.read(min(length, 64 * 1024))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            length -= len(chunk)
+    
+    def accepted_encodings(self):
+        """Codifiche accettate dal client secondo Accept-Encoding (q=0 esclude)"""
+        accepted = set()
+        for item in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = item.strip().partition(';')
+            name = name.strip().lower()
+            if not name:
+                continue
+            q = 1.0
+            params = params.strip()
+            if params.startswith('q='):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    q = 0.0
+            if q > 0:
+                accepted.add(name)
+        if '*' in accepted:
+            accepted.update(encoding for encoding, _ in ENCODING_SUFFIXES)
+        return accepted
+    
+    @staticmethod
+    def matches_source(sibling, entry, encoding):
+        """Controllo economico di coerenza: il trailer gzip (ISIZE) contiene la
+        dimensione non compressa, utile quando le mtime non sono affidabili (es. checkout git)"""
+        if encoding != 'gzip' or sibling.data is None or sibling.size < 18:
+            return True
+        return int.from_bytes(sibling.data[-4:], 'little') == entry.size % 2**32
+    
+    def select_encoding(self, entry):
+        """Sceglie la rappresentazione migliore: file precompresso non obsoleto,
+        altrimenti compressione al volo in cache, altrimenti l'originale"""
+        accepted = self.accepted_encodings()
+        if not accepted:
+            return entry, None
+        
+        for encoding, suffix in ENCODING_SUFFIXES:
+            if encoding not in accepted:
+                continue
+            sibling = self.asset_cache.get(entry.path + suffix)
+            if sibling is None:
+                continue
+            if sibling.mtime < entry.mtime or not self.matches_source(sibling, entry, encoding):
+                # Un .gz più vecchio del sorgente conterrebbe dati superati
+                continue
+            return sibling._replace(last_modified=entry.last_modified), encoding
+        
+        if entry.data is None or entry.size < MIN_COMPRESS_SIZE:
+            return entry, None
+        for encoding in ON_THE_FLY_ENCODINGS:
+            if encoding == 'br' and not BROTLI_AVAILABLE:
+                continue
+            if encoding in accepted:
+                return self.asset_cache.get_compressed(entry, encoding), encoding
+        return entry, None
+    
+    def is_not_modified(self, entry):
+        """Valuta If-None-Match (prioritario) e If-Modified-Since"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or entry.etag in tags
+        
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, IndexError, OverflowError, ValueError):
+                return False
+            if since is None:
+                return False
+            return entry.mtime // 1_000_000_000 <= since.timestamp()
+        return False
+    
     def do_OPTIONS(self):
         """Gestisce le richieste OPTIONS per CORS"""
         self.send_response(200)
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def do_GET(self):
         """Gestisce le richieste GET con redirect automatico all'index"""
+        route, _, query = self.path.partition('?')
+        if route == API_SERIES_PATH:
+            return self.handle_series_api(query)
+        if route == API_EVENTS_PATH:
+            return self.handle_events()
+        if route == METRICS_PATH and self.metrics is not None:
+            return self.send_text(200, self.metrics.render(type(self)), METRICS_CONTENT_TYPE)
+        if route == PROFILE_PATH and self.profiler is not None:
+            return self.handle_profile(query)
         if self.path == '/':
             self.path = '/index.html'
         return super().do_GET()
     
+    def handle_series_api(self, query):
+        """GET /api/series?section=&indicator=&from=&to=
+        
+        Senza indicatore restituisce l'elenco delle serie disponibili."""
+        store = self.series_store
+        if store is None:
+            return self.send_json(503, {"error": "Archivio delle serie storiche non disponibile"})
+        
+        params = urllib.parse.parse_qs(query)
+        section = params.get('section', [None])[0]
+        indicator = params.get('indicator', [None])[0]
+        if not indicator:
+            store.refresh()
+            return self.send_json(200, {
+                "editions": store.editions,
+                "indicators": store.indicators(section)
+            })
+        if not section:
+            return self.send_json(400, {"error": "Parametro 'section' obbligatorio"})
+        
+        try:
+            start_year = int(params['from'][0]) if 'from' in params else None
+            end_year = int(params['to'][0]) if 'to' in params else None
+        except ValueError:
+            return self.send_json(400, {"error": "'from' e 'to' devono essere anni interi"})
+        
+        columns = store.query(section, indicator, start_year, end_year)
+        if columns is None:
+            return self.send_json(404, {"error": f"Serie non trovata: {section}/{indicator}"})
+        return self.send_json(200, {
+            "section": section,
+            "indicator": indicator,
+            "from": start_year,
+            "to": end_year,
+            "columns": columns
+        })
+    
+    def handle_events(self):
+        """GET /api/events: stream SSE con un evento 'data' a ogni pubblicazione.
+        
+        La connessione occupa un worker finché il client resta collegato:
+        il numero di stream è limitato per non esaurire il pool."""
+        events = self.events
+        subscription = events.subscribe() if events is not None else None
+        if subscription is None:
+            return self.send_json(503, {"error": "Notifiche dei dati non disponibili"})
+        
+        try:
+            self._cache_control = NO_STORE
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Connection', 'close')
+            # nginx non deve accumulare lo stream nel buffer del proxy
+            self.send_header('X-Accel-Buffering', 'no')
+            self.end_headers()
+            # Versione corrente: un client riconnesso capisce se ha perso un evento
+            self.wfile.write(f"retry: {EVENTS_RETRY_MS}\n".encode('ascii')
+                             + format_event('version', {"version": events.version}))
+            self.wfile.flush()
+            while True:
+                try:
+                    message = subscription.get(timeout=EVENTS_KEEPALIVE)
+                except queue.Empty:
+                    message = b': ping\n\n'
+                if message is None:
+                    break
+                self.wfile.write(message)
+                self.wfile.flush()
+                self._sent_bytes += len(message)
+        except OSError:
+            pass  # Client disconnesso
+        finally:
+            events.unsubscribe(subscription)
+    
+    def handle_profile(self, query):
+        """GET /metrics/profile: stack campionati; enable=1/0 avvia o ferma, reset=1 azzera"""
+        params = urllib.parse.parse_qs(query)
+        enable = params.get('enable', [None])[0]
+        if enable == '1':
+            self.profiler.start()
+        elif enable == '0':
+            self.profiler.stop()
+        if params.get('reset', [None])[0] == '1':
+            self.profiler.reset()
+        self.send_text(200, self.profiler.render())
+    
+    def send_text(self, status, text, content_type='text/plain; charset=utf-8'):
+        """Risposta testuale non memorizzabile (metriche e profiler)"""
+        body = text.encode('utf-8')
+        self._cache_control = NO_STORE
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+    
+    def send_json(self, status, payload):
+        """Risposta JSON compatta con ETag (304 se il client ha già la stessa risposta)"""
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self._cache_control = REVALIDATE
+        if status == 200 and etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 200:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+    
     def log_message(self, format, *args):
         """Log personalizzato con timestamp e colori"""
+        if self.quiet:
+            return
+        
         timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
         message = format % args
         
@@ -53,18 +1118,253 @@ class DashboardHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         RED = '\033[91m'
         RESET = '\033[0m'
         
-        # Colora in base al codice di stato
-        if '200' in message:
+        # Colora in base al codice di stato della risposta (non al testo del messaggio)
+        status = self._status or 0
+        if 200 <= status < 300:
             color = GREEN
-        elif '404' in message:
+        elif status == 404:
             color = YELLOW
-        elif any(code in message for code in ['500', '403', '400']):
+        elif status >= 400:
             color = RED
         else:
             color = BLUE
             
         print(f"{BLUE}[{timestamp}]{RESET} {color}{message}{RESET}")
 
+class PooledHTTPServer(http.server.HTTPServer):
+    """HTTPServer che elabora le connessioni con un pool limitato di thread"""
+    
+    allow_reuse_address = True
+    request_queue_size = 128
+    
+    def __init__(self, server_address, handler_class, max_workers=DEFAULT_WORKERS):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dashboard')
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+    
+    def process_request(self, request, client_address):
+        """Accoda la connessione al pool invece di gestirla nel thread principale"""
+        with self._connections_lock:
+            self._connections.add(request)
+        self.executor.submit(self._process_request_worker, request, client_address)
+    
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._connections_lock:
+                self._connections.discard(request)
+            self.shutdown_request(request)
+    
+    def server_close(self):
+        """Spegnimento graceful: chiude le connessioni inattive e attende le richieste in corso"""
+        super().server_close()
+        close_event_streams(self.RequestHandlerClass)
+        with self._connections_lock:
+            connections = list(self._connections)
+        for request in connections:
+            # Chiudere solo il lato lettura sblocca i worker in attesa di una nuova
+            # richiesta keep-alive, lasciando completare le risposte in corso
+            try:
+                request.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        self.executor.shutdown(wait=True)
+
+class _AsyncConnection:
+    """Richiesta letta dal loop asyncio e passata all'handler in un thread del pool"""
+    
+    def __init__(self, head, writer, loop):
+        self.rfile = io.BytesIO(head)
+        self.wfile = _AsyncResponseWriter(writer, loop)
+        self.keep_alive = False
+
+class _AsyncResponseWriter:
+    """File-like scritto dai thread del pool che inoltra i dati allo stream asyncio"""
+    
+    def __init__(self, writer, loop):
+        self.writer = writer
+        self.loop = loop
+        self.closed = False
+    
+    async def _write(self, data):
+        self.writer.write(data)
+        await self.writer.drain()
+    
+    def write(self, data):
+        data = bytes(data)
+        if data:
+            asyncio.run_coroutine_threadsafe(self._write(data), self.loop).result()
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    async def _sendfile(self, file, offset, count):
+        await self.writer.drain()
+        # loop.sendfile usa os.sendfile sul socket del trasporto (con ripiego su read/send)
+        await self.loop.sendfile(self.writer.transport, file, offset, count)
+    
+    def sendfile(self, file, offset, count):
+        asyncio.run_coroutine_threadsafe(self._sendfile(file, offset, count), self.loop).result()
+
+class AsyncDashboardServer:
+    """Server asyncio: le connessioni keep-alive inattive non occupano thread,
+    le richieste vengono elaborate da un pool limitato di worker"""
+    
+    def __init__(self, server_address, handler_class, max_workers=DEFAULT_WORKERS):
+        self.server_address = server_address
+        self.RequestHandlerClass = handler_class
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dashboard')
+        self._idle_writers = set()
+        self._tasks = set()
+        self._closing = False
+    
+    async def _handle_connection(self, reader, writer):
+        self._tasks.add(asyncio.current_task())
+        loop = asyncio.get_running_loop()
+        peer = writer.get_extra_info('peername')
+        try:
+            while not self._closing:
+                self._idle_writers.add(writer)
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        asyncio.TimeoutError, ConnectionError):
+                    break
+                finally:
+                    self._idle_writers.discard(writer)
+                
+                connection = _AsyncConnection(head, writer, loop)
+                await loop.run_in_executor(
+                    self.executor, self.RequestHandlerClass, connection, peer, self
+                )
+                if not connection.keep_alive:
+                    break
+        except Exception as e:
+            print(f"❌ Errore nella connessione {peer}: {e}")
+        finally:
+            writer.close()
+            self._tasks.discard(asyncio.current_task())
+    
+    async def serve(self):
+        """Avvia il server e attende un segnale di arresto"""
+        loop = asyncio.get_running_loop()
+        stop_event = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: resta valido KeyboardInterrupt
+        
+        host, port = self.server_address
+        server = await asyncio.start_server(
+            self._handle_connection, host, port, limit=MAX_REQUEST_HEAD,
+            reuse_address=True, backlog=PooledHTTPServer.request_queue_size
+        )
+        try:
+            await stop_event.wait()
+        finally:
+            await self.shutdown(server)
+    
+    async def shutdown(self, server):
+        """Spegnimento graceful: smette di accettare, chiude le connessioni inattive
+        e attende le richieste in corso fino a SHUTDOWN_TIMEOUT"""
+        self._closing = True
+        server.close()
+        close_event_streams(self.RequestHandlerClass)
+        for writer in list(self._idle_writers):
+            writer.close()
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=SHUTDOWN_TIMEOUT)
+        self.executor.shutdown(wait=True)
+
+def all_events(handler_class):
+    """Notifiche attive della dashboard principale e dei tenant"""
+    events = [handler_class.events] + [tenant.events for tenant in handler_class.tenants.values()]
+    return [item for item in events if item is not None]
+
+def close_event_streams(handler_class):
+    """Gli stream SSE non terminano da soli: vanno chiusi prima di attendere i worker"""
+    for events in all_events(handler_class):
+        events.close()
+
+def start_data_watcher(handler_class, max_clients):
+    """Attiva /api/events e un solo watcher per data/ (o releases/ per le generazioni)
+    e per i data/ di tutti i tenant"""
+    slots = threading.BoundedSemaphore(max_clients)
+    events = DataEvents(handler_class, slots)
+    if handler_class.generations:
+        # optimize.py --publish sostituisce il link current nella directory releases/
+        root_path = os.path.dirname(handler_class.root)
+    else:
+        root_path = events.data_dir()
+    watched = []
+    if os.path.isdir(root_path):
+        handler_class.events = events
+        watched.append((root_path, events))
+    elif not handler_class.tenants:
+        print(f"⚠️  {root_path} non trovata: notifiche dei dati disattivate")
+        return None
+    for tenant in handler_class.tenants.values():
+        tenant.events = DataEvents(handler_class, slots, tenant)
+        watched.append((tenant.events.data_dir(), tenant.events))
+    
+    def check_all():
+        # Rileggere gli indici invariati costa poco: basta un watcher per tutti i bundle
+        for _, item in watched:
+            item.check()
+    
+    watcher = DataWatcher([path for path, _ in watched], check_all)
+    watcher.start()
+    return watcher
+
+def _raise_keyboard_interrupt(signum, frame):
+    """Converte SIGTERM in KeyboardInterrupt per uno spegnimento uniforme"""
+    raise KeyboardInterrupt
+
+def load_asset_manifest(root='.'):
+    """Legge il manifest della build fingerprinted, {} se assente o non valido"""
+    manifest_path = Path(root) / MANIFEST_NAME
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def immutable_paths_from_manifest(root, manifest):
+    """Percorsi assoluti degli asset fingerprinted, servibili come immutable"""
+    root = Path(root).resolve()
+    return frozenset(
+        os.path.join(str(root), *name.split('/'))
+        for name in manifest.get('assets', {}).values()
+    )
+
+_generation_manifests = {}
+
+def generation_immutable_paths(directory):
+    """Asset immutable di una generazione pubblicata (il suo manifest non cambia più)"""
+    paths = _generation_manifests.get(directory)
+    if paths is None:
+        paths = immutable_paths_from_manifest(directory, load_asset_manifest(directory))
+        if len(_generation_manifests) > 16:
+            _generation_manifests.clear()
+        _generation_manifests[directory] = paths
+    return paths
+
+def create_server(mode, port, workers):
+    """Crea il server per le modalità bloccanti ('single' e 'threaded')"""
+    handler = DashboardHTTPRequestHandler
+    if mode == 'single':
+        # Comportamento storico: una richiesta alla volta, nessun keep-alive
+        handler.protocol_version = 'HTTP/1.0'
+        socketserver.TCPServer.allow_reuse_address = True
+        return socketserver.TCPServer(("localhost", port), handler)
+    return PooledHTTPServer(("localhost", port), handler, max_workers=workers)
+
 def find_free_port(start_port=8000, max_port=8999):
     """Trova la prima porta libera nell'intervallo specificato"""
     import socket
@@ -89,18 +1389,17 @@ def open_browser(url, delay=1.5):
         print(f"\n⚠️  Errore nell'apertura automatica del browser: {e}")
         print(f"   Apri manualmente: {url}")
 
-def check_dashboard_files():
-    """Verifica che tutti i file necessari siano presenti"""
-    required_files = [
-        'index.html',
-        'js/data.js',
-        'js/main.js',
-        'css/style.css'
-    ]
+def check_dashboard_files(root='.', app_only=False):
+    """Verifica che tutti i file necessari siano presenti
+    (con app_only solo quelli dell'applicazione: i dati arrivano dai tenant)"""
+    required_files = list(APP_FILES) if app_only else list(APP_FILES + BUNDLE_FILES)
+    
+    # In una build fingerprinted gli asset hanno l'hash nel nome
+    assets = load_asset_manifest(root).get('assets', {})
     
     missing_files = []
     for file_path in required_files:
-        if not Path(file_path).exists():
+        if not (Path(root) / assets.get(file_path, file_path)).exists():
             missing_files.append(file_path)
     
     if missing_files:
@@ -111,9 +1410,59 @@ def check_dashboard_files():
         return False
     
     print("✅ Tutti i file della dashboard sono presenti")
+    return check_dashboard_data(root)
+
+def check_dashboard_data(root='.', name='della dashboard', quiet=False):
+    """Valida i dati pubblicati (data/index.json e chunk) rispetto allo schema"""
+    try:
+        data = load_bundle(root)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Dati {name} illeggibili: {e}")
+        return False
+    if data is None:
+        # Solo js/data.js: i chunk verranno generati da scripts/update_data.py
+        return True
+    errors = validate_data(data)
+    if errors:
+        print(f"❌ Dati {name} non validi ({len(errors)} errori):")
+        report_errors(errors)
+        return False
+    if not quiet:
+        print(f"✅ Dati {name} conformi allo schema")
     return True
 
-def print_dashboard_info(port, auto_open=True):
+def load_tenants(tenants_dir, root='.'):
+    """Bundle provinciali di tenants_dir (update_data.py --batch): ogni
+    sottodirectory con data/index.json è un tenant con il suo nome"""
+    reserved = set(os.listdir(root))
+    tenants = {}
+    try:
+        candidates = sorted(Path(tenants_dir).iterdir())
+    except OSError as e:
+        print(f"❌ Directory dei tenant non leggibile: {e}")
+        return tenants
+    for path in candidates:
+        if not (path / DATA_DIR / DATA_INDEX_NAME).is_file():
+            continue
+        if path.name in reserved:
+            # /js/... o /data/... devono restare i percorsi dell'applicazione
+            print(f"⚠️  Tenant {path.name} ignorato: stesso nome di un file di {root}")
+            continue
+        tenants[path.name] = Tenant(path.name, str(path.resolve()))
+    return tenants
+
+def check_tenants(tenants):
+    """Valida i dati di ogni tenant; quelli non validi vengono rimossi.
+    Restituisce i nomi scartati."""
+    rejected = [name for name, tenant in tenants.items()
+                if not check_dashboard_data(tenant.root, f"di {name}", quiet=True)]
+    for name in rejected:
+        del tenants[name]
+    if tenants:
+        print(f"✅ Dati di {len(tenants)} tenant conformi allo schema")
+    return rejected
+
+def print_dashboard_info(port, auto_open=True, mode='threaded', workers=DEFAULT_WORKERS, root='.', tenants=None):
     """Stampa le informazioni della dashboard"""
     url = f"http://localhost:{port}"
     
@@ -122,7 +1471,15 @@ def print_dashboard_info(port, auto_open=True):
     print("="*60)
     print(f"📊 Server avviato sulla porta: {port}")
     print(f"🌐 URL locale: {url}")
-    print(f"📁 Directory: {os.getcwd()}")
+    print(f"📁 Directory: {Path(root).resolve()}")
+    if tenants:
+        names = sorted(tenants)
+        print(f"🏘️  Tenant: {len(names)} ({', '.join(names[:5])}{', …' if len(names) > 5 else ''})")
+        print(f"   {url}/{names[0]}/ oppure http://{names[0].replace('_', '-')}.localhost:{port}/")
+    if mode == 'single':
+        print("⚙️  Modalità: single (una richiesta alla volta)")
+    else:
+        print(f"⚙️  Modalità: {mode} ({workers} worker, keep-alive HTTP/1.1)")
     print("="*60)
     
     if auto_open:
@@ -143,6 +1500,11 @@ def print_dashboard_info(port, auto_open=True):
     print("   • Navigazione a schede fluida")
     print("="*60)
 
+def print_shutdown_message():
+    """Messaggio di chiusura del server"""
+    print("\n\n🛑 Server fermato dall'utente")
+    print("👋 Grazie per aver utilizzato la Dashboard Socio-Economica!")
+
 def main():
     """Funzione principale del server"""
     parser = argparse.ArgumentParser(
@@ -154,6 +1516,12 @@ Esempi d'uso:
   python server.py -p 8080           # Avvia sulla porta 8080
   python server.py --no-browser      # Avvia senza aprire il browser
   python server.py -p 3000 --no-browser  # Porta personalizzata senza browser
+  python server.py --mode async --workers 64  # Produzione con server asyncio
+  python server.py --root dist --cache-policy prod  # Build fingerprinted con cache immutable
+  python server.py --root releases/current --cache-policy prod  # Generazioni di optimize.py --publish
+  python server.py --no-watch         # Senza watcher di data/ né notifiche push
+  python server.py --tenants provinces --mode async  # Tutte le province di update_data.py --batch
+  python server.py --profile --quiet  # Profiler attivo dall'avvio (stack su /metrics/profile)
 
 Note:
   - Il server si avvia nella directory corrente
@@ -180,11 +1548,96 @@ Note:
         help='Verifica solo la presenza dei file senza avviare il server'
     )
     
+    parser.add_argument(
+        '-d', '--root',
+        default='.',
+        help="Directory da servire, ad esempio la build 'dist' di optimize.py (default: directory corrente)"
+    )
+    
+    parser.add_argument(
+        '--tenants',
+        metavar='DIR',
+        help='Bundle provinciali da servire con la stessa applicazione, su /<provincia>/ '
+             'o sull\'host <provincia>.dominio (ad esempio provinces/ di update_data.py --batch)'
+    )
+    
+    parser.add_argument(
+        '--mode',
+        choices=SERVER_MODES,
+        default='threaded',
+        help='Modalità di servizio: single (sviluppo), threaded (pool di thread) o async (asyncio) (default: threaded)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Numero massimo di worker per le modalità threaded/async (default: {DEFAULT_WORKERS})'
+    )
+    
+    parser.add_argument(
+        '--cache-policy',
+        choices=CACHE_POLICIES,
+        default='dev',
+        help='Header di cache: dev (rivalidazione con 304) o prod (asset fingerprinted immutable per un anno) (default: dev)'
+    )
+    
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=DEFAULT_CACHE_MB,
+        help=f'Dimensione massima in MB della cache in memoria degli asset (default: {DEFAULT_CACHE_MB})'
+    )
+    
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Disattiva il log delle singole richieste (utile per i load test)'
+    )
+    
+    parser.add_argument(
+        '--series-dir',
+        default=str(Path(__file__).resolve().parent / SERIES_DIR),
+        help=f"Archivio delle serie storiche per {API_SERIES_PATH} (default: {SERIES_DIR}/ accanto a server.py)"
+    )
+    
+    parser.add_argument(
+        '--no-watch',
+        action='store_true',
+        help=f'Non osservare data/ e disattiva le notifiche push di {API_EVENTS_PATH}'
+    )
+    
+    parser.add_argument(
+        '--no-sendfile',
+        action='store_true',
+        help='Copia i file grandi attraverso buffer Python invece di usare sendfile (confronto nei benchmark)'
+    )
+    
+    parser.add_argument(
+        '--no-metrics',
+        action='store_true',
+        help=f'Disattiva le metriche per richiesta ({METRICS_PATH}) e il profiler ({PROFILE_PATH})'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help=f'Avvia subito il profiler a campionamento (altrimenti {PROFILE_PATH}?enable=1)'
+    )
+    
     args = parser.parse_args()
     
     # Verifica i file della dashboard
-    if not check_dashboard_files():
+    tenants = load_tenants(args.tenants, args.root) if args.tenants else {}
+    if args.tenants and not tenants:
+        print(f"⚠️  Nessun bundle con {DATA_DIR}/{DATA_INDEX_NAME} in {args.tenants}")
+    if not check_dashboard_files(args.root, app_only=bool(tenants)):
         sys.exit(1)
+    rejected = check_tenants(tenants)
+    if rejected:
+        print(f"⚠️  Tenant esclusi: {', '.join(rejected)}")
+        if args.check_only:
+            sys.exit(1)
     
     if args.check_only:
         print("✅ Verifica completata. Tutti i file sono presenti.")
@@ -201,31 +1654,79 @@ Note:
         sys.exit(1)
     
     # Configura il server
-    handler = DashboardHTTPRequestHandler
+    DashboardHTTPRequestHandler.quiet = args.quiet
+    DashboardHTTPRequestHandler.cache_policy = args.cache_policy
+    DashboardHTTPRequestHandler.use_sendfile = not args.no_sendfile
+    DashboardHTTPRequestHandler.asset_cache = AssetCache(args.cache_size * 1024 * 1024)
+    if Path(args.root).is_symlink():
+        # releases/current: il link non va risolto ora, ma a ogni richiesta
+        DashboardHTTPRequestHandler.generations = True
+        DashboardHTTPRequestHandler.root = os.path.abspath(args.root)
+    else:
+        DashboardHTTPRequestHandler.root = str(Path(args.root).resolve())
+    manifest = load_asset_manifest(args.root)
+    DashboardHTTPRequestHandler.immutable_paths = immutable_paths_from_manifest(args.root, manifest)
+    if args.cache_policy == 'prod' and not manifest:
+        print(f"⚠️  {MANIFEST_NAME} non trovato: nessun asset verrà servito come immutable")
+        print("   Esegui 'python optimize.py' e avvia con '--root dist'")
+    if (Path(args.series_dir) / CATALOG_NAME).exists():
+        DashboardHTTPRequestHandler.series_store = SeriesStore(args.series_dir)
+    else:
+        print(f"⚠️  Archivio serie non trovato in {args.series_dir}: {API_SERIES_PATH} risponderà 503")
+        print("   Esegui 'python scripts/update_data.py --split-only' per crearlo")
+    # Memoria per tenant: solo i suoi dati (cache e serie mappate); l'applicazione è condivisa
+    for tenant in tenants.values():
+        if (Path(tenant.root) / SERIES_DIR / CATALOG_NAME).exists():
+            tenant.series_store = SeriesStore(Path(tenant.root) / SERIES_DIR)
+    DashboardHTTPRequestHandler.tenants = tenants
+    if args.mode != 'single' and not args.no_watch:
+        # Metà del pool al massimo per gli stream SSE, il resto resta alle richieste
+        watcher = start_data_watcher(DashboardHTTPRequestHandler, max(1, args.workers // 2))
+        if watcher is not None:
+            print(f"👀 Watcher dei dati attivo ({watcher.backend}): notifiche su {API_EVENTS_PATH}")
+    if not args.no_metrics:
+        DashboardHTTPRequestHandler.metrics = RequestMetrics()
+        DashboardHTTPRequestHandler.profiler = SamplingProfiler()
+        if args.profile:
+            DashboardHTTPRequestHandler.profiler.start()
+        print(f"📈 Metriche Prometheus su {METRICS_PATH}, profiler su {PROFILE_PATH}"
+              f"{' (attivo)' if args.profile else ''}")
+    elif args.profile:
+        print("⚠️  --profile ignorato con --no-metrics")
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
     
     try:
-        with socketserver.TCPServer(("localhost", port), handler) as httpd:
-            # Mostra le informazioni
-            print_dashboard_info(port, not args.no_browser)
-            
-            # Avvia il browser in un thread separato
-            if not args.no_browser:
-                browser_thread = threading.Thread(
-                    target=open_browser,
-                    args=(f"http://localhost:{port}",),
-                    daemon=True
-                )
-                browser_thread.start()
-            
-            print(f"\n🎯 Server in ascolto... (Premi Ctrl+C per fermare)")
-            print("-" * 60)
-            
-            # Avvia il server
-            httpd.serve_forever()
+        if args.mode == 'async':
+            server = AsyncDashboardServer(("localhost", port), DashboardHTTPRequestHandler, args.workers)
+        else:
+            server = create_server(args.mode, port, args.workers)
+        
+        # Mostra le informazioni
+        print_dashboard_info(port, not args.no_browser, args.mode, args.workers, args.root, tenants)
+        
+        # Avvia il browser in un thread separato
+        if not args.no_browser:
+            browser_thread = threading.Thread(
+                target=open_browser,
+                args=(f"http://localhost:{port}",),
+                daemon=True
+            )
+            browser_thread.start()
+        
+        print(f"\n🎯 Server in ascolto... (Premi Ctrl+C per fermare)")
+        print("-" * 60)
+        
+        # Avvia il server
+        if args.mode == 'async':
+            # I segnali vengono gestiti dal loop: serve() ritorna a spegnimento completato
+            asyncio.run(server.serve())
+            print_shutdown_message()
+        else:
+            with server as httpd:
+                httpd.serve_forever()
             
     except KeyboardInterrupt:
-        print("\n\n🛑 Server fermato dall'utente")
-        print("👋 Grazie per aver utilizzato la Dashboard Socio-Economica!")
+        print_shutdown_message()
         
     except OSError as e:
         if "Address already in use" in str(e):
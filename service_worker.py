@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Service Worker - Dashboard Socio-Economica
+Genera sw.js per la build di optimize.py a partire dai file effettivamente prodotti
+
+Il service worker (templates/sw.js) mette in precache la shell dell'applicazione:
+pagine, asset con hash, librerie locali o da CDN. Le pagine e data/index.json
+sono serviti stale-while-revalidate, i chunk delle sezioni dalla cache; quando
+la versione dell'indice cambia vengono eliminati solo i chunk non più
+referenziati e scaricati quelli nuovi, poi main.js aggiorna la pagina aperta.
+
+L'identificativo della build è l'hash dei file in precache: una nuova build
+produce un sw.js diverso, che il browser installa al posto del precedente.
+"""
+
+import re
+import json
+import hashlib
+import argparse
+import posixpath
+from pathlib import Path
+
+SW_TEMPLATE_PATH = "templates/sw.js"
+SW_NAME = "sw.js"
+BUILD_DIR = "dist"
+MANIFEST_NAME = "asset-manifest.json"
+BUILD_PLACEHOLDER = "__BUILD__"
+HASH_LENGTH = 10
+
+EXTERNAL_PATTERN = re.compile(r'<(?:script|link)\b[^>]*\b(?:src|href)="(?P<url>https://[^"]+)"')
+BODY_PATTERN = re.compile(r'<body\b(?![^>]*\bdata-service-worker=)')
+
+def shell_files(build_dir, manifest):
+    """Pagine della build e asset con hash (anche le librerie locali) usati da almeno una pagina"""
+    pages = manifest.get("pages", [])
+    html = ''.join((build_dir / page).read_text(encoding='utf-8') for page in pages)
+    assets = [asset for asset in manifest.get("assets", {}).values() if posixpath.basename(asset) in html]
+    return sorted(set(assets) | set(pages))
+
+def external_urls(build_dir, pages):
+    """Librerie caricate da CDN nelle pagine della build (quelle non sostituite da vendor/)"""
+    urls = set()
+    for page in pages:
+        urls.update(match.group('url') for match in
+                    EXTERNAL_PATTERN.finditer((build_dir / page).read_text(encoding='utf-8')))
+    return sorted(urls)
+
+def build_id(build_dir, files, external):
+    """Hash dei file in precache: cambia con qualsiasi pagina o asset della build"""
+    digest = hashlib.sha256()
+    for name in files:
+        digest.update(name.encode('utf-8') + b'\0')
+        digest.update((build_dir / name).read_bytes())
+    for url in external:
+        digest.update(url.encode('utf-8') + b'\0')
+    return digest.hexdigest()[:HASH_LENGTH]
+
+def add_registration(html, page_path):
+    """Indica a main.js dove registrare il service worker (una volta per pagina)"""
+    url = posixpath.relpath(SW_NAME, posixpath.dirname(page_path) or '.')
+    return BODY_PATTERN.sub(f'<body data-service-worker="{url}"', html, count=1)
+
+def write_service_worker(dashboard_dir, build_dir, manifest):
+    """Scrive build_dir/sw.js; restituisce (percorso, elenco della build) o None senza template"""
+    template_path = Path(dashboard_dir) / SW_TEMPLATE_PATH
+    if not template_path.exists():
+        return None
+    build_dir = Path(build_dir)
+    files = shell_files(build_dir, manifest)
+    external = external_urls(build_dir, manifest.get("pages", []))
+    build = {"id": build_id(build_dir, files, external), "shell": files, "external": external}
+    script = template_path.read_text(encoding='utf-8').replace(
+        BUILD_PLACEHOLDER, json.dumps(build, indent=4, ensure_ascii=False), 1
+    )
+    target = build_dir / SW_NAME
+    target.write_text(script, encoding='utf-8')
+    return target, build
+
+def main():
+    """Rigenera sw.js (e la registrazione nelle pagine) per una build esistente"""
+    parser = argparse.ArgumentParser(
+        description='Genera il service worker per la build di optimize.py'
+    )
+    parser.add_argument(
+        '--build-dir',
+        default=BUILD_DIR,
+        help=f'Build di optimize.py con {MANIFEST_NAME} (default: {BUILD_DIR})'
+    )
+    args = parser.parse_args()
+
+    build_dir = Path(args.build_dir)
+    manifest_path = build_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        print(f"❌ {manifest_path} non trovato: esegui prima 'python optimize.py'")
+        raise SystemExit(1)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    print("📴 SERVICE WORKER")
+    print("=" * 50)
+    for page in manifest.get("pages", []):
+        path = build_dir / page
+        content = path.read_text(encoding='utf-8')
+        registered = add_registration(content, page)
+        if registered != content:
+            path.write_text(registered, encoding='utf-8')
+    result = write_service_worker(Path("."), build_dir, manifest)
+    if result is None:
+        print(f"❌ {SW_TEMPLATE_PATH} non trovato")
+        raise SystemExit(1)
+    target, build = result
+    print(f"✅ {target}: build {build['id']}, {len(build['shell'])} file in precache, "
+          f"{len(build['external'])} librerie da CDN")
+
+if __name__ == "__main__":
+    main()
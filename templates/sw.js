@@ -0,0 +1,171 @@
+// Dashboard Socio-Economica - Service Worker
+// Generato da service_worker.py nella build di optimize.py: non modificare dist/sw.js
+
+// Elenco degli asset della build (pagine, asset con hash, librerie) e identificativo del contenuto
+const BUILD = __BUILD__;
+const scopePath = new URL(self.registration.scope).pathname;
+const scopeUrl = (path) => new URL(path, self.registration.scope).href;
+
+// Cache distinte per scope: le province servite da server.py --tenants
+// (/pesaro_urbino/, /ancona/, ...) condividono l'origine ma non i dati
+const SHELL_PREFIX = 'dashboard-shell-' + scopePath + '-';
+const SHELL_CACHE = SHELL_PREFIX + BUILD.id;
+// I dati sopravvivono alle build: li invalida la versione di data/index.json
+const DATA_CACHE = 'dashboard-data-' + scopePath;
+const DATA_DIR = 'data/';
+const DATA_INDEX = DATA_DIR + 'index.json';
+const HOME_PAGE = 'index.html';
+// Sempre dalla rete: stream SSE, serie su richiesta e metriche di server.py
+const NETWORK_ONLY = ['api/', 'metrics'];
+
+self.addEventListener('install', (event) => {
+    event.waitUntil((async () => {
+        const shell = await caches.open(SHELL_CACHE);
+        await shell.addAll(BUILD.shell.map(scopeUrl));
+        // Librerie da CDN (build senza vendor/): risposte opache, conservate così come sono
+        await Promise.all(BUILD.external.map(async (url) => {
+            try {
+                await shell.put(url, await fetch(url, { mode: 'no-cors' }));
+            } catch (error) {
+                // Resta disponibile online; offline la pagina funziona senza la libreria
+            }
+        }));
+        // Indice e chunk delle sezioni: la dashboard funziona offline dalla prima visita
+        try {
+            const response = await fetch(scopeUrl(DATA_INDEX), { cache: 'no-cache' });
+            if (response.ok) await storeIndex(response);
+        } catch (error) {
+            // Offline durante l'installazione: i dati verranno salvati al primo accesso
+        }
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil((async () => {
+        // Shell delle build precedenti (gli asset con hash ancora validi sono già nella nuova)
+        // e cache senza scope delle versioni precedenti di questo file
+        const names = await caches.keys();
+        await Promise.all(names
+            .filter(name => (name.startsWith(SHELL_PREFIX) && name !== SHELL_CACHE)
+                || name === 'dashboard-data' || /^dashboard-shell-[0-9a-f]+$/.test(name))
+            .map(name => caches.delete(name)));
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET' || request.headers.has('range')) return;
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        if (BUILD.external.includes(request.url)) {
+            event.respondWith(cacheFirst(SHELL_CACHE, request, false));
+        }
+        return;
+    }
+    if (!url.pathname.startsWith(scopePath)) return;
+    const path = url.pathname.slice(scopePath.length);
+    if (NETWORK_ONLY.some(prefix => path.startsWith(prefix))) return;
+
+    if (path === DATA_INDEX) {
+        event.respondWith(dataIndex(event, request));
+    } else if (path.startsWith(DATA_DIR)) {
+        // Chunk e delta hanno l'hash nel nome: un URL non cambia mai contenuto
+        event.respondWith(cacheFirst(DATA_CACHE, request, true));
+    } else if (request.mode === 'navigate') {
+        event.respondWith(page(event, request, path));
+    } else {
+        event.respondWith(cacheFirst(SHELL_CACHE, request, false));
+    }
+});
+
+// Dalla cache se presente, altrimenti dalla rete (salvando la risposta se `store`)
+async function cacheFirst(cacheName, request, store) {
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (store && response.ok) {
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+// Risposta immediata dalla cache, aggiornata in background per la visita successiva
+async function staleWhileRevalidate(event, cacheName, key, request, store) {
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(key);
+    const network = fetch(request).then(async (response) => {
+        if (response.ok) {
+            await (store ? store(response.clone()) : cache.put(key, response.clone()));
+        }
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+    }
+    return network;
+}
+
+// Pagine: stale-while-revalidate; offline senza copia si ripiega sulla pagina principale
+async function page(event, request, path) {
+    const key = scopeUrl(path === '' || path.endsWith('/') ? path + HOME_PAGE : path);
+    try {
+        return await staleWhileRevalidate(event, SHELL_CACHE, key, request);
+    } catch (error) {
+        const fallback = await caches.match(scopeUrl(HOME_PAGE), { cacheName: SHELL_CACHE });
+        if (fallback) return fallback;
+        throw error;
+    }
+}
+
+// Indice dei dati: stale-while-revalidate; main.js chiede 'no-cache' quando sa che è cambiato
+async function dataIndex(event, request) {
+    const key = scopeUrl(DATA_INDEX);
+    if (request.cache !== 'no-cache') {
+        return staleWhileRevalidate(event, DATA_CACHE, key, request, storeIndex);
+    }
+    try {
+        const response = await fetch(request);
+        if (response.ok) await storeIndex(response.clone());
+        return response;
+    } catch (error) {
+        const cached = await caches.match(key, { cacheName: DATA_CACHE });
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+// Salva l'indice; se la versione dei dati è cambiata elimina i chunk non più
+// referenziati, scarica quelli delle sezioni modificate e avvisa le pagine aperte
+async function storeIndex(response) {
+    const cache = await caches.open(DATA_CACHE);
+    const key = scopeUrl(DATA_INDEX);
+    const previous = await cache.match(key);
+    const previousVersion = previous ? (await previous.json()).version : null;
+    const index = await response.clone().json();
+    await cache.put(key, response);
+    if (index.version === previousVersion) return;
+
+    const sections = Object.values(index.sections || {}).map(entry => scopeUrl(DATA_DIR + entry.file));
+    const deltas = (index.deltas || []).map(delta => scopeUrl(DATA_DIR + delta.file));
+    const wanted = new Set([key, ...sections, ...deltas]);
+    const cachedRequests = await cache.keys();
+    await Promise.all(cachedRequests
+        .filter(cachedRequest => !wanted.has(cachedRequest.url))
+        .map(cachedRequest => cache.delete(cachedRequest)));
+    const cachedUrls = new Set(cachedRequests.map(cachedRequest => cachedRequest.url));
+    try {
+        await cache.addAll(sections.filter(url => !cachedUrls.has(url)));
+    } catch (error) {
+        // I chunk mancanti verranno salvati quando la pagina li richiede
+    }
+
+    if (previousVersion !== null) {
+        const clients = await self.clients.matchAll({ type: 'window' });
+        clients.forEach(client => client.postMessage({ type: 'data-version', version: index.version }));
+    }
+}
@@ -0,0 +1,80 @@
+"""Test degli array dei grafici di scripts/derived_metrics.py"""
+
+import re
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+sys.path.insert(0, str(PROJECT_DIR / "scripts"))
+from derived_metrics import CHART_SPECS, ChartSpec, build_chart, chart_arrays
+from update_data import parse_data_js
+
+class ChartArraysTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = parse_data_js((PROJECT_DIR / "js" / "data.js").read_text(encoding='utf-8'))
+
+    def test_every_spec_builds_complete_datasets(self):
+        for section, specs in CHART_SPECS.items():
+            charts = chart_arrays(section, self.data[section])
+            for chart_id in specs:
+                with self.subTest(chart=chart_id):
+                    self.assertIn(chart_id, charts)
+                    for dataset in charts[chart_id]["datasets"]:
+                        self.assertEqual(len(dataset["data"]), len(charts[chart_id]["labels"]))
+                        self.assertNotIn(None, dataset["data"])
+
+    def test_main_js_charts_have_a_spec(self):
+        # Ogni grafico disegnato con chartData deve trovare i suoi array nel chunk
+        source = (PROJECT_DIR / "js" / "main.js").read_text(encoding='utf-8')
+        used = re.findall(r"this\.chartData\('(\w+)', '([\w-]+)'", source)
+        self.assertTrue(used)
+        for section, chart_id in used:
+            self.assertIn(chart_id, CHART_SPECS.get(section, {}))
+
+    def test_specs_have_a_canvas_in_index_and_section_page(self):
+        # Le pagine di dashboard/ nascono dalle sezioni di index.html: nessun grafico va perso
+        index_html = (PROJECT_DIR / "index.html").read_text(encoding='utf-8')
+        for section, specs in CHART_SPECS.items():
+            page_html = (PROJECT_DIR / "dashboard" / f"{section}.html").read_text(encoding='utf-8')
+            for chart_id in specs:
+                with self.subTest(chart=chart_id):
+                    self.assertIn(f'id="{chart_id}"', index_html)
+                    self.assertIn(f'id="{chart_id}"', page_html)
+
+    def test_rows_and_labelled_values(self):
+        cassetto = chart_arrays("relazioni_utenza", self.data["relazioni_utenza"])["chart-cassetto-bidirezionale"]
+        aziende = self.data["relazioni_utenza"]["cassetto_bidirezionale"]["aziende"]
+        self.assertEqual(cassetto["labels"][0], "Aziende 2023")
+        self.assertEqual(cassetto["datasets"][1]["data"][1], aziende["2024"]["in_uscita"])
+
+        personale = chart_arrays("organizzazione", self.data["organizzazione"])["chart-personale"]
+        per_area = self.data["organizzazione"]["personale"]["per_area"]
+        self.assertEqual(personale["labels"], ["Dirigenti", "Medici/Professionisti", "Aree Professionali"])
+        self.assertEqual(sum(personale["datasets"][0]["data"]),
+                         sum(area["totale"] for area in per_area.values()))
+
+    def test_join_aligns_series_by_year(self):
+        section = {
+            "entrate": {"serie_storica": [{"anno": 2023, "importo": 2e6}, {"anno": 2024, "importo": 3e6}]},
+            "recuperi": {"serie_storica": [{"anno": 2022, "importo": 1e6}, {"anno": 2023, "importo": 5e5}]},
+        }
+        spec = ChartSpec("join", None, None, [("Entrate", "entrate.serie_storica", "importo", 1e-6),
+                                              ("Recuperi", "recuperi.serie_storica", "importo", 1e-6)])
+        chart = build_chart(section, spec)
+        self.assertEqual(chart["labels"], [2022, 2023, 2024])
+        self.assertEqual(chart["datasets"][0]["data"], [None, 2.0, 3.0])
+        self.assertEqual(chart["datasets"][1]["data"], [1.0, 0.5, None])
+
+    def test_rows_placeholder_reads_different_nodes(self):
+        section = {"primo": {"2024": {"totale": 10}}, "secondo": {"2024": 4}}
+        spec = ChartSpec("rows", None, [("2024", "2024")],
+                         [("Primo", "primo.{}.totale", 1), ("Secondo", "secondo.{}", 1)])
+        chart = build_chart(section, spec)
+        self.assertEqual([dataset["data"] for dataset in chart["datasets"]], [[10], [4]])
+
+if __name__ == '__main__':
+    unittest.main()
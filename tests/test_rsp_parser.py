@@ -0,0 +1,82 @@
+"""Test di scripts/rsp_parser.py con fixture ricavate da js/data.js"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+sys.path.insert(0, str(PROJECT_DIR / "scripts"))
+from rsp_parser import RSPFormatError, parse_rsp_export, parse_value, write_rsp_export
+from update_data import DATA_SECTIONS, INDEX_FIELDS, parse_data_js
+
+ROOTS = INDEX_FIELDS + DATA_SECTIONS
+
+def load_data_js():
+    return parse_data_js((PROJECT_DIR / "js" / "data.js").read_text(encoding='utf-8'))
+
+class RSPParserTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = load_data_js()
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def write(self, text):
+        path = Path(self.tmp.name) / "RSP_Test_2025.csv"
+        path.write_text(text, encoding='utf-8')
+        return path
+    
+    def test_round_trip_of_data_js(self):
+        path = Path(self.tmp.name) / "fixture.csv"
+        write_rsp_export(self.data, path)
+        # Nessun dato di partenza: tutto deve arrivare dall'export
+        parsed, stats = parse_rsp_export(path, self.data, ROOTS, base={})
+        self.assertEqual(parsed, self.data)
+        self.assertEqual(stats['skipped'], [])
+        self.assertGreater(stats['rows'], 0)
+    
+    def test_italian_numbers(self):
+        self.assertEqual(parse_value("349.882", 0), 349882)
+        self.assertEqual(parse_value("70,1", 0.0), 70.1)
+        self.assertEqual(parse_value("-717", 0), -717)
+        self.assertEqual(parse_value("-1.234,5", 0.0), -1234.5)
+        self.assertEqual(parse_value("3.5"), 3.5)
+        # Intero dove lo schema prevede un float
+        self.assertIsInstance(parse_value("12", 0.0), float)
+    
+    def test_string_fields_are_kept(self):
+        path = self.write(
+            "[metadata]\nchiave;valore\ndataUltimoAggiornamento;2024\nanno;2024\n\n"
+            "[kpi]\nchiave;valore\ncrescita_entrate;+4.5%\npopolazione_totale;349.882\n"
+        )
+        parsed, _ = parse_rsp_export(path, self.data, ROOTS, base={})
+        self.assertEqual(parsed['metadata']['dataUltimoAggiornamento'], "2024")
+        # Stesso testo, ma lo schema prevede un numero
+        self.assertEqual(parsed['metadata']['anno'], 2024)
+        self.assertEqual(parsed['kpi']['crescita_entrate'], "+4.5%")
+        self.assertEqual(parsed['kpi']['popolazione_totale'], 349882)
+    
+    def test_wrong_cell_count(self):
+        header = "[demografia.saldo_naturale.serie_storica]\nanno;nascite;decessi;saldo\n"
+        for row in ("2013;3.076;3.793\n", "2013;3.076;3.793;-717;1\n"):
+            with self.subTest(row=row):
+                with self.assertRaises(RSPFormatError):
+                    parse_rsp_export(self.write(header + row), self.data, ROOTS)
+    
+    def test_unknown_tables_are_skipped(self):
+        path = self.write(
+            "[altro.tabella]\ncolonna;valore\na;1\n\n"
+            "[kpi]\nchiave;valore\ntasso_occupazione;71,2\n"
+        )
+        parsed, stats = parse_rsp_export(path, self.data, ROOTS)
+        self.assertNotIn('altro', parsed)
+        self.assertEqual(stats['skipped'], ['altro.tabella'])
+        self.assertEqual(stats['skipped_tables'], 1)
+        self.assertEqual(parsed['kpi']['tasso_occupazione'], 71.2)
+
+if __name__ == "__main__":
+    unittest.main()
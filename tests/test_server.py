@@ -0,0 +1,64 @@
+"""Test di server.py: richieste servite da un PooledHTTPServer in-process"""
+
+import os
+import sys
+import http.client
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import server
+
+class KeepAliveRangeTest(unittest.TestCase):
+    """Risposte successive sulla stessa connessione keep-alive"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        (root / "js").mkdir()
+        (root / "js" / "main.js").write_bytes(b"0123456789" * 10)
+        (root / "sub").mkdir()
+        (root / "sub" / "index.html").write_text("<p>indice di sub/</p>\n")
+        
+        class Handler(server.DashboardHTTPRequestHandler):
+            pass
+        Handler.root = str(root.resolve())
+        Handler.quiet = True
+        Handler.asset_cache = server.AssetCache()
+        Handler.metrics = None
+        Handler.events = None
+        self.httpd = server.PooledHTTPServer(("localhost", 0), Handler, max_workers=4)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.connection = http.client.HTTPConnection("localhost", self.httpd.server_address[1], timeout=5)
+    
+    def tearDown(self):
+        self.connection.close()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.tmp.cleanup()
+    
+    def get(self, path, headers=None):
+        self.connection.request("GET", path, headers=headers or {})
+        response = self.connection.getresponse()
+        return response, response.read()
+    
+    def test_range_then_directory_index(self):
+        response, body = self.get("/js/main.js", {"Range": "bytes=0-9"})
+        self.assertEqual(response.status, 206)
+        self.assertEqual(body, b"0123456789")
+        # sub/index.html passa dalla send_head della classe base (file aperto da disco)
+        response, body = self.get("/sub/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<p>indice di sub/</p>\n")
+    
+    def test_range_then_full_file(self):
+        self.get("/js/main.js", {"Range": "bytes=-5"})
+        response, body = self.get("/js/main.js", {"Accept-Encoding": "identity"})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"0123456789" * 10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Test di scripts/update_data.py: annullamento di un aggiornamento fallito"""
+
+import io
+import sys
+import json
+import shutil
+import tempfile
+import contextlib
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+sys.path.insert(0, str(PROJECT_DIR / "scripts"))
+from rsp_parser import write_rsp_export
+from update_data import DashboardDataUpdater, DATA_INDEX_NAME
+from data_schema import load_bundle
+from series_store import CATALOG_NAME
+
+class RollbackTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        bundle = Path(self.tmp.name) / "bundle"
+        (bundle / "js").mkdir(parents=True)
+        shutil.copy(PROJECT_DIR / "js" / "data.js", bundle / "js" / "data.js")
+        self.updater = DashboardDataUpdater(bundle)
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = self.updater.load_current_data()
+            self.updater.generate_section_chunks(data)
+            self.updater.update_series_store(data)
+        self.data_js = self.updater.data_file.read_text(encoding='utf-8')
+        self.published = load_bundle(bundle)
+        self.catalog = (self.updater.series_dir / CATALOG_NAME).read_text(encoding='utf-8')
+        self.chunk_files = self.files(self.updater.chunks_dir)
+        
+        # Nuova edizione: un anno in più nella serie del saldo naturale
+        data['metadata']['anno'] = 2025
+        series = data['demografia']['saldo_naturale']['serie_storica']
+        series.append(dict(series[-1], anno=series[-1]['anno'] + 1))
+        data['kpi']['tasso_occupazione'] = 71.5
+        self.rsp_file = Path(self.tmp.name) / "RSP_Test_2025.csv"
+        write_rsp_export(data, self.rsp_file)
+    
+    @staticmethod
+    def files(directory):
+        return {path.name: path.read_bytes() for path in directory.iterdir()}
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_failed_update_restores_chunks_and_series(self):
+        def fail():
+            raise RuntimeError("verifica fallita")
+        self.updater.check_bundle = fail
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(RuntimeError):
+                self.updater.update_province([str(self.rsp_file)], None)
+        
+        self.assertEqual(self.updater.data_file.read_text(encoding='utf-8'), self.data_js)
+        # I client leggono data/: stessi dati pubblicati prima dell'aggiornamento
+        self.assertEqual(load_bundle(self.updater.bundle_dir), self.published)
+        # Stessi file, stessa versione: nessun evento per i client già collegati
+        self.assertEqual(self.files(self.updater.chunks_dir), self.chunk_files)
+        with open(self.updater.chunks_dir / DATA_INDEX_NAME, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.assertEqual(index['version'], 1)
+        self.assertEqual(index['deltas'], [])
+        self.assertEqual((self.updater.series_dir / CATALOG_NAME).read_text(encoding='utf-8'), self.catalog)
+        self.assertEqual([path.name for path in self.updater.bundle_dir.glob('.published-*')], [])
+
+if __name__ == "__main__":
+    unittest.main()